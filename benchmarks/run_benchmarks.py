@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the command, telemetry, video and photo paths.
+Runs against the local simulator, no drone needed. Results are written as
+JSON so runs on different commits can be compared with --compare.
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import argparse
+import asyncio
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+import numpy as np
+from djitellopy import Tello
+
+from simulator import SimulatedTello
+from async_controller import AsyncTelloController
+from tello_controller import TelloController
+from replay import ReplayTello
+from telemetry import TelemetryCache
+from hud import HudRenderer
+from frame_buffer import FrameRing, FramePacer
+from photo_writer import PhotoWriter
+
+FRAME_SHAPE = (720, 960, 3)  # Tello camera resolution
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def percentiles(samples, scale=1000.0):
+    """Summarise samples (seconds) as milliseconds."""
+    samples = np.asarray(samples, dtype=np.float64) * scale
+    if not samples.size:
+        return {'count': 0}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {'count': int(samples.size), 'mean': float(samples.mean()), 'p50': float(p50),
+            'p95': float(p95), 'p99': float(p99), 'max': float(samples.max())}
+
+
+def time_per_call(func, iterations):
+    """Mean microseconds per call of func()."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def synthetic_frames(count=8):
+    """A few distinct camera-sized frames to cycle through."""
+    sim = SimulatedTello(frame_size=FRAME_SHAPE[:2])
+    return [sim.synthetic_frame(i * 17) for i in range(count)]
+
+
+# Command round trips
+
+MOVE_CALLS = [
+    ('move_forward', 20), ('move_back', 20), ('move_up', 20), ('move_down', 20),
+    ('rotate_clockwise', 10), ('rotate_counter_clockwise', 10),
+]
+
+
+def _timed_calls(target, iterations):
+    """Round-trip percentiles of each MOVE_CALLS method called on `target`."""
+    results = {}
+    for name, arg in MOVE_CALLS:
+        method = getattr(target, name)
+        rtts = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            method(arg)
+            rtts.append(time.perf_counter() - start)
+        results[name] = percentiles(rtts)
+    return results
+
+
+def _tello_controller_rtts(iterations, latency, port):
+    """TelloController's move_*/rotate_* path (djitellopy plus the link monitor)."""
+    loop = asyncio.new_event_loop()
+    runner = threading.Thread(target=loop.run_forever, daemon=True)
+    runner.start()
+    # djitellopy listens for state on local port 8890
+    drone = SimulatedTello(host='127.0.0.2', command_port=port, state_port=Tello.STATE_UDP_PORT,
+                           latency=latency, latency_jitter=0.0, time_scale=0.0)
+    asyncio.run_coroutine_threadsafe(drone.start(), loop).result(timeout=5)
+    controller = TelloController('127.0.0.2', command_port=port)
+    try:
+        if not controller.connect():
+            raise RuntimeError("TelloController could not connect to the simulator")
+        controller.takeoff()
+        results = _timed_calls(controller.tello, iterations)
+        controller.land()
+        return results
+    finally:
+        controller.disconnect()
+        asyncio.run_coroutine_threadsafe(_stop_simulator(drone), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        runner.join(timeout=5)
+        loop.close()
+
+
+async def _stop_simulator(drone):
+    tasks = list(drone._tasks)
+    drone.stop()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _async_rtts(iterations, latency, port):
+    drone = SimulatedTello(host='127.0.0.2', command_port=port, state_port=port + 1,
+                           latency=latency, latency_jitter=0.0, time_scale=0.0)
+    await drone.start()
+    controller = AsyncTelloController('127.0.0.2', command_port=port, state_port=port + 1)
+    try:
+        await controller.connect()
+        await controller.takeoff()
+        results = {}
+        for name, arg in MOVE_CALLS:
+            method = getattr(controller, name)
+            rtts = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                await method(arg)
+                rtts.append(time.perf_counter() - start)
+            results[name] = percentiles(rtts)
+        await controller.land()
+        return results
+    finally:
+        await controller.close()
+        drone.stop()
+
+
+def bench_commands(iterations=200, latency=0.0, port=9889):
+    """Command round-trip latency (ms) per move_*/rotate_* call.
+
+    The simulator acknowledges at once (plus `latency`), so the numbers are
+    the cost of the command path itself. `rtt_ms` is TelloController's path,
+    which includes djitellopy's 0.1 s spacing between commands, so it runs a
+    quarter of the iterations; `async_rtt_ms` is AsyncTelloController.
+    """
+    return {'simulated_latency_ms': latency * 1000,
+            'rtt_ms': _tello_controller_rtts(max(1, iterations // 4), latency, port),
+            'async_rtt_ms': asyncio.run(_async_rtts(iterations, latency, port + 2))}
+
+
+# Telemetry
+
+class _StateSource:
+    """Stands in for djitellopy's receiver: a new dict per state packet."""
+
+    def __init__(self):
+        self.packet = Tello.parse_state(SimulatedTello().state_packet())
+        self.state = self.packet
+
+    def new_packet(self):
+        self.state = dict(self.packet)
+
+    def get_current_state(self):
+        return self.state
+
+
+def bench_telemetry(iterations=200000):
+    """Microseconds per TelemetryCache.snapshot() read."""
+    source = _StateSource()
+    cache = TelemetryCache(source)
+    cache.snapshot()
+    cached = time_per_call(cache.snapshot, iterations)
+
+    def read_new():
+        source.new_packet()
+        cache.snapshot()
+
+    fresh = time_per_call(read_new, iterations // 10) - time_per_call(source.new_packet, iterations // 10)
+    return {'snapshot_cached_us': cached, 'snapshot_new_packet_us': fresh}
+
+
+# Video pipeline
+
+class _FrameSource:
+    """Replaces its .frame array at a fixed rate, like BackgroundFrameRead."""
+
+    def __init__(self, frames, fps):
+        self.frames = frames
+        self.interval = 1.0 / fps
+        self.frame = None
+        self.stamps = {}
+        self.produced = 0
+        self.running = False
+
+    def run(self):
+        next_due = time.perf_counter()
+        while self.running:
+            frame = self.frames[self.produced % len(self.frames)].copy()
+            self.stamps[id(frame)] = time.time()
+            self.frame = frame
+            self.produced += 1
+            next_due += self.interval
+            time.sleep(max(0.0, next_due - time.perf_counter()))
+
+
+def bench_stages(iterations=300):
+    """Milliseconds per frame for the ring copy and the HUD overlay."""
+    frames = synthetic_frames()
+    hud = HudRenderer(TelemetryCache(_StateSource()))
+    hud.update(True)
+    ring = FrameRing(size=4)
+    copy_us = time_per_call(lambda: ring.publish(frames[0]), iterations)
+    overlay_us = time_per_call(lambda: ring.publish(frames[0], overlay=hud.draw), iterations)
+    return {'copy_ms': copy_us / 1000, 'copy_overlay_ms': overlay_us / 1000,
+            'overlay_ms': (overlay_us - copy_us) / 1000}
+
+
+def bench_video(duration=5.0, source_fps=30, display_fps=30, display=False):
+    """Run start_video_stream's publish and display stages on synthetic frames.
+
+    Latency is split into source -> ring publish (copy + overlay) and
+    publish -> display (pacer wake-up and, with display=True, imshow).
+    """
+    import cv2
+    from flight_control import InteractiveTelloController
+
+    # No djitellopy sockets, and photos/flight logs go to a scratch directory
+    scratch = tempfile.mkdtemp(prefix='tello_bench_')
+    interactive = InteractiveTelloController(display_fps=display_fps, tello=ReplayTello(),
+                                             photos_dir=os.path.join(scratch, 'photos'),
+                                             flights_dir=os.path.join(scratch, 'flights'))
+    interactive.streaming = True
+    source = _FrameSource(synthetic_frames(), source_fps)
+    publish_latency = []
+
+    def on_raw(view):
+        stamp = source.stamps.pop(id(view.frame.base), None)
+        if stamp is not None:
+            publish_latency.append(view.timestamp - stamp)
+
+    interactive.add_frame_consumer(on_raw, with_hud=False)
+    source.running = True
+    producer = threading.Thread(target=source.run, daemon=True)
+    publisher = threading.Thread(target=interactive._publish_frames, args=(source,), daemon=True)
+    producer.start()
+    publisher.start()
+
+    pacer = FramePacer(interactive.frames, target_fps=display_fps)
+    display_latency = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        view = pacer.next_frame(timeout=0.1)
+        if view is None:
+            continue
+        if display:
+            cv2.imshow('Benchmark', view.frame)
+            cv2.waitKey(1)
+        display_latency.append(time.time() - view.timestamp)
+    elapsed = time.perf_counter() - start
+
+    source.running = False
+    interactive.streaming = False
+    producer.join()
+    publisher.join()
+    shutil.rmtree(scratch, ignore_errors=True)
+    if display:
+        cv2.destroyAllWindows()
+
+    return {
+        'source_fps': source_fps,
+        'published_fps': interactive.frames.sequence / elapsed,
+        'displayed_fps': pacer.shown / elapsed,
+        'source_to_publish_ms': percentiles(publish_latency),
+        'publish_to_display_ms': percentiles(display_latency),
+        'pacer': pacer.stats(),
+    }
+
+
+# Photos
+
+def bench_photos(count=100, image_format='jpg', workers=2):
+    """Photo encode throughput through PhotoWriter."""
+    frames = synthetic_frames()
+    directory = tempfile.mkdtemp(prefix='tello_bench_')
+    try:
+        writer = PhotoWriter(directory, workers=workers, image_format=image_format, full_policy='block')
+        start = time.perf_counter()
+        submit_times = []
+        for i in range(count):
+            submitted = time.perf_counter()
+            writer.submit(frames[i % len(frames)])
+            submit_times.append(time.perf_counter() - submitted)
+        writer.flush()
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        return {'format': image_format, 'workers': workers, 'photos': writer.saved,
+                'photos_per_s': writer.saved / elapsed, 'mb_per_photo': size / max(writer.saved, 1) / 1e6,
+                'submit_ms': percentiles(submit_times)}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+# Results
+
+def git_commit():
+    """Short hash of the checked-out commit, or None outside git."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def flatten(results, prefix=''):
+    """Flatten nested results to {'a.b.c': number}."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline, current):
+    """Print the relative change of every metric against a baseline run."""
+    old = flatten(baseline['results'])
+    new = flatten(current['results'])
+    print(f"\n📊 {baseline.get('commit')} -> {current.get('commit')}")
+    for name in sorted(old.keys() & new.keys()):
+        if old[name]:
+            change = (new[name] - old[name]) / abs(old[name]) * 100
+            print(f"   {name:55s} {old[name]:12.3f} -> {new[name]:12.3f} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tello controller benchmarks")
+    parser.add_argument('--only', nargs='*', choices=['commands', 'telemetry', 'video', 'photos'])
+    parser.add_argument('--quick', action='store_true', help="fewer iterations")
+    parser.add_argument('--latency', type=float, default=0.0, help="simulated command latency (s)")
+    parser.add_argument('--display', action='store_true', help="include imshow in the video benchmark")
+    parser.add_argument('--output', help="result file (default: results/<commit>.json)")
+    parser.add_argument('--compare', help="baseline result file to compare against")
+    args = parser.parse_args()
+
+    selected = args.only or ['commands', 'telemetry', 'video', 'photos']
+    scale = 0.2 if args.quick else 1.0
+    results = {}
+    if 'commands' in selected:
+        print("⏱️  Command round trips...")
+        results['commands'] = bench_commands(int(200 * scale), args.latency)
+    if 'telemetry' in selected:
+        print("⏱️  Telemetry snapshot reads...")
+        results['telemetry'] = bench_telemetry(int(200000 * scale))
+    if 'video' in selected:
+        print("⏱️  Video pipeline...")
+        results['video'] = {'stages': bench_stages(int(300 * scale)),
+                            'pipeline': bench_video(5.0 * scale, display=args.display)}
+    if 'photos' in selected:
+        print("⏱️  Photo encoding...")
+        results['photos'] = bench_photos(int(100 * scale))
+
+    run = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{run['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(run, f, indent=2)
+    print(f"✅ Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Asyncio-native controller for the DJI Tello SDK.
+"""
+
+import asyncio
+import time
+
+import av
+from djitellopy import Tello
+from telemetry import TelemetrySnapshot
+
+TELLO_IP = '192.168.10.1'
+COMMAND_PORT = 8889
+STATE_PORT = 8890
+VIDEO_PORT = 11111
+
+
+class AsyncTelloError(Exception):
+    """Raised when the drone rejects a command or does not answer in time."""
+
+
+class _Endpoint(asyncio.DatagramProtocol):
+    """UDP endpoint that routes datagrams to a handler by sender host."""
+
+    def __init__(self):
+        self.transport = None
+        self.handlers = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, address):
+        handler = self.handlers.get(address[0])
+        if handler is not None:
+            handler(data, address)
+
+    def error_received(self, exc):
+        print(f"UDP endpoint error: {exc}")
+
+
+async def open_endpoint(port, host='0.0.0.0'):
+    """Bind a routing UDP endpoint on `port` (0 picks a free port)."""
+    loop = asyncio.get_running_loop()
+    _, endpoint = await loop.create_datagram_endpoint(_Endpoint, local_addr=(host, port))
+    return endpoint
+
+
+def _decode(codec, data):
+    """Decode H.264 bytes into BGR frames (runs in an executor thread)."""
+    return [frame.to_ndarray(format='bgr24') for packet in codec.parse(data) for frame in codec.decode(packet)]
+
+
+class TelloMux:
+    """Shared command and state endpoints for any number of drones.
+
+    Every drone's commands leave from one local socket and all state packets
+    arrive on one state port; datagrams are routed to the right controller
+    by the sender's IP address.
+    """
+
+    def __init__(self, command_endpoint, state_endpoint):
+        self.command = command_endpoint
+        self.state = state_endpoint
+
+    @classmethod
+    async def open(cls, local_command_port=0, state_port=STATE_PORT):
+        """Bind the shared endpoints."""
+        command = await open_endpoint(local_command_port)
+        state = await open_endpoint(state_port)
+        return cls(command, state)
+
+    def close(self):
+        """Close the shared endpoints."""
+        for endpoint in (self.command, self.state):
+            if endpoint.transport is not None:
+                endpoint.transport.close()
+
+
+class AsyncTelloController:
+    """Coroutine API for one Tello, running entirely on the event loop.
+
+    Commands go out over a UDP datagram endpoint and each awaits its own
+    response future, so cancelling a coroutine cancels just that wait.
+    State packets and video datagrams arrive on their own endpoints and are
+    exposed as async iterators (telemetry() and frames()). The Tello answers
+    to whatever port a command came from, so the local command port is
+    ephemeral by default. Pass a TelloMux to share sockets between drones.
+
+    Responses carry no request id. When a command times out, its response
+    may still arrive later, so the next command first waits up to
+    `late_response_timeout` seconds for it and discards it. Each drone
+    streams video to its own local `video_port`, and only one frames()
+    iterator may run at a time.
+    """
+
+    def __init__(self, host=TELLO_IP, command_port=COMMAND_PORT, state_port=STATE_PORT,
+                 video_port=VIDEO_PORT, local_command_port=0, response_timeout=7.0, mux=None,
+                 late_response_timeout=1.0):
+        self.host = host
+        self.mux = mux
+        self.command_port = command_port
+        self.state_port = state_port
+        self.video_port = video_port
+        self.local_command_port = local_command_port
+        self.response_timeout = response_timeout
+        self.late_response_timeout = late_response_timeout
+        self.connected = False
+        self._command_endpoint = None
+        self._state_endpoint = None
+        self._video_endpoint = None
+        self._response = None
+        self._late_response = None
+        self._command_lock = None
+        self._snapshot = None
+        self._sequence = 0
+        self._state_event = None
+        self._telemetry_queues = []
+        self._video_queue = None
+        self._decoding = False
+        self._owns_mux = False
+
+    async def connect(self, wait_for_state=True):
+        """Open the UDP endpoints and enter SDK mode."""
+        self._command_lock = asyncio.Lock()
+        self._state_event = asyncio.Event()
+        if self._command_endpoint is None:
+            if self.mux is None:
+                self.mux = await TelloMux.open(self.local_command_port, self.state_port)
+                self._owns_mux = True
+            self._command_endpoint = self.mux.command
+            self._state_endpoint = self.mux.state
+        self._command_endpoint.handlers[self.host] = self._on_response
+        self._state_endpoint.handlers[self.host] = self._on_state
+
+        await self.send_control_command('command')
+        if wait_for_state:
+            try:
+                await asyncio.wait_for(self._state_event.wait(), 2)
+            except asyncio.TimeoutError:
+                raise AsyncTelloError('Did not receive a state packet from the Tello')
+        self.connected = True
+        print(f"{self.host} battery: {self._snapshot.battery if self._snapshot else 'N/A'}%")
+        return True
+
+    async def close(self):
+        """Detach from the shared endpoints and close the ones we own."""
+        for endpoint in (self._command_endpoint, self._state_endpoint):
+            if endpoint is not None:
+                endpoint.handlers.pop(self.host, None)
+        if self._video_endpoint is not None:
+            self._video_endpoint.transport.close()
+        if self._owns_mux:
+            self.mux.close()
+            self.mux = None
+            self._owns_mux = False
+        self._command_endpoint = self._state_endpoint = self._video_endpoint = None
+        self.connected = False
+
+    # Datagram handlers
+
+    def _on_response(self, data, address):
+        """Resolve a timed-out command's late response first, then the pending command."""
+        for future in (self._late_response, self._response):
+            if future is not None and not future.done():
+                future.set_result(data.decode('utf-8', errors='replace').strip())
+                return
+
+    def _on_state(self, data, address):
+        """Parse a state packet once into a snapshot and fan it out."""
+        state = Tello.parse_state(data.decode('ASCII', errors='replace'))
+        if not state:
+            return
+        self._sequence += 1
+        self._snapshot = TelemetrySnapshot(time.time(), self._sequence, state)
+        self._state_event.set()
+        for snapshots in self._telemetry_queues:
+            if snapshots.full():
+                snapshots.get_nowait()
+            snapshots.put_nowait(self._snapshot)
+
+    def _on_video(self, data, address):
+        """Queue a raw H.264 datagram for the frame iterator."""
+        if self._video_queue.full():
+            self._video_queue.get_nowait()
+        self._video_queue.put_nowait(data)
+
+    # Commands
+
+    def send_command_without_return(self, command):
+        """Send a command without waiting for a response (e.g. rc)."""
+        self._command_endpoint.transport.sendto(command.encode('utf-8'), (self.host, self.command_port))
+
+    async def send_command(self, command, timeout=None):
+        """Send a command and return the drone's response text."""
+        async with self._command_lock:
+            await self._drain_late_response()
+            loop = asyncio.get_running_loop()
+            self._response = loop.create_future()
+            self.send_command_without_return(command)
+            try:
+                # Shielded so the future outlives a timeout and can catch the late reply
+                return await asyncio.wait_for(asyncio.shield(self._response), timeout or self.response_timeout)
+            except asyncio.TimeoutError:
+                self._late_response = self._response
+                raise AsyncTelloError(f"No response to '{command}'")
+            finally:
+                self._response = None
+
+    async def _drain_late_response(self):
+        """Wait briefly for a timed-out command's response so it cannot answer the next one."""
+        if self._late_response is None:
+            return
+        try:
+            response = await asyncio.wait_for(self._late_response, self.late_response_timeout)
+            print(f"⚠️  {self.host}: discarded late response '{response}'")
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._late_response = None
+
+    async def send_control_command(self, command, timeout=None):
+        """Send a command that must be acknowledged with 'ok'."""
+        response = await self.send_command(command, timeout)
+        if response.lower() != 'ok':
+            raise AsyncTelloError(f"Command '{command}' failed: {response}")
+        return True
+
+    async def takeoff(self):
+        """Take off the drone."""
+        await self.send_control_command('takeoff', timeout=20)
+        print("Drone took off")
+
+    async def land(self):
+        """Land the drone."""
+        await self.send_control_command('land', timeout=20)
+        print("Drone landed")
+
+    async def emergency(self):
+        """Stop all motors immediately."""
+        self.send_command_without_return('emergency')
+
+    async def move(self, direction, distance):
+        """Move `distance` cm (20-500) in 'up', 'down', 'left', 'right', 'forward' or 'back'."""
+        await self.send_control_command(f"{direction} {distance}")
+
+    async def move_forward(self, distance):
+        """Move forward by distance (cm)."""
+        await self.move('forward', distance)
+
+    async def move_back(self, distance):
+        """Move backward by distance (cm)."""
+        await self.move('back', distance)
+
+    async def move_left(self, distance):
+        """Move left by distance (cm)."""
+        await self.move('left', distance)
+
+    async def move_right(self, distance):
+        """Move right by distance (cm)."""
+        await self.move('right', distance)
+
+    async def move_up(self, distance):
+        """Move up by distance (cm)."""
+        await self.move('up', distance)
+
+    async def move_down(self, distance):
+        """Move down by distance (cm)."""
+        await self.move('down', distance)
+
+    async def rotate_clockwise(self, degrees):
+        """Rotate clockwise by degrees (1-360)."""
+        await self.send_control_command(f"cw {degrees}")
+
+    async def rotate_counter_clockwise(self, degrees):
+        """Rotate counter-clockwise by degrees (1-360)."""
+        await self.send_control_command(f"ccw {degrees}")
+
+    async def flip(self, direction):
+        """Flip in direction 'l', 'r', 'f' or 'b'."""
+        await self.send_control_command(f"flip {direction}")
+
+    async def go_xyz_speed(self, x, y, z, speed):
+        """Fly to x, y, z (cm, relative) at speed cm/s."""
+        await self.send_control_command(f"go {x} {y} {z} {speed}")
+
+    async def curve_xyz_speed(self, x1, y1, z1, x2, y2, z2, speed):
+        """Fly a curve through (x1, y1, z1) to (x2, y2, z2) at speed cm/s."""
+        await self.send_control_command(f"curve {x1} {y1} {z1} {x2} {y2} {z2} {speed}")
+
+    def send_rc_control(self, left_right, forward_backward, up_down, yaw):
+        """Send RC stick values (-100..100); RC commands are not acknowledged."""
+        values = [max(-100, min(100, int(v))) for v in (left_right, forward_backward, up_down, yaw)]
+        self.send_command_without_return('rc {} {} {} {}'.format(*values))
+
+    # Status, telemetry and video
+
+    def snapshot(self):
+        """Latest TelemetrySnapshot, or None before the first state packet."""
+        return self._snapshot
+
+    async def get_status(self):
+        """Get drone status information."""
+        if self._snapshot is None:
+            return None
+        return {
+            'battery': self._snapshot.battery,
+            'height': self._snapshot.height,
+            'temperature': self._snapshot.temperature,
+            'speed': self._snapshot.speed_x
+        }
+
+    async def telemetry(self, maxsize=100):
+        """Async iterator over every new TelemetrySnapshot."""
+        snapshots = asyncio.Queue(maxsize=maxsize)
+        self._telemetry_queues.append(snapshots)
+        try:
+            while True:
+                yield await snapshots.get()
+        finally:
+            self._telemetry_queues.remove(snapshots)
+
+    async def streamon(self):
+        """Turn on the video stream and start receiving datagrams."""
+        if self._video_endpoint is None:
+            try:
+                self._video_endpoint = await open_endpoint(self.video_port)
+            except OSError as e:
+                raise AsyncTelloError(f"Video port {self.video_port} is unavailable ({e.strerror or e}); "
+                                      f"give each drone its own video_port")
+            self._video_queue = asyncio.Queue(maxsize=256)
+            self._video_endpoint.handlers[self.host] = self._on_video
+        await self.send_control_command('streamon')
+
+    async def streamoff(self):
+        """Turn off the video stream."""
+        await self.send_control_command('streamoff')
+        if self._video_endpoint is not None:
+            self._video_endpoint.transport.close()
+            self._video_endpoint = None
+
+    async def frames(self):
+        """Async iterator over decoded BGR frames (numpy arrays).
+
+        Decoding uses PyAV, which djitellopy already depends on, and runs in
+        the loop's executor so it never blocks the event loop. Datagrams
+        that queued up meanwhile are decoded together.
+        """
+        if self._video_queue is None:
+            raise AsyncTelloError("Call streamon() before frames()")
+        if self._decoding:
+            raise AsyncTelloError(f"{self.host} already has a frames() consumer")
+        self._decoding = True
+        loop = asyncio.get_running_loop()
+        codec = av.CodecContext.create('h264', 'r')
+        try:
+            while True:
+                chunks = [await self._video_queue.get()]
+                while not self._video_queue.empty():
+                    chunks.append(self._video_queue.get_nowait())
+                for frame in await loop.run_in_executor(None, _decode, codec, b''.join(chunks)):
+                    yield frame
+        finally:
+            self._decoding = False
@@ -0,0 +1,267 @@
+"""
+Declarative command registry: argument specs, guards and O(1) dispatch.
+"""
+
+import collections
+import os
+
+ParsedCommand = collections.namedtuple('ParsedCommand', ['spec', 'args', 'line'])
+
+ScriptError = collections.namedtuple('ScriptError', ['lineno', 'line', 'message'])
+
+
+class CommandError(ValueError):
+    """A command line that cannot be parsed or is not allowed right now."""
+
+
+class ArgSpec:
+    """One positional argument of a command.
+
+    `type` converts the token (int, float or str). `low`/`high` bound
+    numeric values: out-of-range values are clamped with a note, or
+    rejected when parsing strictly (scripts). `choices` restricts the
+    accepted tokens. Arguments with a default are optional.
+    """
+
+    REQUIRED = object()
+
+    def __init__(self, name, type=int, default=REQUIRED, low=None, high=None, choices=None):
+        self.name = name
+        self.type = type
+        self.default = default
+        self.low = low
+        self.high = high
+        self.choices = choices
+
+    @property
+    def required(self):
+        return self.default is ArgSpec.REQUIRED
+
+    def parse(self, token, strict=False, notes=None):
+        """Convert and validate one token."""
+        if self.choices is not None:
+            token = token.lower()
+        try:
+            value = self.type(token)
+        except ValueError:
+            raise CommandError(f"invalid {self.name} '{token}' (expected {self.type.__name__})")
+        if self.choices is not None and value not in self.choices:
+            raise CommandError(f"invalid {self.name} '{token}' (use: {', '.join(map(str, self.choices))})")
+        if (self.low is not None and value < self.low) or (self.high is not None and value > self.high):
+            if strict:
+                raise CommandError(f"{self.name} {value} out of range {self._range()}")
+            clamped = min(max(value, self.low if self.low is not None else value),
+                          self.high if self.high is not None else value)
+            if notes is not None:
+                notes.append(f"{self.name} {value} clamped to {clamped} {self._range()}")
+            value = clamped
+        return value
+
+    def _range(self):
+        low = '' if self.low is None else self.low
+        high = '' if self.high is None else self.high
+        return f"[{low}..{high}]"
+
+    def usage(self):
+        if self.choices is not None:
+            text = '|'.join(map(str, self.choices))
+        else:
+            text = self.name
+        return f"<{text}>" if self.required else f"[{text}]"
+
+
+class CommandSpec:
+    """A command: its names, arguments, guards and handler.
+
+    `handler(target, *args)` runs the command. `guards` are names from
+    CommandRegistry.GUARDS checked in order before the handler. `flying`
+    is the flight state the command leaves the drone in (True after
+    takeoff, False after land), or None if it does not change it; script
+    checks use it to follow the flight state without flying. A handler
+    that returns False reports failure, which stops a running script.
+    `script=True` marks a command whose first argument is another script,
+    checked together with the one that runs it. `group` is the help heading.
+    """
+
+    def __init__(self, name, handler, args=(), guards=('connected',), aliases=(), flying=None, help='',
+                 group='General', script=False):
+        self.name = name
+        self.handler = handler
+        self.args = tuple(args)
+        self.guards = tuple(guards)
+        self.aliases = tuple(aliases)
+        self.flying = flying
+        self.help = help
+        self.group = group
+        self.script = script
+
+    def parse(self, tokens, strict=False, notes=None):
+        """Convert the argument tokens into handler arguments."""
+        if len(tokens) > len(self.args):
+            raise CommandError(f"too many arguments for '{self.name}' (usage: {self.usage()})")
+        values = []
+        for i, spec in enumerate(self.args):
+            if i < len(tokens):
+                values.append(spec.parse(tokens[i], strict, notes))
+            elif spec.required:
+                raise CommandError(f"missing {spec.name} for '{self.name}' (usage: {self.usage()})")
+            else:
+                values.append(spec.default)
+        return tuple(values)
+
+    def usage(self):
+        return ' '.join([self.name] + [spec.usage() for spec in self.args])
+
+
+class CommandRegistry:
+    """Commands by name and alias, resolved with a single dict lookup.
+
+    Guards are checked by dispatch() against the target (an
+    InteractiveTelloController): 'connected' goes through the connection
+    manager's admit(), so the command policy (fail fast or queue) still
+    applies; 'flying' and 'landed' check the target's flight flag.
+    """
+
+    GUARDS = ('connected', 'flying', 'landed')
+
+    def __init__(self, specs=()):
+        self._table = {}
+        self.specs = []
+        for spec in specs:
+            self.add(spec)
+
+    def add(self, spec):
+        """Register a command under its name and aliases."""
+        unknown = set(spec.guards) - set(self.GUARDS)
+        if unknown:
+            raise ValueError(f"Unknown guard(s) for '{spec.name}': {', '.join(sorted(unknown))}")
+        for name in (spec.name,) + spec.aliases:
+            if name in self._table:
+                raise ValueError(f"Command '{name}' is already registered")
+            self._table[name] = spec
+        self.specs.append(spec)
+        return spec
+
+    def get(self, name):
+        return self._table.get(name)
+
+    def __contains__(self, name):
+        return name in self._table
+
+    def parse(self, line, strict=False, notes=None):
+        """Parse one command line into a ParsedCommand, or None for a blank line."""
+        line = line.strip()
+        tokens = line.split()
+        if not tokens:
+            return None
+        spec = self._table.get(tokens[0].lower())
+        if spec is None:
+            raise CommandError(f"unknown command '{tokens[0]}'")
+        return ParsedCommand(spec, spec.parse(tokens[1:], strict, notes), line)
+
+    def check_guards(self, target, parsed):
+        """Return the first failing guard's message, or None."""
+        for guard in parsed.spec.guards:
+            if guard == 'connected' and not target.connection.admit(parsed.line):
+                if target.connection.policy == 'queue':
+                    return f"⏳ Not connected ({target.connection.state}) - command queued until reconnection"
+                return f"❌ Not connected ({target.connection.state}) - command not sent"
+            if guard == 'flying' and not target.flying:
+                return "Must takeoff first!"
+            if guard == 'landed' and target.flying:
+                return "Already flying!"
+        return None
+
+    def dispatch(self, target, parsed):
+        """Run a parsed command on `target` if its guards pass.
+
+        Returns True if it ran, False if a guard refused it or the handler
+        reported failure.
+        """
+        message = self.check_guards(target, parsed)
+        if message:
+            print(message)
+            return False
+        return parsed.spec.handler(target, *parsed.args) is not False
+
+    def parse_script(self, lines, flying=False):
+        """Parse a whole script before anything runs.
+
+        Blank lines and '#' comments are skipped. Arguments are parsed
+        strictly, and the flight state is followed through the script so
+        commands that need the drone in the air (or on the ground) are
+        caught too. Scripts run by `script` lines are checked the same way,
+        in the flight state they start in. Returns (commands, errors) with
+        every error found.
+        """
+        commands, errors, _ = self._check_script(lines, flying, ())
+        return commands, errors
+
+    def load_script(self, path, flying=False):
+        """parse_script() on a file."""
+        with open(path) as f:
+            commands, errors, _ = self._check_script(f, flying, (os.path.abspath(path),))
+        return commands, errors
+
+    def _check_script(self, lines, flying, stack):
+        """parse_script() that also returns the final flight state; `stack` holds the open scripts."""
+        commands = []
+        errors = []
+        for lineno, line in enumerate(lines, 1):
+            text = line.split('#', 1)[0].strip()
+            if not text:
+                continue
+            try:
+                parsed = self.parse(text, strict=True)
+            except CommandError as e:
+                errors.append(ScriptError(lineno, line.rstrip('\n'), str(e)))
+                continue
+            guards = parsed.spec.guards
+            if 'flying' in guards and not flying:
+                errors.append(ScriptError(lineno, text, f"'{parsed.spec.name}' before takeoff"))
+            elif 'landed' in guards and flying:
+                errors.append(ScriptError(lineno, text, f"'{parsed.spec.name}' while already flying"))
+            if parsed.spec.flying is not None:
+                flying = parsed.spec.flying
+            if parsed.spec.script:
+                flying = self._check_nested(lineno, text, parsed.args[0], flying, stack, errors)
+            commands.append((lineno, parsed))
+        return commands, errors, flying
+
+    def _check_nested(self, lineno, text, path, flying, stack, errors):
+        """Check a script run from line `lineno`; returns the flight state after it."""
+        resolved = os.path.abspath(path)
+        if resolved in stack:
+            errors.append(ScriptError(lineno, text, f"script {path} runs itself"))
+            return flying
+        try:
+            with open(path) as f:
+                _, nested, flying = self._check_script(f, flying, stack + (resolved,))
+        except OSError as e:
+            errors.append(ScriptError(lineno, text, f"cannot read {path}: {e.strerror or e}"))
+            return flying
+        errors.extend(ScriptError(lineno, text, f"{path} line {error.lineno}: {error.message}")
+                      for error in nested)
+        return flying
+
+    def help_lines(self):
+        """'usage - help' lines under their group headings, in registration order."""
+        labels = [' '.join(['/'.join((spec.name,) + spec.aliases)] + [arg.usage() for arg in spec.args])
+                  for spec in self.specs]
+        width = min(max(map(len, labels)), 24) if labels else 0
+        groups = collections.OrderedDict()
+        for label, spec in zip(labels, self.specs):
+            groups.setdefault(spec.group, []).append(f"  {label:<{width}}  - {spec.help}")
+        lines = []
+        for group, entries in groups.items():
+            lines.append(f"{group}:")
+            lines.extend(entries)
+        return lines
+
+
+def print_script_errors(path, errors):
+    """Report every error found by parse_script()."""
+    print(f"❌ {len(errors)} error(s) in {path} - nothing was run")
+    for error in errors:
+        print(f"  line {error.lineno}: {error.message}")
+        print(f"      {error.line.strip()}")
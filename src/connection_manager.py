@@ -0,0 +1,198 @@
+"""
+Background connection management for the Tello link.
+"""
+
+import collections
+import random
+import threading
+import time
+
+CONNECTED = 'connected'
+DEGRADED = 'degraded'
+RECONNECTING = 'reconnecting'
+LOST = 'lost'
+
+POLICIES = ('fail_fast', 'queue')
+
+
+class ConnectionManager:
+    """Owns reconnection so callers never block on a dead link.
+
+    States: connected -> degraded (link went quiet) -> reconnecting (grace
+    period over, retrying with jittered exponential backoff) -> lost (gave
+    up after `max_attempts`). Any sign of life returns to connected.
+    Callers use is_connected() to fail fast, admit() to apply the command
+    policy, or wait_connected(timeout) to wait without polling. Queued
+    commands older than `queue_ttl` seconds when the link comes back are
+    dropped rather than replayed.
+    """
+
+    def __init__(self, reconnect, degraded_grace=1.0, base_delay=0.5, max_delay=10.0,
+                 max_attempts=8, policy='fail_fast', max_queue=10, queue_ttl=5.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown command policy: {policy}")
+        self.reconnect = reconnect
+        self.degraded_grace = degraded_grace
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.policy = policy
+        self.queue_ttl = queue_ttl
+        self.state = LOST
+        self.attempts = 0
+        self.pending = collections.deque(maxlen=max_queue)
+        self._cond = threading.Condition()
+        self._connected = threading.Event()
+        self._state_handlers = []
+        self._reconnected_handlers = []
+        self._degraded_since = None
+        self._next_attempt = None
+        self._thread = None
+        self.running = False
+
+    def on_state_change(self, callback):
+        """Call `callback(old_state, new_state)` on every transition."""
+        self._state_handlers.append(callback)
+
+    def on_reconnected(self, callback):
+        """Call `callback(pending_commands)` after the link comes back (stale ones removed)."""
+        self._reconnected_handlers.append(callback)
+
+    def start(self):
+        """Start the manager thread."""
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop the manager thread."""
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def is_connected(self):
+        """True while the link is up."""
+        return self.state == CONNECTED
+
+    def wait_connected(self, timeout=None):
+        """Wait up to `timeout` seconds for the link. Returns True if connected."""
+        return self._connected.wait(timeout)
+
+    def admit(self, command):
+        """Decide whether a command may run now.
+
+        Returns True when connected. Otherwise the command is rejected, or
+        with the 'queue' policy kept for on_reconnected handlers.
+        """
+        if self.is_connected():
+            return True
+        if self.policy == 'queue':
+            with self._cond:
+                self.pending.append((time.monotonic(), command))
+        return False
+
+    def link_up(self):
+        """Report that the link is alive (state packets are arriving)."""
+        with self._cond:
+            if self.state == CONNECTED:
+                return
+            self._set_state(CONNECTED)
+            self.attempts = 0
+            now = time.monotonic()
+            pending = [command for queued_at, command in self.pending if now - queued_at <= self.queue_ttl]
+            dropped = len(self.pending) - len(pending)
+            self.pending.clear()
+            self._cond.notify_all()
+        if dropped:
+            print(f"⌛ Dropped {dropped} queued command(s) older than {self.queue_ttl:g}s")
+        for handler in list(self._reconnected_handlers):
+            try:
+                handler(pending)
+            except Exception as e:
+                print(f"Reconnect handler error: {e}")
+
+    def link_down(self):
+        """Report that the link went quiet."""
+        with self._cond:
+            if self.state == CONNECTED:
+                self._degraded_since = time.monotonic()
+                self._set_state(DEGRADED)
+                self._cond.notify_all()
+
+    def request_reconnect(self):
+        """Start reconnecting right away (also restarts after giving up)."""
+        with self._cond:
+            self.attempts = 0
+            self._next_attempt = time.monotonic()
+            self._set_state(RECONNECTING)
+            self._cond.notify_all()
+
+    def backoff(self, attempts):
+        """Delay before the next attempt: exponential, capped, with jitter."""
+        delay = min(self.max_delay, self.base_delay * (2 ** max(0, attempts - 1)))
+        return delay * (0.5 + random.random() * 0.5)
+
+    def _set_state(self, state):
+        """Switch state (caller holds the condition lock) and notify handlers."""
+        old = self.state
+        if old == state:
+            return
+        self.state = state
+        if state == CONNECTED:
+            self._connected.set()
+        else:
+            self._connected.clear()
+        for handler in list(self._state_handlers):
+            try:
+                handler(old, state)
+            except Exception as e:
+                print(f"Connection state handler error: {e}")
+
+    def _run(self):
+        """Manager thread: escalate degraded links and retry with backoff."""
+        while self.running:
+            attempt = False
+            with self._cond:
+                now = time.monotonic()
+                timeout = None
+                if self.state == DEGRADED:
+                    remaining = self._degraded_since + self.degraded_grace - now
+                    if remaining <= 0:
+                        self._next_attempt = now
+                        self._set_state(RECONNECTING)
+                    else:
+                        timeout = remaining
+                if self.state == RECONNECTING:
+                    remaining = self._next_attempt - now
+                    if remaining <= 0:
+                        attempt = True
+                    else:
+                        timeout = remaining
+                if not attempt:
+                    self._cond.wait(timeout)
+                    continue
+
+            # Reconnect outside the lock so link_up()/link_down() never block
+            ok = False
+            try:
+                ok = self.reconnect()
+            except Exception as e:
+                print(f"Reconnection error: {e}")
+
+            if ok:
+                self.link_up()
+                continue
+            with self._cond:
+                if self.state != RECONNECTING:
+                    continue
+                self.attempts += 1
+                if self.attempts >= self.max_attempts:
+                    self._set_state(LOST)
+                else:
+                    self._next_attempt = time.monotonic() + self.backoff(self.attempts)
@@ -1,4 +1,3 @@
-<<<<<<< HEAD
 #!/usr/bin/env python3
 """
 General flight controller for DJI Tello drone.
@@ -13,21 +12,50 @@ import cv2
 import time
 import threading
 from tello_controller import TelloController
-from utils import safe_delay, check_battery_level, emergency_stop
+from hud import HudRenderer
+from frame_buffer import FrameRing, FramePacer, FrameView
+from photo_writer import PhotoWriter
+from flight_state import FlightStateEstimator, AIRBORNE, LANDED, CRASH
+from connection_manager import ConnectionManager, CONNECTED, DEGRADED, RECONNECTING, LOST
+from video_recorder import VideoRecorder
+from rc_follower import RCFollower, line_setpoints, DIRECTIONS
+from flight_recorder import FlightRecorder
+from commands import ArgSpec, CommandSpec, CommandRegistry, CommandError, print_script_errors
+from utils import safe_delay, emergency_stop
+
+# Pauses after takeoff (IMU stabilization), land and emergency, in seconds
+TAKEOFF_SETTLE = 5
+LAND_SETTLE = 3
+EMERGENCY_SETTLE = 2
 
 class InteractiveTelloController:
     """Interactive controller with camera and command input."""
     
-    def __init__(self):
-        self.controller = TelloController()
+    def __init__(self, display_fps=30, headless=False, command_policy='fail_fast', tello=None,
+                 photos_dir=None, flights_dir=None):
+        self.controller = TelloController(tello=tello)
+        root = os.path.join(os.path.dirname(__file__), '..')
         self.flying = False
         self.streaming = False
         self.running = True
-        self.frame = None
+        self.frames = FrameRing(size=4)
+        self.display_fps = display_fps
+        self.display_pacer = None
+        self.headless = headless
+        self.frame_consumers = []
+        self.raw_frame_consumers = []
+        self.recorder = None
+        self.photos = PhotoWriter(photos_dir or os.path.join(root, 'photos'))
+        self.photo_burst = None
         self.connected = False
-        self.last_height = 0
-        self.connection_lost_count = 0
+        self.flight_state = FlightStateEstimator()
         self.monitoring = False
+        self.connection = ConnectionManager(self.controller.reconnect, policy=command_policy)
+        self.connection.on_state_change(self._on_connection_state)
+        self.connection.on_reconnected(self._run_pending_commands)
+        self.hud = HudRenderer(self.controller.telemetry, rate_hz=10)
+        self.rc_follower = RCFollower(self.controller, rate_hz=30)
+        self.flight_log = FlightRecorder(flights_dir or os.path.join(root, 'flights'))
         
     def start_video_stream(self):
         """Start video streaming in a separate thread."""
@@ -39,57 +67,25 @@ class InteractiveTelloController:
             
             frame_reader = self.controller.tello.get_frame_read()
             
+            if self.headless:
+                # No window: frames only go to the registered consumers
+                print("Headless mode - no video window (use 'quit' to exit)")
+                self._publish_frames(frame_reader)
+                return
+            
+            # Publish decoded frames from their own thread; display waits on them
+            decode_thread = threading.Thread(target=self._publish_frames, args=(frame_reader,))
+            decode_thread.daemon = True
+            decode_thread.start()
+            
+            self.display_pacer = FramePacer(self.frames, target_fps=self.display_fps)
+            
             while self.streaming and self.running:
                 try:
-                    current_frame = frame_reader.frame
-                    if current_frame is not None:
-                        self.frame = current_frame.copy()
-                        
-                        # Add status overlay with enhanced sensor data
-                        try:
-                            battery = self.controller.tello.get_battery()
-                            height = self.controller.tello.get_height()
-                            distance_tof = self.controller.tello.get_distance_tof()
-                            
-                            # Main status line
-                            status_text = f"Flying: {self.flying} | Battery: {battery}%"
-                            
-                            # Height and ToF sensor data
-                            height_text = f"Height: {height}cm | ToF Distance: {distance_tof}cm"
-                            
-                            # Additional flight info
-                            try:
-                                pitch = self.controller.tello.get_pitch()
-                                roll = self.controller.tello.get_roll()
-                                attitude_text = f"Pitch: {pitch:.1f}° | Roll: {roll:.1f}°"
-                            except:
-                                attitude_text = "Attitude: N/A"
-                            
-                        except Exception as e:
-                            # Fallback if sensor readings fail
-                            status_text = f"Flying: {self.flying} | Battery: N/A"
-                            height_text = f"Height: N/A | ToF Distance: N/A"
-                            attitude_text = "Sensors: Error"
-                        
-                        # Draw overlay with better formatting
-                        cv2.putText(self.frame, status_text, (10, 30), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                        cv2.putText(self.frame, height_text, (10, 55), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                        cv2.putText(self.frame, attitude_text, (10, 80), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                        
-                        # Add ToF distance warning if too close to ground
-                        try:
-                            if distance_tof < 50:  # Warning if less than 50cm from ground
-                                warning_text = "⚠️ LOW ALTITUDE WARNING!"
-                                cv2.putText(self.frame, warning_text, (10, 110), 
-                                          cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)  # Red text
-                        except:
-                            pass
-                        
-                        # Display frame
-                        cv2.imshow('Tello Camera Feed', self.frame)
+                    # Sleeps until a new frame sequence is published
+                    view = self.display_pacer.next_frame(timeout=0.1)
+                    if view is not None:
+                        cv2.imshow('Tello Camera Feed', view.frame)
                         
                     # Non-blocking key check
                     key = cv2.waitKey(1) & 0xFF
@@ -105,856 +101,427 @@ class InteractiveTelloController:
             print(f"Failed to start video stream: {e}")
             self.streaming = False
     
+    def _publish_frames(self, frame_reader):
+        """Publish each newly decoded frame into the frame ring."""
+        last_frame = None
+        while self.streaming and self.running:
+            try:
+                # djitellopy replaces the frame array on every decode
+                current_frame = frame_reader.frame
+                if current_frame is None or current_frame is last_frame:
+                    time.sleep(0.002)
+                    continue
+                last_frame = current_frame
+                self._publish_frame(current_frame)
+                
+            except Exception as e:
+                print(f"Frame decode error: {e}")
+                time.sleep(0.1)
+    
+    def _publish_frame(self, frame, now=None):
+        """Publish one decoded frame to the ring and the frame consumers."""
+        if self.headless:
+            # Nobody is watching - skip the HUD overlay entirely
+            view = self.frames.publish(frame)
+        else:
+            # Status overlay text is refreshed at the HUD rate, not per frame
+            self.hud.update(self.flying, now)
+            
+            # Copy into the next ring slot and composite the HUD there
+            view = self.frames.publish(frame, overlay=self.hud.draw)
+        self._dispatch_frame(view, frame)
+        return view
+    
+    def add_frame_consumer(self, consumer, with_hud=True):
+        """Register a callable that receives every published FrameView.
+        
+        With with_hud=False the consumer gets the clean decoded frame instead
+        of the one with the HUD composited. Consumers run on the frame
+        publisher thread and must not block; hand the frame off to a queue
+        for anything slow.
+        """
+        consumers = self.frame_consumers if with_hud else self.raw_frame_consumers
+        if consumer not in consumers:
+            consumers.append(consumer)
+    
+    def remove_frame_consumer(self, consumer):
+        """Unregister a frame consumer."""
+        for consumers in (self.frame_consumers, self.raw_frame_consumers):
+            if consumer in consumers:
+                consumers.remove(consumer)
+    
+    def _dispatch_frame(self, view, raw_frame):
+        """Hand a published frame to every registered consumer."""
+        deliveries = [(consumer, view) for consumer in self.frame_consumers]
+        if self.raw_frame_consumers:
+            # djitellopy never reuses a decoded array, so no copy is needed
+            raw = raw_frame.view()
+            raw.flags.writeable = False
+            raw_view = FrameView(raw, view.sequence, view.timestamp)
+            deliveries += [(consumer, raw_view) for consumer in self.raw_frame_consumers]
+        
+        for consumer, frame_view in deliveries:
+            try:
+                consumer(frame_view)
+            except Exception as e:
+                print(f"Frame consumer error: {e}")
+    
+    def start_recording(self, with_hud=False, segment_seconds=60):
+        """Start recording the video stream to segmented files."""
+        if self.recorder is not None and self.recorder.recording:
+            print("Already recording!")
+            return
+        # A recorder whose encoder failed still holds its consumer and thread
+        self.stop_recording()
+        videos_dir = os.path.join(os.path.dirname(__file__), '..', 'videos')
+        # Ring slots get reused, so HUD frames must be copied before queueing
+        self.recorder = VideoRecorder(videos_dir, segment_seconds=segment_seconds,
+                                      copy_frames=with_hud)
+        self.recorder.start()
+        self.add_frame_consumer(self.recorder.submit, with_hud=with_hud)
+        print(f"🎥 Recording started ({'with' if with_hud else 'without'} HUD)")
+    
+    def stop_recording(self):
+        """Stop recording and close the current segment (also after an encoder error)."""
+        if self.recorder is None:
+            return
+        self.remove_frame_consumer(self.recorder.submit)
+        self.recorder.stop()
+        recorder, self.recorder = self.recorder, None
+        print(f"🎥 Recording stopped: {recorder.recorded} frames, "
+              f"{recorder.dropped} dropped, {len(recorder.segments)} segment(s)")
+    
+    def start_flight_log(self):
+        """Record telemetry, commands and frame timestamps for this flight."""
+        if self.flight_log.recording:
+            return
+        self.flight_log.start()
+        self.flight_log.attach(self.controller.hub, self.controller.link)
+        self.add_frame_consumer(self.flight_log.record_frame, with_hud=False)
+    
+    def stop_flight_log(self):
+        """Close the flight log."""
+        if not self.flight_log.recording:
+            return
+        self.remove_frame_consumer(self.flight_log.record_frame)
+        self.flight_log.stop()
+    
     def stop_video_stream(self):
         """Stop video streaming."""
         if self.streaming:
             self.streaming = False
             self.controller.tello.streamoff()
-            cv2.destroyAllWindows()
+            if not self.headless:
+                cv2.destroyAllWindows()
             print("Video stream stopped.")
+            if self.display_pacer is not None:
+                stats = self.display_pacer.stats()
+                print(f"Display: {stats['shown']} shown, {stats['dropped']} dropped, "
+                      f"{stats['duplicated']} duplicated")
     
     def check_connection(self):
-        """Check if drone is still connected and responsive."""
-        try:
-            # Try to get battery - this is a simple command to test connection
-            battery = self.controller.tello.get_battery()
-            if battery > 0:
-                self.connected = True
-                self.connection_lost_count = 0
-                return True
-        except Exception:
-            pass
-        
-        self.connection_lost_count += 1
-        if self.connection_lost_count > 3:
-            self.connected = False
-        return False
+        """Check if drone is still connected, i.e. state packets are arriving."""
+        return self.connection.is_connected()
     
     def check_flight_state(self):
-        """Check if drone is actually flying by checking height."""
-        try:
-            height = self.controller.tello.get_height()
-            previous_height = self.last_height
-            self.last_height = height
-            
-            # If height is very low (< 10cm) and we think we're flying, we probably crashed
-            if self.flying and height < 10:
-                print(f"\n⚠️  CRASH DETECTED! Height: {height}cm - Drone has landed!")
-                print("   Updating flight state to: LANDED")
-                self.flying = False
-                
-                # Immediate user notification
-                print("\n🔄 You can now:")
-                print("   - Type 'takeoff' to fly again")
-                print("   - Type 'status' to check drone condition")
-                print("   - Type 'reconnect' if connection seems lost")
-                return False
-            
-            # If height is reasonable (> 30cm) and we think we're not flying, maybe we are
-            elif not self.flying and height > 30:
-                print(f"\n⚠️  UNEXPECTED FLIGHT! Height: {height}cm - Drone is airborne!")
-                print("   Updating flight state to: FLYING")
-                self.flying = True
-                return True
+        """Check if drone is actually flying, according to the flight-state estimator."""
+        state = self.flight_state.state
+        if state == AIRBORNE:
+            self.flying = True
+        elif state == LANDED:
+            self.flying = False
+        return self.flying
+    
+    def _handle_flight_event(self, event):
+        """React to a landed/airborne/crash event from the estimator."""
+        if event.kind == CRASH:
+            # Reported even while landing on purpose: a hard landing is still a crash
+            print(f"\n⚠️  CRASH DETECTED! Height: {event.height}cm ({event.detail}) - Drone has landed!")
+            print("   Updating flight state to: LANDED")
+            self.flying = False
             
-            # Check for significant height changes that might indicate issues
-            elif self.flying and previous_height > 0:
-                height_change = abs(height - previous_height)
-                if height_change > 50:  # Sudden height change > 50cm
-                    print(f"⚠️  Sudden height change: {previous_height}cm → {height}cm")
-                
-            return self.flying
-            
-        except Exception as e:
-            print(f"Could not check flight state: {e}")
-            return self.flying
+            # Immediate user notification
+            print("\n🔄 You can now:")
+            print("   - Type 'takeoff' to fly again")
+            print("   - Type 'status' to check drone condition")
+            print("   - Type 'reconnect' if connection seems lost")
+        
+        elif event.kind in (LANDED, CRASH) and self.flying:
+            print(f"\n⚠️  Drone has landed! Height: {event.height}cm")
+            print("   Updating flight state to: LANDED")
+            self.flying = False
+        
+        elif event.kind == AIRBORNE and not self.flying:
+            print(f"\n⚠️  UNEXPECTED FLIGHT! Height: {event.height}cm - Drone is airborne!")
+            print("   Updating flight state to: FLYING")
+            self.flying = True
+    
+    def attempt_reconnection(self, timeout=10):
+        """Ask the connection manager to reconnect and wait up to `timeout` seconds."""
+        print("🔄 Attempting to reconnect...")
+        self.connection.start()
+        self.connection.request_reconnect()
+        
+        if self.connection.wait_connected(timeout):
+            print("✅ Reconnection successful!")
+            # Check actual flight state after reconnection
+            self.check_flight_state()
+            return True
+        
+        print(f"❌ Reconnection failed (state: {self.connection.state})")
+        return False
     
-    def attempt_reconnection(self):
-        """Attempt to reconnect to the drone."""
-        print("🔄 Connection lost - attempting to reconnect...")
+    def _on_connection_state(self, old_state, new_state):
+        """Report connection state transitions from the connection manager."""
+        self.connected = new_state == CONNECTED
+        if new_state == DEGRADED:
+            print("\n⚠️  Link degraded - waiting for telemetry...")
+        elif new_state == RECONNECTING:
+            print("\n🔄 Connection lost - reconnecting in background...")
+        elif new_state == LOST:
+            print("\n❌ Connection lost - type 'reconnect' to retry")
+        elif self.monitoring:
+            print("\n✅ Connection restored")
+    
+    def _run_pending_commands(self, commands):
+        """Replay commands queued while the link was down."""
+        if not commands:
+            return
         
-        try:
-            # Disconnect and reconnect
-            self.controller.disconnect()
-            time.sleep(2)
-            
-            if self.controller.connect():
-                print("✅ Reconnection successful!")
-                self.connected = True
-                self.connection_lost_count = 0
-                
-                # Check actual flight state after reconnection
-                self.check_flight_state()
-                return True
-            else:
-                print("❌ Reconnection failed")
-                return False
-                
-        except Exception as e:
-            print(f"Reconnection error: {e}")
-            return False
-    
-    def monitor_connection_and_state(self):
-        """Background monitoring of connection and flight state."""
-        while self.monitoring and self.running:
-            try:
-                # Check connection every 2 seconds (faster than before)
-                if not self.check_connection():
-                    if not self.attempt_reconnection():
-                        print("⚠️  Multiple reconnection attempts failed")
-                        # Don't break - keep trying
-                
-                # Check flight state more frequently (every 1 second when flying)
-                if self.flying:
-                    self.check_flight_state()
-                    time.sleep(1)  # Check more often when flying
-                else:
-                    self.check_flight_state()
-                    time.sleep(2)  # Check less often when landed
-                
-            except Exception as e:
-                print(f"Monitoring error: {e}")
-                time.sleep(2)  # Shorter retry time
-    
-    def start_monitoring(self):
-        """Start background monitoring thread."""
+        def run():
+            for command in commands:
+                print(f"\n▶️  Running queued command: {command}")
+                self.execute_command(command)
+        
+        # Called from the telemetry/connection threads, so run elsewhere
+        pending_thread = threading.Thread(target=run)
+        pending_thread.daemon = True
+        pending_thread.start()
+    
+    def _on_telemetry(self, snapshot):
+        """Health checks run by the telemetry hub on every state packet."""
+        self.connection.link_up()
+        for event in self.flight_state.update(snapshot):
+            self._handle_flight_event(event)
+    
+    def _on_link_silent(self, seconds):
+        """Called by the telemetry hub when state packets stop arriving."""
+        print(f"\n⚠️  No telemetry for {seconds:.1f}s")
+        self.connection.link_down()
+    
+    def start_monitoring(self, background=True):
+        """Start event-driven monitoring on the telemetry hub.
+        
+        With background=False the handlers are attached but neither the hub
+        thread nor the connection manager is started; the caller drives the
+        hub with poll_once() (used by replay).
+        """
         if not self.monitoring:
             self.monitoring = True
-            monitor_thread = threading.Thread(target=self.monitor_connection_and_state)
-            monitor_thread.daemon = True
-            monitor_thread.start()
+            hub = self.controller.hub
+            hub.subscribe(self._on_telemetry)
+            hub.on_silence(self._on_link_silent)
+            if background:
+                hub.start()
+                self.connection.start()
             print("📡 Connection and state monitoring started")
     
     def execute_command(self, command):
-        """Execute a flight command with error handling."""
-        command = command.lower().strip()
-        parts = command.split()
-        
-        if not parts:
-            return
-            
-        cmd = parts[0]
-        
-        # Check connection before executing commands
-        if cmd not in ['help', '?', 'quit', 'exit', 'q', 'status', 'reconnect']:
-            if not self.connected:
-                print("❌ Not connected to drone! Attempting reconnection...")
-                if not self.attempt_reconnection():
-                    print("Cannot execute command - no connection")
-                    return
-        
+        """Parse and execute one command line with error handling."""
+        notes = []
         try:
-            # Flight control commands
-            if cmd == "takeoff":
-                if not self.flying:
-                    print("Taking off...")
-                    self.controller.takeoff()
-                    safe_delay(5)  # Wait for IMU stabilization
-                    
-                    # Verify takeoff was successful by checking height
-                    if self.check_flight_state():
-                        print("✅ Takeoff successful!")
-                    else:
-                        print("⚠️  Takeoff may have failed - check drone status")
-                else:
-                    print("Already flying!")
-                    
-            elif cmd == "land":
-                if self.flying:
-                    print("Landing...")
-                    self.controller.land()
-                    safe_delay(3)
-                    
-                    # Verify landing by checking height
-                    if not self.check_flight_state():
-                        print("✅ Landed successfully!")
-                    else:
-                        print("⚠️  Landing may have failed - drone still airborne")
-                else:
-                    print("Not flying!")
-                    
-            elif cmd == "emergency":
-                print("🚨 EMERGENCY STOP!")
-                emergency_stop(self.controller.tello)
-                self.flying = False
-                safe_delay(2)
-                self.check_flight_state()  # Update actual state
-                
-            elif cmd == "reconnect":
-                print("Manual reconnection requested...")
-                self.attempt_reconnection()
-                return
-                
-            # Movement commands (require distance parameter)
-            elif cmd in ["forward", "back", "left", "right", "up", "down"]:
-                if not self.flying:
-                    print("Must takeoff first!")
-                    return
-                    
-                distance = 50  # default
-                if len(parts) > 1:
-                    try:
-                        distance = int(parts[1])
-                        distance = max(20, min(distance, 500))  # Clamp between 20-500cm
-                    except ValueError:
-                        print("Invalid distance, using 50cm")
-                
-                print(f"Moving {cmd} {distance}cm...")
-                self._try_movement(cmd, distance)
-                
-            # Rotation commands
-            elif cmd in ["cw", "ccw", "rotate"]:
-                if not self.flying:
-                    print("Must takeoff first!")
-                    return
-                    
-                degrees = 90  # default
-                if len(parts) > 1:
-                    try:
-                        degrees = int(parts[1])
-                        degrees = max(1, min(degrees, 360))  # Clamp between 1-360
-                    except ValueError:
-                        print("Invalid degrees, using 90")
-                
-                if cmd == "cw" or (cmd == "rotate" and len(parts) > 2 and parts[2] == "cw"):
-                    print(f"Rotating clockwise {degrees} degrees...")
-                    self.controller.tello.rotate_clockwise(degrees)
-                else:
-                    print(f"Rotating counter-clockwise {degrees} degrees...")
-                    self.controller.tello.rotate_counter_clockwise(degrees)
-                    
-            # Flip commands
-            elif cmd == "flip":
-                if not self.flying:
-                    print("Must takeoff first!")
-                    return
-                    
-                direction = 'f'  # default forward
-                if len(parts) > 1:
-                    direction = parts[1].lower()
-                    if direction not in ['f', 'b', 'l', 'r']:
-                        print("Invalid flip direction. Use: f, b, l, r")
-                        return
-                
-                directions = {'f': 'forward', 'b': 'backward', 'l': 'left', 'r': 'right'}
-                print(f"Flipping {directions[direction]}...")
-                self.controller.tello.flip(direction)
-                
-            # Status commands
-            elif cmd == "status":
-                print("\n=== Drone Status ===")
-                try:
-                    status = self.controller.get_status()
-                    print(f"Battery: {status['battery']}%")
-                    print(f"Height: {status['height']}cm")
-                    print(f"Temperature: {status['temperature']}°F")
-                    print(f"Speed: {status['speed']} cm/s")
-                    print(f"Connected: {'Yes' if self.connected else 'No'}")
-                    print(f"Flying (program): {'Yes' if self.flying else 'No'}")
-                    print(f"Flying (actual): {'Yes' if status['height'] > 10 else 'No'}")
-                    print("==================")
-                except Exception as e:
-                    print(f"Could not get full status: {e}")
-                    print(f"Connected: {'Yes' if self.connected else 'No'}")
-                    print(f"Flying (program): {'Yes' if self.flying else 'No'}")
-                
-            elif cmd == "battery":
-                try:
-                    battery = self.controller.tello.get_battery()
-                    print(f"Battery: {battery}%")
-                except Exception as e:
-                    print(f"Could not get battery: {e}")
-                
-            # Photo command
-            elif cmd == "photo":
-                if self.frame is not None:
-                    timestamp = int(time.time())
-                    # Save photos to photos directory
-                    photos_dir = os.path.join(os.path.dirname(__file__), '..', 'photos')
-                    os.makedirs(photos_dir, exist_ok=True)  # Ensure directory exists
-                    filename = os.path.join(photos_dir, f"tello_photo_{timestamp}.jpg")
-                    cv2.imwrite(filename, self.frame)
-                    print(f"Photo saved: {filename}")
-                else:
-                    print("No video frame available")
-                    
-            # Help command
-            elif cmd in ["help", "?"]:
-                self._show_help()
-                
-            # Quit command
-            elif cmd in ["quit", "exit", "q"]:
-                self.running = False
-                
-            else:
-                print(f"Unknown command: {command}")
-                print("Type 'help' for available commands")
-                
+            parsed = COMMANDS.parse(command, notes=notes)
+        except CommandError as e:
+            print(f"❌ {e}")
+            print("Type 'help' for available commands")
+            return False
+        if parsed is None:
+            return False
+        for note in notes:
+            print(f"⚠️  {note}")
+        return self._dispatch(parsed)
+    
+    def _dispatch(self, parsed):
+        """Run a parsed command. Returns True if it ran without error."""
+        try:
+            return COMMANDS.dispatch(self, parsed)
         except Exception as e:
-            print(f"Command '{command}' failed: {e}")
+            print(f"Command '{parsed.line}' failed: {e}")
             if "No valid imu" in str(e):
                 print("IMU error detected. Try:")
                 print("1. Type 'land' and restart drone")
                 print("2. Use RC control mode")
                 self._try_rc_movement()
+            return False
     
-    def _try_movement(self, direction, distance):
-        """Try movement with fallback methods."""
-        movement_map = {
-            'forward': lambda d: self.controller.tello.move_forward(d),
-            'back': lambda d: self.controller.tello.move_back(d),
-            'left': lambda d: self.controller.tello.move_left(d),
-            'right': lambda d: self.controller.tello.move_right(d),
-            'up': lambda d: self.controller.tello.move_up(d),
-            'down': lambda d: self.controller.tello.move_down(d)
-        }
+    def run_script(self, path):
+        """Run a command script, checking every line before the first one runs.
         
+        Any parse error, out-of-range value or command used in the wrong
+        flight state is reported with its line number and nothing is sent.
+        The script stops at the first command that fails.
+        """
         try:
-            # Try standard movement
-            movement_map[direction](distance)
-            print(f"Movement successful!")
-        except Exception as e:
-            if "No valid imu" in str(e):
-                print("IMU error - trying RC control...")
-                self._try_rc_movement_direction(direction, distance)
-            else:
-                raise e
-    
-    def _try_rc_movement_direction(self, direction, distance):
-        """Try RC control for specific direction."""
-        # Convert distance to speed and time
-        speed = min(100, max(20, distance))  # Speed 20-100
-        duration = distance / 50.0  # Approximate duration
-        
-        rc_map = {
-            'forward': (0, speed, 0, 0),
-            'back': (0, -speed, 0, 0),
-            'left': (-speed, 0, 0, 0),
-            'right': (speed, 0, 0, 0),
-            'up': (0, 0, speed, 0),
-            'down': (0, 0, -speed, 0)
-        }
-        
-        if direction in rc_map:
-            print(f"Using RC control for {direction}...")
-            lr, fb, ud, yaw = rc_map[direction]
-            self.controller.tello.send_rc_control(lr, fb, ud, yaw)
-            time.sleep(duration)
-            self.controller.tello.send_rc_control(0, 0, 0, 0)  # Stop
-            print("RC movement completed!")
-    
-    def _try_rc_movement(self):
-        """Suggest RC movement as fallback."""
-        print("\nRC Control available - use these commands:")
-        print("- rc forward/back/left/right/up/down [speed] [duration]")
-        print("Example: 'rc forward 50 2' (speed 50, 2 seconds)")
-    
-    def _show_help(self):
-        """Show available commands."""
-        print("\n=== Available Commands ===")
-        print("Flight Control:")
-        print("  takeoff           - Take off")
-        print("  land              - Land")
-        print("  emergency         - Emergency stop")
-        print("  reconnect         - Manual reconnection")
-        print("\nMovement:")
-        print("  forward [dist]    - Move forward (default 50cm)")
-        print("  back [dist]       - Move backward")
-        print("  left [dist]       - Move left")
-        print("  right [dist]      - Move right")
-        print("  up [dist]         - Move up")
-        print("  down [dist]       - Move down")
-        print("\nRotation:")
-        print("  cw [degrees]      - Rotate clockwise (default 90°)")
-        print("  ccw [degrees]     - Rotate counter-clockwise")
-        print("\nTricks:")
-        print("  flip [f/b/l/r]    - Flip (forward/back/left/right)")
-        print("\nInfo:")
-        print("  status            - Show detailed drone status")
-        print("  battery           - Show battery level")
-        print("  photo             - Take photo")
-        print("\nGeneral:")
-        print("  help/?            - Show this help")
-        print("  quit/exit/q       - Quit program")
-        print("  Press 'q' in video window to quit")
-        print("\n🔄 Auto-features:")
-        print("  • Auto-reconnection on connection loss")
-        print("  • Crash detection via height monitoring")
-        print("  • State synchronization with actual drone")
-        print("========================\n")
-
-def general_flight():
-    """Main interactive flight function."""
-    controller = InteractiveTelloController()
-    
-    print("=== DJI Tello General Flight Controller ===")
-    print("Connecting to Tello...")
-    
-    if not controller.controller.connect():
-        print("Failed to connect to Tello. Make sure drone is on and connected to WiFi.")
-        return
-    
-    controller.connected = True  # Mark as connected
-    
-    try:
-        # Check battery level
-        battery = controller.controller.tello.get_battery()
-        print(f"Connected! Battery: {battery}%")
-        
-        if battery < 20:
-            print("Warning: Low battery! Consider charging before flight.")
-            response = input("Continue anyway? (y/n): ")
-            if response.lower() != 'y':
-                return
-        
-        # Start monitoring system
-        controller.start_monitoring()
-        
-        # Start video stream in background thread
-        video_thread = threading.Thread(target=controller.start_video_stream)
-        video_thread.daemon = True
-        video_thread.start()
-        
-        time.sleep(2)  # Let video start
-        
-        # Show help initially
-        controller._show_help()
-        
-        # Main command loop
-        print("Ready for commands! (Type 'help' for command list)")
-        
-        while controller.running:
-            try:
-                command = input("\nTello> ").strip()
-                if command:
-                    controller.execute_command(command)
-                    
-            except KeyboardInterrupt:
-                print("\nKeyboard interrupt detected...")
-                break
-            except EOFError:
-                print("\nInput ended...")
-                break
-        
-        # Cleanup
-        print("\nShutting down...")
-        
-        if controller.flying:
-            print("Landing drone...")
-            controller.controller.land()
-        
-        controller.stop_video_stream()
-        
-    except Exception as e:
-        print(f"Flight error: {e}")
-        if controller.flying:
-            print("Emergency landing...")
-            emergency_stop(controller.controller.tello)
-    
-    finally:
-        controller.controller.disconnect()
-        print("Flight session complete!")
-
-if __name__ == "__main__":
-=======
-#!/usr/bin/env python3
-"""
-General flight controller for DJI Tello drone.
-Combines camera streaming with interactive flight commands.
-"""
-
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-
-import cv2
-import time
-import threading
-from tello_controller import TelloController
-from utils import safe_delay, check_battery_level, emergency_stop
-
-class InteractiveTelloController:
-    """Interactive controller with camera and command input."""
-    
-    def __init__(self):
-        self.controller = TelloController()
-        self.flying = False
-        self.streaming = False
-        self.running = True
-        self.frame = None
-        self.connected = False
-        self.last_height = 0
-        self.connection_lost_count = 0
-        self.monitoring = False
+            commands, errors = COMMANDS.load_script(path, flying=self.flying)
+        except OSError as e:
+            print(f"❌ Could not read script {path}: {e}")
+            return False
+        if errors:
+            print_script_errors(path, errors)
+            return False
         
-    def start_video_stream(self):
-        """Start video streaming in a separate thread."""
-        try:
-            print("Starting video stream...")
-            self.controller.tello.streamon()
-            time.sleep(2)
-            self.streaming = True
-            
-            frame_reader = self.controller.tello.get_frame_read()
-            
-            while self.streaming and self.running:
-                try:
-                    current_frame = frame_reader.frame
-                    if current_frame is not None:
-                        self.frame = current_frame.copy()
-                        
-                        # Add status overlay with enhanced sensor data
-                        try:
-                            battery = self.controller.tello.get_battery()
-                            height = self.controller.tello.get_height()
-                            distance_tof = self.controller.tello.get_distance_tof()
-                            
-                            # Main status line
-                            status_text = f"Flying: {self.flying} | Battery: {battery}%"
-                            
-                            # Height and ToF sensor data
-                            height_text = f"Height: {height}cm | ToF Distance: {distance_tof}cm"
-                            
-                            # Additional flight info
-                            try:
-                                pitch = self.controller.tello.get_pitch()
-                                roll = self.controller.tello.get_roll()
-                                attitude_text = f"Pitch: {pitch:.1f}° | Roll: {roll:.1f}°"
-                            except:
-                                attitude_text = "Attitude: N/A"
-                            
-                        except Exception as e:
-                            # Fallback if sensor readings fail
-                            status_text = f"Flying: {self.flying} | Battery: N/A"
-                            height_text = f"Height: N/A | ToF Distance: N/A"
-                            attitude_text = "Sensors: Error"
-                        
-                        # Draw overlay with better formatting
-                        cv2.putText(self.frame, status_text, (10, 30), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                        cv2.putText(self.frame, height_text, (10, 55), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                        cv2.putText(self.frame, attitude_text, (10, 80), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                        
-                        # Add ToF distance warning if too close to ground
-                        try:
-                            if distance_tof < 50:  # Warning if less than 50cm from ground
-                                warning_text = "⚠️ LOW ALTITUDE WARNING!"
-                                cv2.putText(self.frame, warning_text, (10, 110), 
-                                          cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)  # Red text
-                        except:
-                            pass
-                        
-                        # Display frame
-                        cv2.imshow('Tello Camera Feed', self.frame)
-                        
-                    # Non-blocking key check
-                    key = cv2.waitKey(1) & 0xFF
-                    if key == ord('q'):
-                        self.running = False
-                        break
-                        
-                except Exception as e:
-                    print(f"Video stream error: {e}")
-                    break
-                    
-        except Exception as e:
-            print(f"Failed to start video stream: {e}")
-            self.streaming = False
+        print(f"📜 Running {len(commands)} commands from {path}")
+        for lineno, parsed in commands:
+            if not self.running:
+                print("Script interrupted")
+                return False
+            print(f"\n▶️  [{lineno}] {parsed.line}")
+            if not self._dispatch(parsed):
+                print(f"❌ Script stopped at line {lineno}")
+                return False
+        print(f"✅ Script {path} complete")
+        return True
     
-    def stop_video_stream(self):
-        """Stop video streaming."""
-        if self.streaming:
-            self.streaming = False
-            self.controller.tello.streamoff()
-            cv2.destroyAllWindows()
-            print("Video stream stopped.")
+    # Command handlers (see COMMANDS below)
     
-    def check_connection(self):
-        """Check if drone is still connected and responsive."""
+    def _cmd_takeoff(self):
+        print("Taking off...")
+        # Expected before the call: the estimator sees the climb while
+        # takeoff() is still waiting for the drone's "ok"
+        self.flying = True
         try:
-            # Try to get battery - this is a simple command to test connection
-            battery = self.controller.tello.get_battery()
-            if battery > 0:
-                self.connected = True
-                self.connection_lost_count = 0
-                return True
+            self.controller.takeoff()
         except Exception:
-            pass
-        
-        self.connection_lost_count += 1
-        if self.connection_lost_count > 3:
-            self.connected = False
+            self.flying = False
+            raise
+        safe_delay(TAKEOFF_SETTLE)  # Wait for IMU stabilization
+        
+        # Verify takeoff was successful from the estimated flight state
+        if self.check_flight_state():
+            print("✅ Takeoff successful!")
+            return True
+        print("⚠️  Takeoff may have failed - check drone status")
         return False
     
-    def check_flight_state(self):
-        """Check if drone is actually flying by checking height."""
+    def _cmd_land(self):
+        if not self.connection.is_connected():
+            print(f"⚠️  Link {self.connection.state} - sending land anyway")
+        print("Landing...")
+        self.flying = False
         try:
-            height = self.controller.tello.get_height()
-            previous_height = self.last_height
-            self.last_height = height
-            
-            # If height is very low (< 10cm) and we think we're flying, we probably crashed
-            if self.flying and height < 10:
-                print(f"\n⚠️  CRASH DETECTED! Height: {height}cm - Drone has landed!")
-                print("   Updating flight state to: LANDED")
-                self.flying = False
-                
-                # Immediate user notification
-                print("\n🔄 You can now:")
-                print("   - Type 'takeoff' to fly again")
-                print("   - Type 'status' to check drone condition")
-                print("   - Type 'reconnect' if connection seems lost")
-                return False
-            
-            # If height is reasonable (> 30cm) and we think we're not flying, maybe we are
-            elif not self.flying and height > 30:
-                print(f"\n⚠️  UNEXPECTED FLIGHT! Height: {height}cm - Drone is airborne!")
-                print("   Updating flight state to: FLYING")
-                self.flying = True
-                return True
-            
-            # Check for significant height changes that might indicate issues
-            elif self.flying and previous_height > 0:
-                height_change = abs(height - previous_height)
-                if height_change > 50:  # Sudden height change > 50cm
-                    print(f"⚠️  Sudden height change: {previous_height}cm → {height}cm")
-                
-            return self.flying
-            
-        except Exception as e:
-            print(f"Could not check flight state: {e}")
-            return self.flying
+            self.controller.land()
+        except Exception:
+            self.flying = True
+            raise
+        safe_delay(LAND_SETTLE)
+        
+        # Verify landing from the estimated flight state
+        if not self.check_flight_state():
+            print("✅ Landed successfully!")
+            return True
+        print("⚠️  Landing may have failed - drone still airborne")
+        return False
     
-    def attempt_reconnection(self):
-        """Attempt to reconnect to the drone."""
-        print("🔄 Connection lost - attempting to reconnect...")
-        
+    def _cmd_emergency(self):
+        print("🚨 EMERGENCY STOP!")
+        if not self.connection.is_connected():
+            print(f"⚠️  Link {self.connection.state} - sending emergency anyway")
+        self.rc_follower.stop()
+        emergency_stop(self.controller.tello)
+        self.flying = False
+        safe_delay(EMERGENCY_SETTLE)
+        self.check_flight_state()  # Update actual state
+    
+    def _cmd_reconnect(self):
+        print("Manual reconnection requested...")
+        self.attempt_reconnection()
+    
+    def _cmd_move(self, direction, distance):
+        print(f"Moving {direction} {distance}cm...")
+        return self._try_movement(direction, distance)
+    
+    def _cmd_rc(self, direction, speed, duration):
+        print(f"RC {direction} at {speed}cm/s for {duration}s...")
+        return self._try_rc_movement_direction(direction, speed * duration, speed)
+    
+    def _cmd_rotate(self, direction, degrees):
+        if direction == "cw":
+            print(f"Rotating clockwise {degrees} degrees...")
+            self.controller.tello.rotate_clockwise(degrees)
+        else:
+            print(f"Rotating counter-clockwise {degrees} degrees...")
+            self.controller.tello.rotate_counter_clockwise(degrees)
+    
+    def _cmd_flip(self, direction):
+        directions = {'f': 'forward', 'b': 'backward', 'l': 'left', 'r': 'right'}
+        print(f"Flipping {directions[direction]}...")
+        self.flight_state.note_flip()
+        self.controller.tello.flip(direction)
+    
+    def _cmd_status(self):
+        print("\n=== Drone Status ===")
         try:
-            # Disconnect and reconnect
-            self.controller.disconnect()
-            time.sleep(2)
-            
-            if self.controller.connect():
-                print("✅ Reconnection successful!")
-                self.connected = True
-                self.connection_lost_count = 0
-                
-                # Check actual flight state after reconnection
-                self.check_flight_state()
-                return True
-            else:
-                print("❌ Reconnection failed")
-                return False
-                
+            status = self.controller.get_status()
+            print(f"Battery: {status['battery']}%")
+            print(f"Height: {status['height']}cm")
+            print(f"Temperature: {status['temperature']}°F")
+            print(f"Speed: {status['speed']} cm/s")
+            print(f"Connected: {'Yes' if self.connected else 'No'}")
+            print(f"Flying (program): {'Yes' if self.flying else 'No'}")
+            print(f"Flying (actual): {'Yes' if status['height'] > 10 else 'No'}")
+            print("==================")
         except Exception as e:
-            print(f"Reconnection error: {e}")
+            print(f"Could not get full status: {e}")
+            print(f"Connected: {'Yes' if self.connected else 'No'}")
+            print(f"Flying (program): {'Yes' if self.flying else 'No'}")
+    
+    def _cmd_battery(self):
+        battery = self.controller.battery_level()
+        if battery is None:
+            print("Could not get battery: no state packet yet")
+        else:
+            print(f"Battery: {battery}%")
+    
+    def _cmd_link(self):
+        stats = self.controller.link.stats()
+        print("\n=== Link Status ===")
+        print(f"State: {self.connection.state}")
+        print(f"State packets: {stats['packets']} ({stats['packet_rate_hz']:.1f} Hz, "
+              f"jitter {stats['jitter_ms']:.1f}ms, loss {stats['packet_loss']:.1%})")
+        print(f"Command RTT: p50 {stats['rtt_p50_ms']:.0f}ms | p95 {stats['rtt_p95_ms']:.0f}ms | "
+              f"max {stats['rtt_max_ms']:.0f}ms")
+        print(f"Commands: {stats['commands']} ({stats['command_timeouts']} timed out)")
+        print(f"Silent for: {stats['silent_for_s']:.1f}s")
+        print("===================")
+    
+    def _cmd_photo(self, mode, count, interval):
+        if self.frames.latest() is None:
+            print("No video frame available")
             return False
+        if mode == "burst":
+            print(f"Burst: {count} photos every {interval}s...")
+            self.photo_burst = self.photos.burst(self._latest_frame, count, interval)
+        else:
+            # Encoding happens on the photo writer threads
+            filename = self.photos.submit(self.frames.latest().frame)
+            if not filename:
+                print("Photo queue full - photo dropped")
+                return False
+            print(f"Photo queued: {filename}")
     
-    def monitor_connection_and_state(self):
-        """Background monitoring of connection and flight state."""
-        while self.monitoring and self.running:
-            try:
-                # Check connection every 2 seconds (faster than before)
-                if not self.check_connection():
-                    if not self.attempt_reconnection():
-                        print("⚠️  Multiple reconnection attempts failed")
-                        # Don't break - keep trying
-                
-                # Check flight state more frequently (every 1 second when flying)
-                if self.flying:
-                    self.check_flight_state()
-                    time.sleep(1)  # Check more often when flying
-                else:
-                    self.check_flight_state()
-                    time.sleep(2)  # Check less often when landed
-                
-            except Exception as e:
-                print(f"Monitoring error: {e}")
-                time.sleep(2)  # Shorter retry time
+    def _cmd_record(self, action, option):
+        if action == "start":
+            self.start_recording(with_hud=option == "hud")
+        else:
+            self.stop_recording()
     
-    def start_monitoring(self):
-        """Start background monitoring thread."""
-        if not self.monitoring:
-            self.monitoring = True
-            monitor_thread = threading.Thread(target=self.monitor_connection_and_state)
-            monitor_thread.daemon = True
-            monitor_thread.start()
-            print("📡 Connection and state monitoring started")
+    def _cmd_quit(self):
+        self.running = False
     
-    def execute_command(self, command):
-        """Execute a flight command with error handling."""
-        command = command.lower().strip()
-        parts = command.split()
-        
-        if not parts:
-            return
-            
-        cmd = parts[0]
-        
-        # Check connection before executing commands
-        if cmd not in ['help', '?', 'quit', 'exit', 'q', 'status', 'reconnect']:
-            if not self.connected:
-                print("❌ Not connected to drone! Attempting reconnection...")
-                if not self.attempt_reconnection():
-                    print("Cannot execute command - no connection")
-                    return
-        
-        try:
-            # Flight control commands
-            if cmd == "takeoff":
-                if not self.flying:
-                    print("Taking off...")
-                    self.controller.takeoff()
-                    safe_delay(5)  # Wait for IMU stabilization
-                    
-                    # Verify takeoff was successful by checking height
-                    if self.check_flight_state():
-                        print("✅ Takeoff successful!")
-                    else:
-                        print("⚠️  Takeoff may have failed - check drone status")
-                else:
-                    print("Already flying!")
-                    
-            elif cmd == "land":
-                if self.flying:
-                    print("Landing...")
-                    self.controller.land()
-                    safe_delay(3)
-                    
-                    # Verify landing by checking height
-                    if not self.check_flight_state():
-                        print("✅ Landed successfully!")
-                    else:
-                        print("⚠️  Landing may have failed - drone still airborne")
-                else:
-                    print("Not flying!")
-                    
-            elif cmd == "emergency":
-                print("🚨 EMERGENCY STOP!")
-                emergency_stop(self.controller.tello)
-                self.flying = False
-                safe_delay(2)
-                self.check_flight_state()  # Update actual state
-                
-            elif cmd == "reconnect":
-                print("Manual reconnection requested...")
-                self.attempt_reconnection()
-                return
-                
-            # Movement commands (require distance parameter)
-            elif cmd in ["forward", "back", "left", "right", "up", "down"]:
-                if not self.flying:
-                    print("Must takeoff first!")
-                    return
-                    
-                distance = 50  # default
-                if len(parts) > 1:
-                    try:
-                        distance = int(parts[1])
-                        distance = max(20, min(distance, 500))  # Clamp between 20-500cm
-                    except ValueError:
-                        print("Invalid distance, using 50cm")
-                
-                print(f"Moving {cmd} {distance}cm...")
-                self._try_movement(cmd, distance)
-                
-            # Rotation commands
-            elif cmd in ["cw", "ccw", "rotate"]:
-                if not self.flying:
-                    print("Must takeoff first!")
-                    return
-                    
-                degrees = 90  # default
-                if len(parts) > 1:
-                    try:
-                        degrees = int(parts[1])
-                        degrees = max(1, min(degrees, 360))  # Clamp between 1-360
-                    except ValueError:
-                        print("Invalid degrees, using 90")
-                
-                if cmd == "cw" or (cmd == "rotate" and len(parts) > 2 and parts[2] == "cw"):
-                    print(f"Rotating clockwise {degrees} degrees...")
-                    self.controller.tello.rotate_clockwise(degrees)
-                else:
-                    print(f"Rotating counter-clockwise {degrees} degrees...")
-                    self.controller.tello.rotate_counter_clockwise(degrees)
-                    
-            # Flip commands
-            elif cmd == "flip":
-                if not self.flying:
-                    print("Must takeoff first!")
-                    return
-                    
-                direction = 'f'  # default forward
-                if len(parts) > 1:
-                    direction = parts[1].lower()
-                    if direction not in ['f', 'b', 'l', 'r']:
-                        print("Invalid flip direction. Use: f, b, l, r")
-                        return
-                
-                directions = {'f': 'forward', 'b': 'backward', 'l': 'left', 'r': 'right'}
-                print(f"Flipping {directions[direction]}...")
-                self.controller.tello.flip(direction)
-                
-            # Status commands
-            elif cmd == "status":
-                print("\n=== Drone Status ===")
-                try:
-                    status = self.controller.get_status()
-                    print(f"Battery: {status['battery']}%")
-                    print(f"Height: {status['height']}cm")
-                    print(f"Temperature: {status['temperature']}°F")
-                    print(f"Speed: {status['speed']} cm/s")
-                    print(f"Connected: {'Yes' if self.connected else 'No'}")
-                    print(f"Flying (program): {'Yes' if self.flying else 'No'}")
-                    print(f"Flying (actual): {'Yes' if status['height'] > 10 else 'No'}")
-                    print("==================")
-                except Exception as e:
-                    print(f"Could not get full status: {e}")
-                    print(f"Connected: {'Yes' if self.connected else 'No'}")
-                    print(f"Flying (program): {'Yes' if self.flying else 'No'}")
-                
-            elif cmd == "battery":
-                try:
-                    battery = self.controller.tello.get_battery()
-                    print(f"Battery: {battery}%")
-                except Exception as e:
-                    print(f"Could not get battery: {e}")
-                
-            # Photo command
-            elif cmd == "photo":
-                if self.frame is not None:
-                    timestamp = int(time.time())
-                    # Save photos to photos directory
-                    photos_dir = os.path.join(os.path.dirname(__file__), '..', 'photos')
-                    os.makedirs(photos_dir, exist_ok=True)  # Ensure directory exists
-                    filename = os.path.join(photos_dir, f"tello_photo_{timestamp}.jpg")
-                    cv2.imwrite(filename, self.frame)
-                    print(f"Photo saved: {filename}")
-                else:
-                    print("No video frame available")
-                    
-            # Help command
-            elif cmd in ["help", "?"]:
-                self._show_help()
-                
-            # Quit command
-            elif cmd in ["quit", "exit", "q"]:
-                self.running = False
-                
-            else:
-                print(f"Unknown command: {command}")
-                print("Type 'help' for available commands")
-                
-        except Exception as e:
-            print(f"Command '{command}' failed: {e}")
-            if "No valid imu" in str(e):
-                print("IMU error detected. Try:")
-                print("1. Type 'land' and restart drone")
-                print("2. Use RC control mode")
-                self._try_rc_movement()
+    def _latest_frame(self):
+        """Return the most recently published frame, or None."""
+        view = self.frames.latest()
+        return view.frame if view is not None else None
     
     def _try_movement(self, direction, distance):
         """Try movement with fallback methods."""
@@ -971,35 +538,26 @@ class InteractiveTelloController:
             # Try standard movement
             movement_map[direction](distance)
             print(f"Movement successful!")
+            return True
         except Exception as e:
             if "No valid imu" in str(e):
                 print("IMU error - trying RC control...")
-                self._try_rc_movement_direction(direction, distance)
-            else:
-                raise e
+                return self._try_rc_movement_direction(direction, distance)
+            raise e
     
-    def _try_rc_movement_direction(self, direction, distance):
-        """Try RC control for specific direction."""
-        # Convert distance to speed and time
-        speed = min(100, max(20, distance))  # Speed 20-100
-        duration = distance / 50.0  # Approximate duration
-        
-        rc_map = {
-            'forward': (0, speed, 0, 0),
-            'back': (0, -speed, 0, 0),
-            'left': (-speed, 0, 0, 0),
-            'right': (speed, 0, 0, 0),
-            'up': (0, 0, speed, 0),
-            'down': (0, 0, -speed, 0)
-        }
-        
-        if direction in rc_map:
+    def _try_rc_movement_direction(self, direction, distance, speed=None):
+        """Try RC control for specific direction. Returns True if the move completed."""
+        if direction in DIRECTIONS:
             print(f"Using RC control for {direction}...")
-            lr, fb, ud, yaw = rc_map[direction]
-            self.controller.tello.send_rc_control(lr, fb, ud, yaw)
-            time.sleep(duration)
-            self.controller.tello.send_rc_control(0, 0, 0, 0)  # Stop
-            print("RC movement completed!")
+            # Closed-loop RC stream with a ramped velocity profile
+            if speed is None:
+                speed = min(100, max(20, distance))
+            completed = self.rc_follower.follow(line_setpoints(direction, distance, speed))
+            stats = self.rc_follower.stats()
+            print(f"RC movement {'completed' if completed else 'stopped'}! "
+                  f"({stats['ticks']} ticks at {stats['rate_hz']} Hz, jitter {stats['jitter_ms']:.1f}ms)")
+            return completed
+        return False
     
     def _try_rc_movement(self):
         """Suggest RC movement as fallback."""
@@ -1010,40 +568,91 @@ class InteractiveTelloController:
     def _show_help(self):
         """Show available commands."""
         print("\n=== Available Commands ===")
-        print("Flight Control:")
-        print("  takeoff           - Take off")
-        print("  land              - Land")
-        print("  emergency         - Emergency stop")
-        print("  reconnect         - Manual reconnection")
-        print("\nMovement:")
-        print("  forward [dist]    - Move forward (default 50cm)")
-        print("  back [dist]       - Move backward")
-        print("  left [dist]       - Move left")
-        print("  right [dist]      - Move right")
-        print("  up [dist]         - Move up")
-        print("  down [dist]       - Move down")
-        print("\nRotation:")
-        print("  cw [degrees]      - Rotate clockwise (default 90°)")
-        print("  ccw [degrees]     - Rotate counter-clockwise")
-        print("\nTricks:")
-        print("  flip [f/b/l/r]    - Flip (forward/back/left/right)")
-        print("\nInfo:")
-        print("  status            - Show detailed drone status")
-        print("  battery           - Show battery level")
-        print("  photo             - Take photo")
-        print("\nGeneral:")
-        print("  help/?            - Show this help")
-        print("  quit/exit/q       - Quit program")
-        print("  Press 'q' in video window to quit")
+        for line in COMMANDS.help_lines():
+            print(line if line.startswith(' ') else f"\n{line}")
+        if not self.headless:
+            print("  Press 'q' in video window to quit")
         print("\n🔄 Auto-features:")
-        print("  • Auto-reconnection on connection loss")
-        print("  • Crash detection via height monitoring")
+        print("  • Background reconnection with backoff on connection loss")
+        print("  • Crash detection from every state packet")
         print("  • State synchronization with actual drone")
         print("========================\n")
 
-def general_flight():
-    """Main interactive flight function."""
-    controller = InteractiveTelloController()
+def _move_handler(direction):
+    return lambda target, distance: target._cmd_move(direction, distance)
+
+def _rotate_handler(direction):
+    return lambda target, degrees: target._cmd_rotate(direction, degrees)
+
+# Every command the interactive controller and scripts accept
+COMMANDS = CommandRegistry([
+    CommandSpec('takeoff', InteractiveTelloController._cmd_takeoff, guards=('connected', 'landed'),
+                flying=True, help="Take off", group="Flight Control"),
+    # Safety commands are always sent: never refused or queued while the link is degraded
+    CommandSpec('land', InteractiveTelloController._cmd_land, guards=('flying',),
+                flying=False, help="Land", group="Flight Control"),
+    CommandSpec('emergency', InteractiveTelloController._cmd_emergency, guards=(), flying=False,
+                help="Emergency stop", group="Flight Control"),
+    CommandSpec('reconnect', InteractiveTelloController._cmd_reconnect, guards=(),
+                help="Manual reconnection", group="Flight Control"),
+] + [
+    CommandSpec(direction, _move_handler(direction), args=[ArgSpec('distance', int, 50, 20, 500)],
+                guards=('connected', 'flying'), help=f"Move {direction} (20-500cm, default 50)",
+                group="Movement")
+    for direction in ('forward', 'back', 'left', 'right', 'up', 'down')
+] + [
+    CommandSpec('rc', InteractiveTelloController._cmd_rc,
+                args=[ArgSpec('direction', str, choices=tuple(DIRECTIONS)), ArgSpec('speed', int, 50, 10, 100),
+                      ArgSpec('duration', float, 1.0, 0.1, 10.0)],
+                guards=('connected', 'flying'), help="Fly with RC control at speed (cm/s) for duration (s)",
+                group="Movement"),
+    CommandSpec('cw', _rotate_handler('cw'), args=[ArgSpec('degrees', int, 90, 1, 360)],
+                guards=('connected', 'flying'), help="Rotate clockwise (default 90°)", group="Rotation"),
+    CommandSpec('ccw', _rotate_handler('ccw'), args=[ArgSpec('degrees', int, 90, 1, 360)],
+                guards=('connected', 'flying'), help="Rotate counter-clockwise", group="Rotation"),
+    CommandSpec('rotate', lambda target, degrees, direction: target._cmd_rotate(direction, degrees),
+                args=[ArgSpec('degrees', int, 90, 1, 360), ArgSpec('direction', str, 'ccw', choices=('cw', 'ccw'))],
+                guards=('connected', 'flying'), help="Rotate either way", group="Rotation"),
+    CommandSpec('flip', InteractiveTelloController._cmd_flip,
+                args=[ArgSpec('direction', str, 'f', choices=('f', 'b', 'l', 'r'))],
+                guards=('connected', 'flying'), help="Flip (forward/back/left/right)", group="Tricks"),
+    CommandSpec('status', InteractiveTelloController._cmd_status, guards=(),
+                help="Show detailed drone status", group="Info"),
+    CommandSpec('battery', InteractiveTelloController._cmd_battery, help="Show battery level", group="Info"),
+    CommandSpec('link', InteractiveTelloController._cmd_link, guards=(),
+                help="Show link RTT, jitter and packet loss", group="Info"),
+    CommandSpec('photo', InteractiveTelloController._cmd_photo,
+                args=[ArgSpec('mode', str, None, choices=('burst',)), ArgSpec('count', int, 5, 1, 100),
+                      ArgSpec('interval', float, 0.5, 0.0)],
+                help="Take a photo, or count photos every interval seconds", group="Info"),
+    CommandSpec('record', InteractiveTelloController._cmd_record,
+                args=[ArgSpec('action', str, 'start', choices=('start', 'stop')),
+                      ArgSpec('option', str, None, choices=('hud',))],
+                help="Start/stop video recording", group="Info"),
+    CommandSpec('script', InteractiveTelloController.run_script, args=[ArgSpec('path', str)], guards=(),
+                script=True, help="Run a command script (checked before it runs)"),
+    CommandSpec('help', lambda target: target._show_help(), guards=(), aliases=('?',), help="Show this help"),
+    CommandSpec('quit', InteractiveTelloController._cmd_quit, guards=(), aliases=('exit', 'q'),
+                help="Quit program"),
+])
+
+def general_flight(headless=False, script=None):
+    """Main interactive flight function.
+    
+    With `script`, the file is checked before connecting and then run in
+    place of the interactive prompt.
+    """
+    if script:
+        try:
+            _, errors = COMMANDS.load_script(script)
+        except OSError as e:
+            print(f"❌ Could not read script {script}: {e}")
+            return
+        if errors:
+            print_script_errors(script, errors)
+            return
+    
+    controller = InteractiveTelloController(headless=headless)
     
     print("=== DJI Tello General Flight Controller ===")
     print("Connecting to Tello...")
@@ -1052,20 +661,24 @@ def general_flight():
         print("Failed to connect to Tello. Make sure drone is on and connected to WiFi.")
         return
     
-    controller.connected = True  # Mark as connected
+    controller.connection.link_up()  # Mark as connected
     
     try:
         # Check battery level
-        battery = controller.controller.tello.get_battery()
-        print(f"Connected! Battery: {battery}%")
+        battery = controller.controller.battery_level()
+        if battery is None:
+            print("Connected! Battery: unknown (no state packet yet)")
+        else:
+            print(f"Connected! Battery: {battery}%")
         
-        if battery < 20:
+        if battery is not None and battery < 20:
             print("Warning: Low battery! Consider charging before flight.")
             response = input("Continue anyway? (y/n): ")
             if response.lower() != 'y':
                 return
         
-        # Start monitoring system
+        # Start monitoring system and the flight log
+        controller.start_flight_log()
         controller.start_monitoring()
         
         # Start video stream in background thread
@@ -1075,12 +688,15 @@ def general_flight():
         
         time.sleep(2)  # Let video start
         
-        # Show help initially
-        controller._show_help()
+        if script:
+            controller.run_script(script)
+            controller.running = False
+        else:
+            # Show help initially
+            controller._show_help()
+            print("Ready for commands! (Type 'help' for command list)")
         
         # Main command loop
-        print("Ready for commands! (Type 'help' for command list)")
-        
         while controller.running:
             try:
                 command = input("\nTello> ").strip()
@@ -1101,8 +717,13 @@ def general_flight():
             print("Landing drone...")
             controller.controller.land()
         
+        controller.stop_recording()
         controller.stop_video_stream()
         
+        if controller.photos.pending():
+            print("Saving queued photos...")
+        controller.photos.flush()
+        
     except Exception as e:
         print(f"Flight error: {e}")
         if controller.flying:
@@ -1110,9 +731,12 @@ def general_flight():
             emergency_stop(controller.controller.tello)
     
     finally:
+        controller.stop_flight_log()
         controller.controller.disconnect()
         print("Flight session complete!")
 
 if __name__ == "__main__":
->>>>>>> dea707e300b8a0d0602dd0c7554e56810d0958fe
-    general_flight()
\ No newline at end of file
+    script = None
+    if '--script' in sys.argv[1:-1]:
+        script = sys.argv[sys.argv.index('--script') + 1]
+    general_flight(headless='--headless' in sys.argv, script=script)
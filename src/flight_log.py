@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Reader and analytics for flight logs written by FlightRecorder.
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from flight_recorder import read_meta, stream_dtype
+from link_monitor import TIMEOUT_PREFIX
+
+AIRBORNE_HEIGHT = 10  # cm
+
+
+class FlightLog:
+    """One recorded flight, memory-mapped stream by stream.
+
+    Streams are opened lazily with np.memmap, using the record dtypes
+    stored in meta.json, so a summary only reads the streams it uses.
+    Record counts come from the file sizes, which also covers logs whose
+    recorder never reached stop().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = read_meta(path)
+        self._streams = {}
+
+    def stream(self, name):
+        """Records of a stream ('telemetry', 'commands' or 'frames') as a read-only array."""
+        if name not in self._streams:
+            if name not in self.meta['streams']:
+                raise KeyError(f"{self.path} has no '{name}' stream")
+            dtype = stream_dtype(self.meta, name)
+            filename = os.path.join(self.path, self.meta['streams'][name]['file'])
+            count = os.path.getsize(filename) // dtype.itemsize if os.path.exists(filename) else 0
+            if count:
+                self._streams[name] = np.memmap(filename, dtype=dtype, mode='r', shape=(count,))
+            else:
+                self._streams[name] = np.empty(0, dtype=dtype)
+        return self._streams[name]
+
+    @property
+    def telemetry(self):
+        return self.stream('telemetry')
+
+    @property
+    def commands(self):
+        return self.stream('commands')
+
+    @property
+    def frames(self):
+        return self.stream('frames')
+
+    def link_loss_intervals(self, gap=0.5):
+        """(start offset, duration) in seconds of every telemetry gap longer than `gap`."""
+        times = self.telemetry['timestamp']
+        if times.size < 2:
+            return np.empty((0, 2))
+        intervals = np.diff(times)
+        lost = np.flatnonzero(intervals > gap)
+        return np.column_stack([times[lost] - times[0], intervals[lost]])
+
+    def summary(self, gap=0.5):
+        """Per-flight summary as a dict of plain numbers."""
+        summary = {'path': self.path, 'started': self.meta.get('started')}
+        summary.update(self._telemetry_summary(gap))
+        summary.update(self._command_summary())
+        summary.update(self._frame_summary())
+        return summary
+
+    def _telemetry_summary(self, gap):
+        telemetry = self.telemetry
+        if not telemetry.size:
+            return {'packets': 0}
+        times = telemetry['timestamp']
+        minutes = (times - times[0]) / 60.0
+        battery = telemetry['battery'].astype(np.float64)
+        height = telemetry['height']
+        tof = telemetry['distance_tof']
+        airborne = height > AIRBORNE_HEIGHT
+        # Time spent airborne: sum of packet intervals that start in the air
+        steps = np.diff(times, append=times[-1])
+        loss = self.link_loss_intervals(gap)
+        acceleration = np.sqrt(telemetry['acceleration_x'].astype(np.float64) ** 2 +
+                               telemetry['acceleration_y'] ** 2 + telemetry['acceleration_z'] ** 2)
+
+        drain = 0.0
+        if times.size > 1 and minutes[-1] > 0:
+            # Least-squares slope is robust to the battery's 1% quantization
+            drain = float(-np.polyfit(minutes, battery, 1)[0])
+        return {
+            'packets': int(telemetry.size),
+            'duration_s': float(times[-1] - times[0]),
+            'airborne_s': float(steps[airborne].sum()),
+            'battery_start': int(battery[0]),
+            'battery_end': int(battery[-1]),
+            'battery_drain_per_min': drain,
+            'height_max': int(height.max()),
+            'height_mean_airborne': float(height[airborne].mean()) if airborne.any() else 0.0,
+            'tof_min': int(tof.min()),
+            'tof_max': int(tof.max()),
+            'tof_mean': float(tof.mean()),
+            'pitch_min': int(telemetry['pitch'].min()),
+            'pitch_max': int(telemetry['pitch'].max()),
+            'roll_min': int(telemetry['roll'].min()),
+            'roll_max': int(telemetry['roll'].max()),
+            'tilt_max': int(np.maximum(np.abs(telemetry['pitch']), np.abs(telemetry['roll'])).max()),
+            'acceleration_max_g': float(acceleration.max() / 1000.0),
+            'link_losses': int(len(loss)),
+            'link_loss_s': float(loss[:, 1].sum()) if len(loss) else 0.0,
+            'link_loss_longest_s': float(loss[:, 1].max()) if len(loss) else 0.0,
+            'link_loss_intervals': loss.round(3).tolist(),
+        }
+
+    def _command_summary(self):
+        commands = self.commands
+        if not commands.size:
+            return {'commands': 0}
+        responses = commands['response']
+        timeouts = np.char.startswith(responses, TIMEOUT_PREFIX.encode('utf-8'))
+        ok = np.char.lower(np.char.strip(responses)) == b'ok'
+        rtts = commands['rtt'][~timeouts].astype(np.float64) * 1000
+        summary = {
+            'commands': int(commands.size),
+            'command_timeouts': int(timeouts.sum()),
+            'command_errors': int((~ok & ~timeouts & np.char.startswith(responses, b'error')).sum()),
+        }
+        if rtts.size:
+            p50, p95, p99 = np.percentile(rtts, [50, 95, 99])
+            summary.update(rtt_p50_ms=float(p50), rtt_p95_ms=float(p95), rtt_p99_ms=float(p99),
+                           rtt_max_ms=float(rtts.max()))
+        return summary
+
+    def _frame_summary(self):
+        frames = self.frames
+        if frames.size < 2:
+            return {'frames': int(frames.size)}
+        times = frames['timestamp']
+        span = times[-1] - times[0]
+        return {
+            'frames': int(frames.size),
+            'fps_mean': float((frames.size - 1) / span) if span > 0 else 0.0,
+            'frame_stalls': int((np.diff(times) > 0.5).sum()),
+        }
+
+
+def summarize(path, gap=0.5):
+    """Summary of one flight directory; errors are reported in the result."""
+    try:
+        return FlightLog(path).summary(gap)
+    except Exception as e:
+        return {'path': path, 'error': str(e)}
+
+
+def find_flights(directory):
+    """Flight directories (those with a meta.json) under `directory`, oldest first."""
+    flights = []
+    for root, dirs, files in os.walk(directory):
+        if 'meta.json' in files:
+            flights.append(root)
+            dirs[:] = []
+    return sorted(flights)
+
+
+def summarize_directory(directory, workers=None, gap=0.5):
+    """Summaries of every flight under `directory`, computed in a process pool."""
+    paths = find_flights(directory)
+    if not paths:
+        return []
+    if workers == 1 or len(paths) == 1:
+        return [summarize(path, gap) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+        return list(pool.map(summarize, paths, [gap] * len(paths), chunksize=chunksize))
+
+
+def fleet_report(summaries):
+    """Battery and reliability figures across many flight summaries."""
+    flights = [s for s in summaries if 'error' not in s and s.get('packets')]
+
+    def column(name):
+        return np.array([s.get(name, 0) for s in flights], dtype=np.float64)
+
+    report = {'flights': len(flights), 'skipped': len(summaries) - len(flights)}
+    if not flights:
+        return report
+    drain = column('battery_drain_per_min')
+    duration_h = column('duration_s').sum() / 3600
+    commands = column('commands').sum()
+    # Flights whose commands all timed out (or had none) have no RTT figures
+    rtt_p95 = np.array([s['rtt_p95_ms'] for s in flights if 'rtt_p95_ms' in s])
+    p50, p95 = np.percentile(drain, [50, 95])
+    report.update({
+        'hours_logged': float(duration_h),
+        'hours_airborne': float(column('airborne_s').sum() / 3600),
+        'battery_drain_per_min_p50': float(p50),
+        'battery_drain_per_min_p95': float(p95),
+        'commands': int(commands),
+        'command_timeout_rate': float(column('command_timeouts').sum() / commands) if commands else 0.0,
+        'command_error_rate': float(column('command_errors').sum() / commands) if commands else 0.0,
+        'rtt_p95_ms_median': float(np.median(rtt_p95)) if rtt_p95.size else None,
+        'link_losses_per_hour': float(column('link_losses').sum() / duration_h) if duration_h else 0.0,
+        'flights_with_link_loss': int((column('link_losses') > 0).sum()),
+        'tilt_max': int(column('tilt_max').max()),
+    })
+    worst = np.argsort(column('link_loss_s'))[::-1][:5]
+    report['worst_link_loss'] = [(flights[i]['path'], flights[i]['link_loss_s']) for i in worst
+                                 if flights[i]['link_loss_s'] > 0]
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise Tello flight logs")
+    parser.add_argument('directory', nargs='?', default=os.path.join(os.path.dirname(__file__), '..', 'flights'))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--gap', type=float, default=0.5, help="telemetry gap counted as link loss (s)")
+    parser.add_argument('--output', help="write per-flight summaries and the report as JSON")
+    args = parser.parse_args()
+
+    summaries = summarize_directory(args.directory, args.workers, args.gap)
+    report = fleet_report(summaries)
+    print(f"📊 {report['flights']} flight(s) in {args.directory}")
+    for key, value in report.items():
+        if key != 'flights':
+            print(f"   {key}: {value}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'report': report, 'flights': summaries}, f, indent=2)
+        print(f"✅ Written to {args.output}")
@@ -0,0 +1,436 @@
+"""
+Precompiled, validated and cacheable flight plans.
+"""
+
+import hashlib
+import inspect
+import json
+import math
+import os
+
+import numpy as np
+
+from flight_log import FlightLog, AIRBORNE_HEIGHT
+from mission_executor import MissionCommand
+from rc_follower import line_setpoints
+import trajectory
+from trajectory import TrajectoryCompiler, Arc, Helix, MIN_RADIUS, MAX_RADIUS, MAX_OFFSET, MIN_OFFSET
+
+PLAN_VERSION = 1
+
+MOVES = {
+    'move_forward': (1, 0, 0), 'move_back': (-1, 0, 0),
+    'move_left': (0, 1, 0), 'move_right': (0, -1, 0),
+    'move_up': (0, 0, 1), 'move_down': (0, 0, -1),
+}
+ROTATIONS = {'rotate_clockwise': -1, 'rotate_counter_clockwise': 1}
+
+
+def _curve_length(mid, end):
+    """Arc length of a curve command from the origin through `mid` to `end`."""
+    a, b, c = np.zeros(3), np.asarray(mid, dtype=np.float64), np.asarray(end, dtype=np.float64)
+    chords = np.linalg.norm(b - a) + np.linalg.norm(c - b)
+    ab, ac = b - a, c - a
+    normal = np.cross(ab, ac)
+    if not normal.any():
+        return chords
+    centre = a + (np.cross(normal, ab) * ac.dot(ac) + np.cross(ac, normal) * ab.dot(ab)) / (2 * normal.dot(normal))
+    radius = np.linalg.norm(a - centre)
+    # Sum the two sub-arcs, each from its chord
+    angle = sum(2 * math.asin(min(1.0, np.linalg.norm(q - p) / (2 * radius))) for p, q in ((a, b), (b, c)))
+    return radius * angle
+
+
+def _curve_radius(mid, end):
+    """Radius of the circle through the origin, `mid` and `end`, or None if collinear."""
+    a, b = np.asarray(mid, dtype=np.float64), np.asarray(end, dtype=np.float64)
+    normal = np.cross(a, b)
+    if not normal.any():
+        return None
+    return np.linalg.norm(a) * np.linalg.norm(b) * np.linalg.norm(b - a) / (2 * np.linalg.norm(normal))
+
+
+def sdk_violations(command):
+    """Reasons a command would be rejected by the SDK (empty list if valid)."""
+    method, args = command.method, command.args
+    problems = []
+
+    def offset_ok(offset):
+        return all(abs(v) <= MAX_OFFSET for v in offset) and max(abs(v) for v in offset) >= MIN_OFFSET
+
+    if method in MOVES and not 20 <= args[0] <= 500:
+        problems.append(f"{method} {args[0]}: distance must be 20-500 cm")
+    elif method in ROTATIONS and not 1 <= args[0] <= 360:
+        problems.append(f"{method} {args[0]}: angle must be 1-360°")
+    elif method == 'go_xyz_speed':
+        if not offset_ok(args[:3]):
+            problems.append(f"go {args[:3]}: offsets must be within ±500 cm and one at least 20 cm")
+        if not 10 <= args[3] <= 100:
+            problems.append(f"go speed {args[3]}: must be 10-100 cm/s")
+    elif method == 'curve_xyz_speed':
+        if not (offset_ok(args[:3]) and offset_ok(args[3:6])):
+            problems.append(f"curve {args[:6]}: offsets must be within ±500 cm and one at least 20 cm")
+        radius = _curve_radius(args[:3], args[3:6])
+        if radius is None or not MIN_RADIUS <= radius <= MAX_RADIUS:
+            problems.append(f"curve {args[:6]}: radius must be 0.5-10 m")
+        if not 10 <= args[6] <= 60:
+            problems.append(f"curve speed {args[6]}: must be 10-60 cm/s")
+    return problems
+
+
+class CommandCostModel:
+    """Estimates flight time and battery use per command.
+
+    Every command costs `overhead` seconds (acknowledgement and settling)
+    plus its motion time: moves at `move_speed`, rotations at
+    `rotate_rate`, go/curve at their own speed. Battery drains at
+    `drain_per_s` percent per second in the air.
+    """
+
+    def __init__(self, move_speed=70.0, rotate_rate=90.0, overhead=0.6, flip_time=2.0,
+                 takeoff_time=5.0, land_time=4.0, drain_per_s=0.13):
+        self.move_speed = move_speed
+        self.rotate_rate = rotate_rate
+        self.overhead = overhead
+        self.flip_time = flip_time
+        self.takeoff_time = takeoff_time
+        self.land_time = land_time
+        self.drain_per_s = drain_per_s
+
+    def duration(self, command):
+        """Estimated seconds for one command."""
+        method, args = command.method, command.args
+        if method in MOVES:
+            motion = args[0] / self.move_speed
+        elif method in ROTATIONS:
+            motion = args[0] / self.rotate_rate
+        elif method == 'go_xyz_speed':
+            motion = math.sqrt(sum(v * v for v in args[:3])) / args[3]
+        elif method == 'curve_xyz_speed':
+            motion = _curve_length(args[:3], args[3:6]) / args[6]
+        elif method == 'rc':
+            # RCFollower flies the line with speed ramps at both ends
+            motion = line_setpoints(*args).duration
+        elif method == 'flip':
+            motion = self.flip_time
+        elif method == 'takeoff':
+            motion = self.takeoff_time
+        elif method == 'land':
+            motion = self.land_time
+        else:
+            motion = 0.0
+        return self.overhead + motion
+
+    def battery(self, seconds):
+        """Estimated battery percentage used over `seconds` of flight."""
+        return seconds * self.drain_per_s
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**values)
+
+    @classmethod
+    def calibrate(cls, logs, min_samples=3, **defaults):
+        """Fit the model to recorded flights (FlightLog objects or their paths).
+
+        Moves and rotations are acknowledged when the motion ends, so their
+        round-trip times are fitted to `overhead + size / rate` by least
+        squares. Takeoff, land and flip use their median round-trip time,
+        and the drain rate is the battery slope over airborne telemetry.
+        Anything with fewer than `min_samples` samples keeps its default.
+        """
+        model = cls(**defaults)
+        moves, rotations = [], []
+        timed = {'takeoff': [], 'land': [], 'flip': []}
+        drain, airborne_s = 0.0, 0.0
+
+        for log in logs:
+            if not isinstance(log, FlightLog):
+                log = FlightLog(log)
+            commands = log.commands
+            ok = np.char.lower(np.char.strip(commands['response'])) == b'ok'
+            for command, rtt in zip(commands['command'][ok], commands['rtt'][ok]):
+                parts = command.decode('utf-8', errors='replace').split()
+                if not parts:
+                    continue
+                try:
+                    if 'move_' + parts[0] in MOVES and len(parts) == 2:
+                        moves.append((float(parts[1]), float(rtt)))
+                    elif parts[0] in ('cw', 'ccw') and len(parts) == 2:
+                        rotations.append((float(parts[1]), float(rtt)))
+                    elif parts[0] in timed:
+                        timed[parts[0]].append(float(rtt))
+                except ValueError:
+                    continue
+
+            telemetry = log.telemetry
+            airborne = telemetry[telemetry['height'] > AIRBORNE_HEIGHT] if telemetry.size else telemetry
+            if airborne.size >= 2:
+                times = airborne['timestamp']
+                duration = float(times[-1] - times[0])
+                if duration > 0:
+                    # Weight each flight's slope by its time in the air
+                    slope = -np.polyfit(times - times[0], airborne['battery'].astype(np.float64), 1)[0]
+                    drain += slope * duration
+                    airborne_s += duration
+
+        overheads = []
+        for samples, attribute in ((moves, 'move_speed'), (rotations, 'rotate_rate')):
+            sizes = np.array([size for size, _ in samples])
+            if len(samples) < min_samples or np.unique(sizes).size < 2:
+                continue
+            slope, intercept = np.polyfit(sizes, [rtt for _, rtt in samples], 1)
+            if slope > 0:
+                setattr(model, attribute, float(1 / slope))
+                overheads.append(max(0.0, float(intercept)))
+        if overheads:
+            model.overhead = float(np.mean(overheads))
+        for name, samples in timed.items():
+            if len(samples) >= min_samples:
+                setattr(model, f"{name}_time", max(0.0, float(np.median(samples)) - model.overhead))
+        if airborne_s > 0 and drain > 0:
+            model.drain_per_s = float(drain / airborne_s)
+        return model
+
+
+class Geofence:
+    """Allowed flight volume relative to the plan's start point.
+
+    Horizontal distance from the start must stay within `radius` cm and the
+    height above ground within [min_height, max_height].
+    """
+
+    def __init__(self, radius=300, min_height=30, max_height=300):
+        self.radius = radius
+        self.min_height = min_height
+        self.max_height = max_height
+
+    def violations(self, waypoints, start_height):
+        """Reasons the waypoints leave the fence (empty list if inside)."""
+        problems = []
+        horizontal = np.hypot(waypoints[:, 0], waypoints[:, 1]).max()
+        if horizontal > self.radius:
+            problems.append(f"reaches {horizontal:.0f} cm from start (fence {self.radius} cm)")
+        heights = waypoints[:, 2] + start_height
+        if heights.min() < self.min_height:
+            problems.append(f"descends to {heights.min():.0f} cm (floor {self.min_height} cm)")
+        if heights.max() > self.max_height:
+            problems.append(f"climbs to {heights.max():.0f} cm (ceiling {self.max_height} cm)")
+        return problems
+
+
+def waypoints(commands):
+    """Positions after each command, relative to the start (x forward, y left, z up)."""
+    position = np.zeros(3)
+    heading = 0.0
+    points = [position]
+    for command in commands:
+        method, args = command.method, command.args
+        if method in MOVES:
+            delta = np.array(MOVES[method], dtype=np.float64) * args[0]
+        elif method == 'rc':
+            delta = np.array(MOVES['move_' + args[0]], dtype=np.float64) * args[1]
+        elif method in ('go_xyz_speed', 'curve_xyz_speed'):
+            end = args[:3] if method == 'go_xyz_speed' else args[3:6]
+            delta = np.array(end, dtype=np.float64)
+        else:
+            if method in ROTATIONS:
+                heading += ROTATIONS[method] * math.radians(args[0])
+            continue
+        # Body-frame offsets rotated into the start frame
+        cos, sin = math.cos(heading), math.sin(heading)
+        delta = np.array([cos * delta[0] - sin * delta[1], sin * delta[0] + cos * delta[1], delta[2]])
+        position = position + delta
+        points.append(position)
+    return np.array(points)
+
+
+# Pattern builders: parameters -> MissionCommands
+
+def _path_commands(path, **options):
+    """Compile a path and settle only after its last segment."""
+    commands = TrajectoryCompiler(**options).compile(path)
+    return [command._replace(settle=False) for command in commands[:-1]] + commands[-1:]
+
+
+def square_commands(size=50):
+    return [MissionCommand(method, (size,)) for method in
+            ('move_forward', 'move_right', 'move_back', 'move_left')]
+
+
+def triangle_commands(size=60):
+    return [MissionCommand(method, args) for _ in range(3)
+            for method, args in (('move_forward', (size,)), ('rotate_clockwise', (120,)))]
+
+
+def figure_eight_commands(radius=80, curves=True, speed=30):
+    if not MIN_RADIUS <= radius <= MAX_RADIUS:
+        raise ValueError(f"figure_eight radius {radius}: loops must be {MIN_RADIUS}-{MAX_RADIUS} cm")
+    return _path_commands(Arc(radius, 360, 'left').then(Arc(radius, 360, 'right')), speed=speed, curves=curves)
+
+
+def spiral_commands(height=100, turns=3, radius=60, speed=30):
+    if not MIN_RADIUS <= radius <= MAX_RADIUS:
+        raise ValueError(f"spiral radius {radius}: turns must be {MIN_RADIUS}-{MAX_RADIUS} cm")
+    return (_path_commands(Helix(radius, turns, height, 'right'), speed=speed) +
+            _path_commands(Helix(radius, turns, -height, 'left'), speed=speed))
+
+
+PATTERNS = {
+    'square': square_commands,
+    'triangle': triangle_commands,
+    'figure_eight': figure_eight_commands,
+    'spiral': spiral_commands,
+}
+
+
+def _compiler_digest():
+    """Hash of the code that turns patterns into commands.
+
+    Part of every PlanCache key, so plans cached on disk are rebuilt
+    whenever the trajectory compiler or a pattern builder changes.
+    """
+    digest = hashlib.sha1()
+    for source in [trajectory, _path_commands] + list(PATTERNS.values()):
+        try:
+            digest.update(inspect.getsource(source).encode('utf-8'))
+        except (OSError, TypeError):
+            # No source available (e.g. bytecode-only install): fall back to the name
+            digest.update(getattr(source, '__name__', '').encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+COMPILER_DIGEST = _compiler_digest()
+
+
+def pattern_params(pattern, params):
+    """Complete `params` with the pattern's defaults, so equal plans share a key."""
+    if pattern not in PATTERNS:
+        raise ValueError(f"Unknown pattern: {pattern}")
+    bound = inspect.signature(PATTERNS[pattern]).bind(**params)
+    bound.apply_defaults()
+    return dict(bound.arguments)
+
+
+class FlightPlan:
+    """A compiled list of commands with its precomputed cost and extent.
+
+    Everything that does not depend on the day's conditions is worked out
+    once when the plan is built: SDK limit checks, time and battery
+    estimates, and the waypoints used for geofencing. validate() then only
+    compares those numbers against budgets, and run() is a straight loop
+    over the commands. Every pattern returns to its start, so validate()
+    also reports a plan that ends more than `max_gap` cm away from it.
+    """
+
+    def __init__(self, name, params, commands, cost_model=None):
+        self.name = name
+        self.params = dict(params)
+        self.commands = list(commands)
+        self.cost_model = cost_model or CommandCostModel()
+        self.problems = [problem for command in self.commands for problem in sdk_violations(command)]
+        self.estimated_time = sum(self.cost_model.duration(command) for command in self.commands)
+        self.estimated_battery = self.cost_model.battery(self.estimated_time)
+        self.waypoints = waypoints(self.commands)
+
+    def __repr__(self):
+        return (f"FlightPlan({self.name}, {len(self.commands)} commands, "
+                f"~{self.estimated_time:.0f}s, ~{self.estimated_battery:.1f}% battery)")
+
+    def validate(self, battery=None, reserve=20, max_time=None, geofence=None, start_height=80, max_gap=5.0):
+        """Check the plan against today's budgets. Returns a list of problems (empty if OK)."""
+        problems = list(self.problems)
+        gap = np.linalg.norm(self.waypoints[-1])
+        if gap > max_gap:
+            problems.append(f"ends {gap:.0f} cm from its start (at most {max_gap:g} cm)")
+        if battery is not None and battery - self.estimated_battery < reserve:
+            problems.append(f"needs ~{self.estimated_battery:.1f}% battery, have {battery}% "
+                            f"with a {reserve}% reserve")
+        if max_time is not None and self.estimated_time > max_time:
+            problems.append(f"takes ~{self.estimated_time:.0f}s, budget {max_time}s")
+        if geofence is not None:
+            problems += geofence.violations(self.waypoints, start_height)
+        return problems
+
+    def run(self, executor):
+        """Fly the plan with a MissionExecutor. Returns True if every command ran."""
+        return executor.run(self.commands)
+
+    def to_dict(self):
+        return {
+            'version': PLAN_VERSION,
+            'name': self.name,
+            'params': self.params,
+            'commands': [[command.method, list(command.args), command.settle] for command in self.commands],
+            'cost_model': self.cost_model.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != PLAN_VERSION:
+            raise ValueError(f"Unsupported flight plan version: {data.get('version')}")
+        commands = [MissionCommand(method, tuple(args), settle) for method, args, settle in data['commands']]
+        return cls(data['name'], data['params'], commands, CommandCostModel.from_dict(data['cost_model']))
+
+    def save(self, filename):
+        """Write the plan as JSON."""
+        with open(filename, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, filename):
+        """Read a plan written by save()."""
+        with open(filename) as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def compile(cls, pattern, **params):
+        """Build the plan for a named pattern."""
+        params = pattern_params(pattern, params)
+        return cls(pattern, params, PATTERNS[pattern](**params))
+
+
+class PlanCache:
+    """Compiled plans keyed by pattern, parameters and COMPILER_DIGEST, in memory and optionally on disk.
+
+    The directory is only created when the first plan is saved to it.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._plans = {}
+
+    @staticmethod
+    def key(pattern, params):
+        return json.dumps([PLAN_VERSION, COMPILER_DIGEST, pattern, params], sort_keys=True)
+
+    def _filename(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, f"plan_{digest}.json")
+
+    def get(self, pattern, **params):
+        """Return the plan for `pattern` with `params`, compiling it only once."""
+        key = self.key(pattern, pattern_params(pattern, params))
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+
+        filename = self._filename(key) if self.directory else None
+        if filename and os.path.exists(filename):
+            try:
+                plan = FlightPlan.load(filename)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Ignoring cached plan {filename}: {e}")
+        if plan is None:
+            plan = FlightPlan.compile(pattern, **params)
+            if filename:
+                try:
+                    os.makedirs(self.directory, exist_ok=True)
+                    plan.save(filename)
+                except OSError as e:
+                    print(f"Could not cache plan {filename}: {e}")
+        self._plans[key] = plan
+        return plan
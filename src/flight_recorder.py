@@ -0,0 +1,204 @@
+"""
+Flight recorder: telemetry, commands and frame timestamps as binary logs.
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+LOG_VERSION = 1
+
+TELEMETRY_DTYPE = np.dtype([
+    ('timestamp', '<f8'), ('sequence', '<u4'),
+    ('battery', '<i2'), ('height', '<i2'), ('distance_tof', '<i2'),
+    ('barometer', '<f4'), ('flight_time', '<i2'), ('temperature', '<f4'),
+    ('pitch', '<i2'), ('roll', '<i2'), ('yaw', '<i2'),
+    ('speed_x', '<i2'), ('speed_y', '<i2'), ('speed_z', '<i2'),
+    ('acceleration_x', '<f4'), ('acceleration_y', '<f4'), ('acceleration_z', '<f4'),
+])
+
+COMMAND_DTYPE = np.dtype([
+    ('timestamp', '<f8'), ('rtt', '<f4'), ('command', 'S48'), ('response', 'S32'),
+])
+
+FRAME_DTYPE = np.dtype([
+    ('timestamp', '<f8'), ('sequence', '<u4'),
+])
+
+STREAMS = {
+    'telemetry': TELEMETRY_DTYPE,
+    'commands': COMMAND_DTYPE,
+    'frames': FRAME_DTYPE,
+}
+
+
+class ChunkedLog:
+    """Append-only file of fixed-width records, written a chunk at a time.
+
+    Records are filled into a preallocated NumPy buffer; only a full chunk
+    (or flush()) touches the file, and each chunk is flushed to it. The file
+    is the raw record bytes, so it can be opened with np.memmap(dtype=...)
+    while still being written. Appends after close() are ignored.
+    """
+
+    def __init__(self, filename, dtype, chunk_size=512):
+        self.filename = filename
+        self.dtype = dtype
+        self.count = 0
+        self._buffer = np.zeros(chunk_size, dtype=dtype)
+        self._filled = 0
+        self._lock = threading.Lock()
+        self._file = open(filename, 'ab')
+        self.closed = False
+
+    def append(self, *values):
+        """Append one record (values in dtype field order)."""
+        with self._lock:
+            if self.closed:
+                return
+            self._buffer[self._filled] = values
+            self._filled += 1
+            self.count += 1
+            if self._filled == len(self._buffer):
+                self._write()
+
+    def _write(self):
+        self._file.write(self._buffer[:self._filled].tobytes())
+        self._file.flush()
+        self._filled = 0
+
+    def flush(self):
+        """Write buffered records to disk."""
+        with self._lock:
+            if self._filled and not self.closed:
+                self._write()
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            if self._filled:
+                self._write()
+            self.closed = True
+            self._file.close()
+
+
+class FlightRecorder:
+    """Records one flight into its own directory.
+
+    Every state packet (via TelemetryHub.subscribe), every command with its
+    response and round-trip time (via LinkMonitor.subscribe_commands) and
+    every frame's sequence and timestamp go to `telemetry.bin`,
+    `commands.bin` and `frames.bin`. `meta.json` holds the record dtypes
+    so the logs can be memory-mapped later; record counts in it are only
+    written on stop(), so readers should size the arrays from the files.
+
+    attach() subscribes the recorder to a hub and link monitor; stop()
+    detaches it and marks it stopped under its lock before closing the
+    files, so a callback already running on another thread cannot write
+    to a closed log.
+    """
+
+    def __init__(self, directory, chunk_size=512):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.path = None
+        self.logs = {}
+        self.started = None
+        self.recording = False
+        self._lock = threading.Lock()
+        self._detach = []
+
+    def start(self):
+        """Create the flight directory and open the logs. Returns its path."""
+        if self.recording:
+            return self.path
+        self.started = time.time()
+        self.path = os.path.join(self.directory, f"flight_{int(self.started * 1000)}")
+        os.makedirs(self.path, exist_ok=True)
+        self.logs = {name: ChunkedLog(os.path.join(self.path, f"{name}.bin"), dtype, self.chunk_size)
+                     for name, dtype in STREAMS.items()}
+        self._write_meta()
+        self.recording = True
+        print(f"📼 Flight log: {self.path}")
+        return self.path
+
+    def attach(self, hub=None, link=None):
+        """Record every state packet from `hub` and every command from `link` until stop()."""
+        if hub is not None:
+            hub.subscribe(self.record_snapshot)
+            self._detach.append(lambda: hub.unsubscribe(self.record_snapshot))
+        if link is not None:
+            link.subscribe_commands(self.record_command)
+            self._detach.append(lambda: link.unsubscribe_commands(self.record_command))
+
+    def stop(self):
+        """Detach, then flush and close the logs and write the final metadata."""
+        for detach in self._detach:
+            detach()
+        self._detach = []
+        with self._lock:
+            if not self.recording:
+                return
+            self.recording = False
+        for log in self.logs.values():
+            log.close()
+        self._write_meta(ended=time.time())
+        counts = ', '.join(f"{log.count} {name}" for name, log in self.logs.items())
+        print(f"📼 Flight log closed: {counts}")
+
+    def _write_meta(self, ended=None):
+        meta = {
+            'version': LOG_VERSION,
+            'started': self.started,
+            'ended': ended,
+            'streams': {name: {'dtype': dtype.descr, 'file': f"{name}.bin",
+                               'count': self.logs[name].count if name in self.logs else 0}
+                        for name, dtype in STREAMS.items()},
+        }
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    # Hot-path callbacks
+
+    def record_snapshot(self, snapshot):
+        """TelemetryHub subscriber: log one state packet."""
+        with self._lock:
+            if not self.recording:
+                return
+            self.logs['telemetry'].append(
+                snapshot.timestamp, snapshot.sequence,
+                snapshot.battery, snapshot.height, snapshot.distance_tof,
+                snapshot.barometer, snapshot.flight_time, snapshot.temperature,
+                snapshot.pitch, snapshot.roll, snapshot.yaw,
+                snapshot.speed_x, snapshot.speed_y, snapshot.speed_z,
+                snapshot.acceleration_x, snapshot.acceleration_y, snapshot.acceleration_z)
+
+    def record_command(self, command, response, sent_at, rtt):
+        """LinkMonitor command listener: log a command and its response."""
+        with self._lock:
+            if not self.recording:
+                return
+            self.logs['commands'].append(sent_at, rtt, str(command).encode('utf-8')[:48],
+                                         str(response).encode('utf-8', errors='replace')[:32])
+
+    def record_frame(self, view):
+        """Frame consumer: log a frame's sequence and timestamp."""
+        with self._lock:
+            if not self.recording:
+                return
+            self.logs['frames'].append(view.timestamp, view.sequence)
+
+
+def read_meta(path):
+    """Load a flight directory's meta.json."""
+    with open(os.path.join(path, 'meta.json')) as f:
+        return json.load(f)
+
+
+def stream_dtype(meta, name):
+    """The record dtype of a stream as stored in meta.json."""
+    return np.dtype([tuple(field) for field in meta['streams'][name]['dtype']])
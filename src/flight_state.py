@@ -0,0 +1,157 @@
+"""
+Streaming flight-state estimation from Tello state packets.
+"""
+
+import numpy as np
+
+LANDED = 'landed'
+AIRBORNE = 'airborne'
+CRASH = 'crash'
+
+# Tello reports acceleration in thousandths of g
+ONE_G = 1000.0
+
+
+class FlightEvent:
+    """A detected flight-state transition."""
+
+    __slots__ = ('kind', 'timestamp', 'height', 'detail')
+
+    def __init__(self, kind, timestamp, height, detail=''):
+        self.kind = kind
+        self.timestamp = timestamp
+        self.height = height
+        self.detail = detail
+
+    def __repr__(self):
+        return f"FlightEvent({self.kind}, t={self.timestamp:.3f}, height={self.height}cm)"
+
+
+class FlightStateEstimator:
+    """Estimates landed/airborne state over a sliding window of state packets.
+
+    Every packet goes into fixed-size ring arrays (height, ToF, vertical
+    speed, acceleration magnitude). The decision uses the last `confirm`
+    packets, so a transition is reported within a few hundred milliseconds.
+    A landing is reported as a crash when the window also shows an impact
+    (acceleration deviating from 1 g by more than `impact_mg`) or a descent
+    faster than `crash_descent_rate`.
+
+    Heights are quantized and packets can arrive in bursts, so the descent
+    rate is a least-squares slope over stretches of at least
+    `min_descent_span` seconds, never a single packet step. Flips pull
+    well over the impact threshold, so acceleration from the `flip_grace`
+    seconds after a flip is left out of the impact rule; a flip is seen
+    from the attitude passing `flip_angle` degrees, or reported with
+    note_flip().
+    """
+
+    def __init__(self, window=32, confirm=3, airborne_height=30, landed_height=10,
+                 ground_tof=20, still_speed=2, impact_mg=1500, crash_descent_rate=150,
+                 min_descent_span=0.3, flip_angle=60, flip_grace=3.0):
+        self.window = window
+        self.confirm = confirm
+        self.airborne_height = airborne_height
+        self.landed_height = landed_height
+        self.ground_tof = ground_tof
+        self.still_speed = still_speed
+        self.impact_mg = impact_mg
+        self.crash_descent_rate = crash_descent_rate
+        self.min_descent_span = min_descent_span
+        self.flip_angle = flip_angle
+        self.flip_grace = flip_grace
+        self.state = None
+        self._last_flip = None
+        self._time = np.zeros(window)
+        self._height = np.zeros(window)
+        self._tof = np.zeros(window)
+        self._speed_z = np.zeros(window)
+        self._accel = np.zeros(window)
+        self._index = 0
+        self._count = 0
+
+    def update(self, snapshot):
+        """Add a snapshot and return the list of FlightEvents it triggers."""
+        i = self._index
+        self._time[i] = snapshot.timestamp
+        self._height[i] = snapshot.height
+        self._tof[i] = snapshot.distance_tof
+        self._speed_z[i] = snapshot.speed_z
+        self._accel[i] = np.sqrt(snapshot.acceleration_x ** 2 +
+                                 snapshot.acceleration_y ** 2 +
+                                 snapshot.acceleration_z ** 2)
+        self._index = (i + 1) % self.window
+        self._count = min(self._count + 1, self.window)
+        if max(abs(snapshot.pitch), abs(snapshot.roll)) > self.flip_angle:
+            self._last_flip = snapshot.timestamp
+
+        if self._count < self.confirm:
+            return []
+
+        recent = (self._index - 1 - np.arange(self.confirm)) % self.window
+        height = self._height[recent]
+        tof = self._tof[recent]
+
+        if np.all((height > self.airborne_height) | (tof > self.airborne_height + self.ground_tof)):
+            if self.state != AIRBORNE:
+                self.state = AIRBORNE
+                return [FlightEvent(AIRBORNE, snapshot.timestamp, snapshot.height)]
+            return []
+
+        on_ground = (height < self.landed_height) & (tof <= self.ground_tof)
+        still = np.abs(self._speed_z[recent]) <= self.still_speed
+        if np.all(on_ground & still):
+            previous = self.state
+            if previous == LANDED:
+                return []
+            self.state = LANDED
+            impact = self._impact_detail() if previous == AIRBORNE else ''
+            kind = CRASH if impact else LANDED
+            return [FlightEvent(kind, snapshot.timestamp, snapshot.height, impact)]
+
+        return []
+
+    def note_flip(self, timestamp=None):
+        """Record a flip (default: at the latest packet's time)."""
+        if timestamp is None:
+            timestamp = self._time[(self._index - 1) % self.window]
+        self._last_flip = timestamp
+
+    def _ordered(self, values):
+        """Return ring array contents oldest first."""
+        if self._count < self.window:
+            return values[:self._count]
+        return np.roll(values, -self._index)
+
+    def _impact_detail(self):
+        """Describe an impact in the window, or return '' if there was none."""
+        accel = self._ordered(self._accel)
+        if self._last_flip is not None:
+            accel = accel[self._ordered(self._time) >= self._last_flip + self.flip_grace]
+        peak = np.max(np.abs(accel - ONE_G)) if accel.size else 0.0
+        if peak > self.impact_mg:
+            return f"impact {peak / ONE_G:.1f}g"
+
+        descent = self._max_descent_rate()
+        if descent > self.crash_descent_rate:
+            return f"descent {descent:.0f}cm/s"
+        return ''
+
+    def _max_descent_rate(self):
+        """Fastest descent (cm/s) fitted over any stretch of at least min_descent_span seconds."""
+        times = self._ordered(self._time)
+        heights = self._ordered(self._height)
+        fastest = 0.0
+        start = 0
+        for end in range(1, len(times)):
+            # Shortest stretch ending here that spans min_descent_span
+            while start + 1 < end and times[end] - times[start + 1] >= self.min_descent_span:
+                start += 1
+            t = times[start:end + 1] - times[start]
+            if t[-1] < self.min_descent_span:
+                continue
+            h = heights[start:end + 1]
+            centred = t - t.mean()
+            slope = centred.dot(h - h.mean()) / centred.dot(centred)
+            fastest = max(fastest, -slope)
+        return fastest
@@ -0,0 +1,143 @@
+"""
+Preallocated frame ring buffer shared by the video stream consumers.
+"""
+
+import threading
+import time
+import numpy as np
+
+
+class FrameView:
+    """Read-only view of a published frame with its sequence number and timestamp."""
+
+    __slots__ = ('frame', 'sequence', 'timestamp')
+
+    def __init__(self, frame, sequence, timestamp):
+        self.frame = frame
+        self.sequence = sequence
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"FrameView(seq={self.sequence}, shape={self.frame.shape})"
+
+
+class FrameRing:
+    """Ring of N preallocated frame buffers.
+
+    The decoder side calls publish(), which copies the decoded frame into the
+    next slot and hands out a read-only view of it. Readers (display, photo,
+    recorder, analysis) share that view without copying. A slot is reused
+    only after `size - 1` further frames, so a view stays consistent while
+    its consumer works on it; use is_current() to check, or copy the frame
+    if it must be kept longer.
+    """
+
+    def __init__(self, size=4, clock=time.time):
+        if size < 2:
+            raise ValueError("FrameRing needs at least 2 slots")
+        self.size = size
+        self.clock = clock
+        self._slots = None
+        self._lock = threading.Lock()
+        self._published = threading.Condition(self._lock)
+        self._latest = None
+        self._sequence = 0
+
+    def _allocate(self, frame):
+        """(Re)allocate the slots to match the incoming frame geometry."""
+        self._slots = [np.empty_like(frame) for _ in range(self.size)]
+
+    def publish(self, frame, overlay=None):
+        """Copy a decoded frame into the next slot and publish it.
+
+        `overlay`, if given, is called with the writable slot before the frame
+        becomes visible to readers (used to composite the HUD in place).
+        """
+        slots = self._slots
+        if slots is None or slots[0].shape != frame.shape or slots[0].dtype != frame.dtype:
+            self._allocate(frame)
+            slots = self._slots
+
+        sequence = self._sequence + 1
+        slot = slots[sequence % self.size]
+        np.copyto(slot, frame)
+        if overlay is not None:
+            overlay(slot)
+
+        readonly = slot.view()
+        readonly.flags.writeable = False
+        view = FrameView(readonly, sequence, self.clock())
+        with self._lock:
+            self._sequence = sequence
+            self._latest = view
+            self._published.notify_all()
+        return view
+
+    def latest(self):
+        """Return the most recently published frame view, or None."""
+        return self._latest
+
+    def wait_for_newer(self, sequence, timeout=None):
+        """Block until a frame newer than `sequence` is published.
+
+        Returns the latest view, or None if nothing new arrived within timeout.
+        """
+        with self._lock:
+            if not self._published.wait_for(lambda: self._sequence > sequence, timeout):
+                return None
+            return self._latest
+
+    @property
+    def sequence(self):
+        """Sequence number of the most recently published frame."""
+        return self._sequence
+
+    def is_current(self, view):
+        """True while the slot behind `view` has not been overwritten."""
+        return view is not None and self._sequence - view.sequence < self.size - 1
+
+
+class FramePacer:
+    """Paces a display loop to new frames and a target frame rate.
+
+    next_frame() sleeps until the ring publishes a new sequence number, never
+    returning frames faster than `target_fps`. Frames published in between
+    are counted as dropped; display intervals that pass without a new frame
+    (the previous frame stays on screen) are counted as duplicated.
+    """
+
+    def __init__(self, ring, target_fps=30, clock=time.monotonic):
+        self.ring = ring
+        self.interval = 1.0 / target_fps
+        self.clock = clock
+        self.shown = 0
+        self.dropped = 0
+        self.duplicated = 0
+        self._last_sequence = 0
+        self._next_due = None
+
+    def next_frame(self, timeout=0.1):
+        """Return the next frame view to display, or None on timeout."""
+        now = self.clock()
+        if self._next_due is not None and now < self._next_due:
+            time.sleep(self._next_due - now)
+
+        view = self.ring.wait_for_newer(self._last_sequence, timeout)
+        now = self.clock()
+        if view is None:
+            if self._next_due is not None and now >= self._next_due:
+                missed = int((now - self._next_due) // self.interval) + 1
+                self.duplicated += missed
+                self._next_due += missed * self.interval
+            return None
+
+        if self._last_sequence:
+            self.dropped += max(0, view.sequence - self._last_sequence - 1)
+        self._last_sequence = view.sequence
+        self._next_due = now + self.interval
+        self.shown += 1
+        return view
+
+    def stats(self):
+        """Return display counters as a dict."""
+        return {'shown': self.shown, 'dropped': self.dropped, 'duplicated': self.duplicated}
@@ -0,0 +1,137 @@
+"""
+Heads-up display overlay for the Tello camera feed.
+"""
+
+import time
+import cv2
+import numpy as np
+
+HUD_FONT = cv2.FONT_HERSHEY_SIMPLEX
+HUD_GREEN = (0, 255, 0)
+HUD_RED = (0, 0, 255)
+HUD_THICKNESS = 2
+LOW_ALTITUDE_CM = 50
+
+
+class HudCompositor:
+    """Caches the rasterized HUD text as a small tile.
+
+    The tile is rebuilt only when the text changes. putText anti-aliases
+    glyph edges, so each pixel it draws is `frame * k + m` for the pixel's
+    coverage `k`. Rendering the text once on black (m) and once on white
+    recovers k. Drawing the tile onto a frame is then `roi * k + m` over
+    the tile's region of interest, done with two saturating OpenCV calls,
+    which matches drawing with putText directly.
+    """
+
+    def __init__(self):
+        self.tile = None
+        self.keep = None
+        self.origin = (0, 0)
+        self._lines = None
+
+    def render(self, lines):
+        """Rasterize (text, origin, scale, color) lines into the cached tile."""
+        if lines == self._lines:
+            return
+        self._lines = list(lines)
+        if not lines:
+            self.tile = None
+            self.keep = None
+            return
+
+        # Bounding box of all lines in frame coordinates
+        boxes = []
+        for text, (x, y), scale, _ in lines:
+            (width, height), baseline = cv2.getTextSize(text, HUD_FONT, scale, HUD_THICKNESS)
+            boxes.append((x, y - height, x + width, y + baseline))
+        pad = HUD_THICKNESS
+        left = max(0, min(box[0] for box in boxes) - pad)
+        top = max(0, min(box[1] for box in boxes) - pad)
+        right = max(box[2] for box in boxes) + pad
+        bottom = max(box[3] for box in boxes) + pad
+
+        shape = (bottom - top, right - left, 3)
+        tile = np.zeros(shape, dtype=np.uint8)
+        white = np.full(shape, 255, dtype=np.uint8)
+        for text, (x, y), scale, color in lines:
+            for canvas in (tile, white):
+                cv2.putText(canvas, text, (x - left, y - top), HUD_FONT, scale, color, HUD_THICKNESS)
+
+        self.tile = tile
+        # 255 * k: 0 where the text fully covers the frame, 255 where untouched
+        self.keep = cv2.subtract(white, tile)
+        self.origin = (left, top)
+
+    def composite(self, frame):
+        """Blend the cached tile onto a BGR frame in place."""
+        if self.tile is None:
+            return
+        left, top = self.origin
+        rows = min(self.tile.shape[0], frame.shape[0] - top)
+        cols = min(self.tile.shape[1], frame.shape[1] - left)
+        if rows <= 0 or cols <= 0:
+            return
+        roi = frame[top:top + rows, left:left + cols]
+        cv2.multiply(roi, self.keep[:rows, :cols], dst=roi, scale=1 / 255)
+        cv2.add(roi, self.tile[:rows, :cols], dst=roi)
+
+
+class HudRenderer:
+    """Builds HUD text from telemetry at a fixed rate instead of once per frame.
+
+    The text lines are only rebuilt when a new state packet has arrived (or
+    the flying flag changed) and at most `rate_hz` times per second. Every
+    frame in between reuses the cached lines.
+    """
+
+    def __init__(self, telemetry, rate_hz=10):
+        self.telemetry = telemetry
+        self.period = 1.0 / rate_hz
+        self.lines = []
+        self.compositor = HudCompositor()
+        self._last_update = 0.0
+        self._last_key = None
+
+    def update(self, flying, now=None):
+        """Refresh the cached lines if due. Returns True when the text changed."""
+        now = now if now is not None else time.monotonic()
+        if now - self._last_update < self.period:
+            return False
+        self._last_update = now
+
+        snapshot = self.telemetry.snapshot()
+        key = (snapshot.sequence if snapshot is not None else None, flying)
+        if key == self._last_key:
+            return False
+        self._last_key = key
+
+        lines = self._build_lines(snapshot, flying)
+        if lines == self.lines:
+            return False
+        self.lines = lines
+        self.compositor.render(lines)
+        return True
+
+    def _build_lines(self, snapshot, flying):
+        """Format the HUD lines as (text, origin, scale, color) tuples."""
+        if snapshot is None:
+            # Fallback if no state packet has arrived yet
+            return [
+                (f"Flying: {flying} | Battery: N/A", (10, 30), 0.6, HUD_GREEN),
+                ("Height: N/A | ToF Distance: N/A", (10, 55), 0.6, HUD_GREEN),
+                ("Sensors: Error", (10, 80), 0.6, HUD_GREEN),
+            ]
+
+        lines = [
+            (f"Flying: {flying} | Battery: {snapshot.battery}%", (10, 30), 0.6, HUD_GREEN),
+            (f"Height: {snapshot.height}cm | ToF Distance: {snapshot.distance_tof}cm", (10, 55), 0.6, HUD_GREEN),
+            (f"Pitch: {snapshot.pitch:.1f}° | Roll: {snapshot.roll:.1f}°", (10, 80), 0.6, HUD_GREEN),
+        ]
+        if snapshot.distance_tof < LOW_ALTITUDE_CM:
+            lines.append(("⚠️ LOW ALTITUDE WARNING!", (10, 110), 0.7, HUD_RED))
+        return lines
+
+    def draw(self, frame):
+        """Composite the cached HUD tile onto a frame in place."""
+        self.compositor.composite(frame)
@@ -0,0 +1,134 @@
+"""
+Link liveness statistics for the Tello connection.
+"""
+
+import collections
+import threading
+import time
+
+import numpy as np
+
+TIMEOUT_PREFIX = 'Aborting command'
+
+
+class LinkMonitor:
+    """Tracks state packet and command response arrivals without extra traffic.
+
+    Inter-arrival times of state packets give the packet rate, jitter and an
+    estimate of lost packets (gaps spanning several expected intervals).
+    Command round-trip times come from the responses to commands we send
+    anyway. The link counts as lost once nothing has arrived for
+    `silence_deadline` seconds.
+
+    Note that djitellopy polls for responses every 100 ms, so RTTs are
+    quantized to that resolution.
+    """
+
+    def __init__(self, silence_deadline=1.0, expected_interval=0.1, history=200):
+        self.silence_deadline = silence_deadline
+        self.expected_interval = expected_interval
+        self.packets = 0
+        self.lost_packets = 0
+        self.commands = 0
+        self.command_timeouts = 0
+        self.last_packet_time = None
+        self.last_response_time = None
+        self._intervals = collections.deque(maxlen=history)
+        self._rtts = collections.deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._command_listeners = []
+
+    def record_packet(self, now=None):
+        """Record the arrival of a state packet."""
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            if self.last_packet_time is not None:
+                interval = now - self.last_packet_time
+                self._intervals.append(interval)
+                # A gap of several expected intervals means packets went missing
+                missed = int(round(interval / self.expected_interval)) - 1
+                if missed > 0:
+                    self.lost_packets += missed
+            self.last_packet_time = now
+            self.packets += 1
+
+    def record_response(self, rtt, response, now=None):
+        """Record a command response (or timeout) and its round-trip time."""
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            self.commands += 1
+            if isinstance(response, str) and response.startswith(TIMEOUT_PREFIX):
+                self.command_timeouts += 1
+                return
+            self._rtts.append(rtt)
+            self.last_response_time = now
+
+    def subscribe_commands(self, callback):
+        """Call `callback(command, response, sent_at, rtt)` for every instrumented command."""
+        if callback not in self._command_listeners:
+            self._command_listeners.append(callback)
+
+    def unsubscribe_commands(self, callback):
+        """Stop calling `callback` for commands."""
+        if callback in self._command_listeners:
+            self._command_listeners.remove(callback)
+
+    def last_activity(self):
+        """Time of the most recent packet or response, or None."""
+        times = [t for t in (self.last_packet_time, self.last_response_time) if t is not None]
+        return max(times) if times else None
+
+    def silent_for(self, now=None):
+        """Seconds since anything arrived from the drone (0 before first contact)."""
+        last = self.last_activity()
+        if last is None:
+            return 0.0
+        return (now if now is not None else time.monotonic()) - last
+
+    def is_lost(self, now=None):
+        """True once the silence deadline has passed."""
+        return self.last_activity() is not None and self.silent_for(now) >= self.silence_deadline
+
+    def stats(self, now=None):
+        """Return link statistics as a dict (times in milliseconds)."""
+        with self._lock:
+            intervals = np.array(self._intervals)
+            rtts = np.array(self._rtts)
+            packets = self.packets
+            lost = self.lost_packets
+        stats = {
+            'packets': packets,
+            'packet_loss': lost / (packets + lost) if packets + lost else 0.0,
+            'packet_rate_hz': float(1.0 / intervals.mean()) if intervals.size else 0.0,
+            'jitter_ms': float(intervals.std() * 1000) if intervals.size else 0.0,
+            'commands': self.commands,
+            'command_timeouts': self.command_timeouts,
+            'rtt_p50_ms': 0.0,
+            'rtt_p95_ms': 0.0,
+            'rtt_max_ms': 0.0,
+            'silent_for_s': self.silent_for(now),
+        }
+        if rtts.size:
+            p50, p95 = np.percentile(rtts, [50, 95])
+            stats.update(rtt_p50_ms=float(p50 * 1000), rtt_p95_ms=float(p95 * 1000),
+                         rtt_max_ms=float(rtts.max() * 1000))
+        return stats
+
+    def instrument(self, tello):
+        """Time every command sent through a djitellopy Tello instance."""
+        send = tello.send_command_with_return
+
+        def timed_send(command, *args, **kwargs):
+            sent_at = time.time()
+            start = time.monotonic()
+            response = send(command, *args, **kwargs)
+            rtt = time.monotonic() - start
+            self.record_response(rtt, response)
+            for listener in list(self._command_listeners):
+                try:
+                    listener(command, response, sent_at, rtt)
+                except Exception as e:
+                    print(f"Command listener error: {e}")
+            return response
+
+        tello.send_command_with_return = timed_send
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Mission files: command lists checked and costed before takeoff.
+
+A mission is a JSON file:
+
+    {
+      "name": "garden survey",
+      "reserve": 25,
+      "max_time": 240,
+      "geofence": {"radius": 400, "min_height": 30, "max_height": 250},
+      "steps": [
+        "takeoff",
+        "up 50",
+        {"pattern": "square", "size": 100},
+        "wait 2",
+        "photo burst 3 1",
+        "cw 180",
+        "land"
+      ]
+    }
+
+String steps are interactive controller commands (see flight_control's
+COMMANDS) plus `wait <seconds>`. Object steps fly a named flight pattern
+with its parameters.
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import argparse
+import collections
+import json
+import threading
+import time
+
+from commands import ArgSpec, CommandSpec, CommandRegistry, CommandError
+from flight_control import COMMANDS, InteractiveTelloController, TAKEOFF_SETTLE, LAND_SETTLE, EMERGENCY_SETTLE
+from flight_log import find_flights
+from flight_plan import CommandCostModel, Geofence, PlanCache, PATTERNS, sdk_violations, waypoints
+from mission_executor import MissionCommand, MissionExecutor
+from utils import safe_delay, emergency_stop
+
+MISSION_VERSION = 1
+
+# Interactive-only commands that make no sense in a mission
+EXCLUDED = ('reconnect', 'script', 'help', 'quit')
+
+MissionStep = collections.namedtuple('MissionStep', ['number', 'label', 'parsed', 'plan', 'commands', 'seconds'])
+MissionStep.__doc__ = """One mission step: a parsed command or a pattern plan, with its cost."""
+
+SDK_METHODS = {
+    'forward': 'move_forward', 'back': 'move_back', 'left': 'move_left',
+    'right': 'move_right', 'up': 'move_up', 'down': 'move_down',
+    'cw': 'rotate_clockwise', 'ccw': 'rotate_counter_clockwise',
+}
+
+
+def _wait(target, seconds):
+    safe_delay(seconds)
+
+
+MISSION_COMMANDS = CommandRegistry(
+    [spec for spec in COMMANDS.specs if spec.name not in EXCLUDED] +
+    [CommandSpec('wait', _wait, args=[ArgSpec('seconds', float, low=0, high=600)], guards=(),
+                 help="Hover (or wait on the ground) for a number of seconds")])
+
+
+def sdk_commands(parsed):
+    """The djitellopy calls a parsed command makes, as MissionCommands (for costing)."""
+    name, args = parsed.spec.name, parsed.args
+    if name in SDK_METHODS:
+        return [MissionCommand(SDK_METHODS[name], args)]
+    if name == 'rotate':
+        degrees, direction = args
+        return [MissionCommand(SDK_METHODS[direction], (degrees,))]
+    if name == 'flip':
+        return [MissionCommand('flip', args)]
+    if name == 'rc':
+        # Streamed by RCFollower rather than one SDK call: the straight line
+        # it flies, as (direction, distance, speed)
+        direction, speed, duration = args
+        return [MissionCommand('rc', (direction, speed * duration, speed))]
+    if name in ('takeoff', 'land'):
+        return [MissionCommand(name)]
+    return []
+
+
+# Pauses the controller's handlers add after their SDK call
+SETTLE_SECONDS = {'takeoff': TAKEOFF_SETTLE, 'land': LAND_SETTLE, 'emergency': EMERGENCY_SETTLE}
+
+
+def _extra_seconds(parsed):
+    """Time a command takes beyond its SDK calls (handler pauses, waits and photo bursts)."""
+    name, args = parsed.spec.name, parsed.args
+    if name in SETTLE_SECONDS:
+        return SETTLE_SECONDS[name]
+    if name == 'wait':
+        return args[0]
+    if name == 'photo' and args[0] == 'burst':
+        return (args[1] - 1) * args[2]
+    return 0.0
+
+
+class Mission:
+    """A mission file, parsed, checked and costed once when loaded.
+
+    Every step is parsed strictly, so out-of-range distances and angles
+    are errors rather than clamped, and the flight state is followed
+    through the steps to catch moves before takeoff. Each step's SDK calls
+    are checked against the SDK limits and costed with `cost_model`; the
+    waypoints of the whole mission are kept for the geofence. validate()
+    then compares the totals with the day's budgets, as FlightPlan does.
+    """
+
+    def __init__(self, name, steps, cost_model=None, plans=None, reserve=20, max_time=None,
+                 geofence=None, start_height=80):
+        self.name = name
+        self.cost_model = cost_model or CommandCostModel()
+        self.plans = plans or PlanCache()
+        self.reserve = reserve
+        self.max_time = max_time
+        self.geofence = Geofence(**geofence) if isinstance(geofence, dict) else geofence
+        self.start_height = start_height
+        self.problems = []
+        self.steps = self._compile(steps)
+        self.commands = [command for step in self.steps for command in step.commands]
+        self.problems += [f"step {step.number}: {problem}" for step in self.steps
+                          for command in step.commands for problem in sdk_violations(command)]
+        self.estimated_time = sum(step.seconds for step in self.steps)
+        self.estimated_battery = self.cost_model.battery(self.estimated_time)
+        self.waypoints = waypoints(self.commands)
+
+    def __repr__(self):
+        return (f"Mission({self.name}, {len(self.steps)} steps, "
+                f"~{self.estimated_time:.0f}s, ~{self.estimated_battery:.1f}% battery)")
+
+    def _compile(self, steps):
+        compiled = []
+        flying = False
+        for number, step in enumerate(steps, 1):
+            try:
+                if isinstance(step, dict):
+                    parsed, plan = None, self._pattern_plan(step)
+                    label = f"pattern {plan.name} " + ' '.join(f"{k}={v}" for k, v in plan.params.items())
+                    commands = plan.commands
+                    seconds = sum(self.cost_model.duration(command) for command in commands)
+                    needs_flying, lands = True, None
+                elif isinstance(step, str):
+                    parsed = MISSION_COMMANDS.parse(step, strict=True)
+                    if parsed is None:
+                        raise CommandError("empty step")
+                    plan, label = None, parsed.line
+                    commands = sdk_commands(parsed)
+                    seconds = sum(self.cost_model.duration(command) for command in commands) + \
+                        _extra_seconds(parsed)
+                    needs_flying = 'flying' in parsed.spec.guards
+                    if 'landed' in parsed.spec.guards and flying:
+                        raise CommandError(f"'{parsed.spec.name}' while already flying")
+                    lands = parsed.spec.flying
+                else:
+                    raise CommandError(f"steps must be strings or objects, not {type(step).__name__}")
+            except (CommandError, ValueError, TypeError) as e:
+                self.problems.append(f"step {number}: {e}")
+                continue
+            if needs_flying and not flying:
+                self.problems.append(f"step {number}: '{label}' before takeoff")
+            if lands is not None:
+                flying = lands
+            compiled.append(MissionStep(number, label, parsed, plan, commands, seconds))
+        if flying:
+            self.problems.append("mission ends in the air (no 'land' step)")
+        return compiled
+
+    def _pattern_plan(self, step):
+        params = dict(step)
+        pattern = params.pop('pattern', None)
+        if pattern not in PATTERNS:
+            raise CommandError(f"unknown pattern '{pattern}' (use: {', '.join(PATTERNS)})")
+        return self.plans.get(pattern, **params)
+
+    def validate(self, battery=None):
+        """Check the mission against its budgets. Returns a list of problems (empty if OK)."""
+        problems = list(self.problems)
+        if battery is not None and battery - self.estimated_battery < self.reserve:
+            problems.append(f"needs ~{self.estimated_battery:.1f}% battery, have {battery}% "
+                            f"with a {self.reserve}% reserve")
+        if self.max_time is not None and self.estimated_time > self.max_time:
+            problems.append(f"takes ~{self.estimated_time:.0f}s, budget {self.max_time}s")
+        if self.geofence is not None:
+            problems += self.geofence.violations(self.waypoints, self.start_height)
+        return problems
+
+    def print_estimate(self):
+        """Per-step time estimate and totals."""
+        print(f"\n=== Mission: {self.name} ===")
+        for step in self.steps:
+            print(f"  {step.number:>3}. {step.label:<40} ~{step.seconds:5.1f}s")
+        print(f"Total: ~{self.estimated_time:.0f}s, ~{self.estimated_battery:.1f}% battery")
+        print("=" * 24)
+
+    def run(self, interactive, executor=None):
+        """Fly the mission through an InteractiveTelloController. Returns True if every step ran."""
+        executor = executor or MissionExecutor(interactive.controller)
+        start = time.monotonic()
+        for step in self.steps:
+            if not interactive.running:
+                print("Mission interrupted")
+                return False
+            print(f"\n▶️  Step {step.number}/{len(self.steps)}: {step.label}")
+            if step.plan is not None:
+                if not interactive.flying:
+                    print("Must takeoff first!")
+                    ok = False
+                else:
+                    try:
+                        ok = step.plan.run(executor)
+                    except Exception as e:
+                        print(f"Pattern '{step.plan.name}' failed: {e}")
+                        ok = False
+            else:
+                interactive.photo_burst = None
+                ok = interactive._dispatch(step.parsed)
+                if ok and interactive.photo_burst is not None:
+                    # Hold position until the burst is done, as the estimate assumes
+                    interactive.photo_burst.join()
+            if not ok:
+                print(f"❌ Mission stopped at step {step.number}")
+                return False
+        elapsed = time.monotonic() - start
+        print(f"✅ Mission {self.name} complete in {elapsed:.0f}s (estimated {self.estimated_time:.0f}s)")
+        return True
+
+    @classmethod
+    def from_dict(cls, data, cost_model=None, plans=None):
+        if data.get('version', MISSION_VERSION) != MISSION_VERSION:
+            raise ValueError(f"Unsupported mission version: {data.get('version')}")
+        if not isinstance(data.get('steps'), list):
+            raise ValueError("A mission needs a list of steps")
+        return cls(data.get('name', 'mission'), data['steps'], cost_model, plans,
+                   reserve=data.get('reserve', 20), max_time=data.get('max_time'),
+                   geofence=data.get('geofence'), start_height=data.get('start_height', 80))
+
+    @classmethod
+    def load(cls, filename, cost_model=None, plans=None):
+        """Read and check a mission file."""
+        with open(filename) as f:
+            data = json.load(f)
+        data.setdefault('name', os.path.splitext(os.path.basename(filename))[0])
+        return cls.from_dict(data, cost_model, plans)
+
+
+def load_cost_model(flights=None, model_file=None):
+    """A cost model from a saved JSON file, calibrated from flight logs, or the defaults."""
+    if model_file:
+        with open(model_file) as f:
+            return CommandCostModel.from_dict(json.load(f))
+    paths = find_flights(flights) if flights and os.path.isdir(flights) else []
+    if not paths:
+        return CommandCostModel()
+    model = CommandCostModel.calibrate(paths)
+    print(f"📐 Cost model calibrated from {len(paths)} flight(s): "
+          f"move {model.move_speed:.0f} cm/s, rotate {model.rotate_rate:.0f}°/s, "
+          f"overhead {model.overhead:.2f}s, drain {model.drain_per_s * 60:.1f}%/min")
+    return model
+
+
+def fly_mission(mission, headless=True):
+    """Connect, check the mission against the real battery, and fly it."""
+    interactive = InteractiveTelloController(headless=headless)
+    print("Connecting to Tello...")
+    if not interactive.controller.connect():
+        print("Failed to connect to Tello. Make sure drone is on and connected to WiFi.")
+        return False
+    interactive.connection.link_up()
+
+    try:
+        battery = interactive.controller.battery_level()
+        if battery is None:
+            # Flying on an unchecked battery is worse than not flying
+            print(f"❌ Mission {mission.name} not flown: battery level unknown (no state packet yet)")
+            return False
+        problems = mission.validate(battery=battery)
+        if problems:
+            print(f"❌ Mission {mission.name} not flown (battery {battery}%):")
+            for problem in problems:
+                print(f"  - {problem}")
+            return False
+
+        interactive.start_flight_log()
+        interactive.start_monitoring()
+        if any(step.parsed is not None and step.parsed.spec.name == 'photo' for step in mission.steps):
+            video_thread = threading.Thread(target=interactive.start_video_stream)
+            video_thread.daemon = True
+            video_thread.start()
+            time.sleep(2)  # Let video start
+
+        completed = mission.run(interactive)
+        if not completed and interactive.flying:
+            print("Landing drone...")
+            interactive.controller.land()
+            interactive.flying = False
+        interactive.stop_video_stream()
+        interactive.photos.flush()
+        return completed
+
+    except Exception as e:
+        print(f"Mission error: {e}")
+        if interactive.flying:
+            print("Emergency landing...")
+            emergency_stop(interactive.controller.tello)
+        return False
+
+    finally:
+        interactive.stop_flight_log()
+        interactive.controller.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check, estimate and fly a Tello mission file")
+    parser.add_argument('mission', help="mission JSON file")
+    parser.add_argument('--dry-run', action='store_true', help="check and estimate only; do not connect")
+    parser.add_argument('--battery', type=int, default=None, help="battery level to check a dry run against")
+    parser.add_argument('--flights', default=os.path.join(os.path.dirname(__file__), '..', 'flights'),
+                        help="flight logs to calibrate the cost model from")
+    parser.add_argument('--cost-model', help="cost model JSON (overrides calibration)")
+    parser.add_argument('--save-cost-model', help="write the cost model used to this JSON file")
+    args = parser.parse_args()
+
+    model = load_cost_model(args.flights, args.cost_model)
+    if args.save_cost_model:
+        with open(args.save_cost_model, 'w') as f:
+            json.dump(model.to_dict(), f, indent=2)
+
+    mission = Mission.load(args.mission, model, PlanCache(os.path.join(os.path.dirname(__file__), '..', 'plans')))
+    mission.print_estimate()
+    problems = mission.validate(battery=args.battery)
+    if problems:
+        print(f"❌ {len(problems)} problem(s) in {args.mission}:")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print("✅ Mission checks passed")
+
+    if not args.dry_run:
+        sys.exit(0 if fly_mission(mission) else 1)
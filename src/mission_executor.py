@@ -0,0 +1,102 @@
+"""
+Queued execution of flight commands with telemetry-driven settling.
+"""
+
+import collections
+import threading
+import time
+
+MissionCommand = collections.namedtuple('MissionCommand', ['method', 'args', 'settle'], defaults=((), True))
+MissionCommand.__doc__ = """One djitellopy call: tello.<method>(*args), optionally settled afterwards."""
+
+
+class SettleCondition:
+    """When the drone counts as settled after a command.
+
+    The velocity reported in state packets (vgx, vgy, vgz) must stay within
+    `max_speed` for `quiet_packets` packets in a row. After `timeout`
+    seconds the executor moves on anyway.
+    """
+
+    def __init__(self, max_speed=1, quiet_packets=2, timeout=2.0):
+        self.max_speed = max_speed
+        self.quiet_packets = quiet_packets
+        self.timeout = timeout
+
+    def is_still(self, snapshot):
+        """True if the snapshot shows the drone hovering in place."""
+        return max(abs(snapshot.speed_x), abs(snapshot.speed_y), abs(snapshot.speed_z)) <= self.max_speed
+
+
+class MissionExecutor:
+    """Runs a list of MissionCommands back to back.
+
+    djitellopy's control commands already block until the drone answers
+    "ok", so the next command is sent as soon as the previous one is
+    acknowledged. Commands marked `settle` then wait for the SettleCondition
+    on fresh telemetry instead of a fixed sleep; pass settle=False to
+    pipeline without settling at all.
+    """
+
+    def __init__(self, controller, settle=None, poll_interval=0.01, verbose=True):
+        self.controller = controller
+        self.settling = settle is not False
+        self.settle_condition = settle if settle else SettleCondition()
+        self.poll_interval = poll_interval
+        self.verbose = verbose
+        self.commands_run = 0
+        self.settle_time = 0.0
+        self.settle_timeouts = 0
+        self._abort = threading.Event()
+
+    def abort(self):
+        """Stop the running mission after the current command."""
+        self._abort.set()
+
+    def run(self, commands):
+        """Execute commands in order. Returns True if all of them ran.
+
+        Exceptions from a command propagate to the caller, as with direct
+        djitellopy calls.
+        """
+        self._abort.clear()
+        for command in commands:
+            if self._abort.is_set():
+                print("⛔ Mission aborted")
+                return False
+            if self.verbose:
+                print(f"   → {command.method} {' '.join(str(a) for a in command.args)}")
+            getattr(self.controller.tello, command.method)(*command.args)
+            self.commands_run += 1
+            if command.settle and self.settling:
+                self.settle()
+        return True
+
+    def settle(self):
+        """Wait until fresh telemetry shows the drone still. Returns True if it settled."""
+        condition = self.settle_condition
+        start = time.monotonic()
+        deadline = start + condition.timeout
+        last = self.controller.telemetry.snapshot()
+        last_sequence = last.sequence if last is not None else 0
+        quiet = 0
+        try:
+            while time.monotonic() < deadline:
+                snapshot = self.controller.telemetry.snapshot()
+                if snapshot is None or snapshot.sequence == last_sequence:
+                    time.sleep(self.poll_interval)
+                    continue
+                # Only packets sent after the acknowledgement count
+                last_sequence = snapshot.sequence
+                quiet = quiet + 1 if condition.is_still(snapshot) else 0
+                if quiet >= condition.quiet_packets:
+                    return True
+            self.settle_timeouts += 1
+            return False
+        finally:
+            self.settle_time += time.monotonic() - start
+
+    def stats(self):
+        """Return execution counters as a dict."""
+        return {'commands': self.commands_run, 'settle_time_s': self.settle_time,
+                'settle_timeouts': self.settle_timeouts}
@@ -0,0 +1,133 @@
+"""
+Background photo pipeline for the Tello camera feed.
+"""
+
+import os
+import queue
+import threading
+import time
+import cv2
+
+FULL_POLICIES = ('drop_newest', 'drop_oldest', 'block')
+
+
+class PhotoWriter:
+    """Encodes and saves photos on a pool of worker threads.
+
+    submit() copies the frame, queues it and returns the target filename at
+    once, so the caller never waits for an encode. File names carry a
+    millisecond timestamp plus a per-writer counter, so photos taken in the
+    same second never overwrite each other. When the queue is full the
+    `full_policy` decides: drop the new photo, drop the oldest queued photo,
+    or block until there is room.
+    """
+
+    def __init__(self, directory, workers=2, max_queue=16, image_format='jpg',
+                 jpeg_quality=95, full_policy='drop_newest'):
+        if image_format not in ('jpg', 'png'):
+            raise ValueError(f"Unsupported photo format: {image_format}")
+        if full_policy not in FULL_POLICIES:
+            raise ValueError(f"Unknown queue policy: {full_policy}")
+        self.directory = directory
+        self.image_format = image_format
+        self.full_policy = full_policy
+        if image_format == 'jpg':
+            self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        else:
+            self.encode_params = []
+        self.saved = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._last_ms = 0
+        self._workers = []
+        os.makedirs(directory, exist_ok=True)
+        for _ in range(workers):
+            worker = threading.Thread(target=self._work)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def _next_filename(self):
+        """Return a unique, monotonically increasing photo filename."""
+        with self._lock:
+            ms = max(int(time.time() * 1000), self._last_ms)
+            self._last_ms = ms
+            self._counter += 1
+            name = f"tello_photo_{ms}_{self._counter:04d}.{self.image_format}"
+        return os.path.join(self.directory, name)
+
+    def submit(self, frame):
+        """Queue a frame for saving. Returns the filename, or None if dropped."""
+        filename = self._next_filename()
+        # Ring buffer slots are reused, so keep a private copy for the encoder
+        item = (filename, frame.copy())
+
+        if self.full_policy == 'block':
+            self._queue.put(item)
+            return filename
+
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return filename
+            except queue.Full:
+                if self.full_policy == 'drop_newest':
+                    with self._lock:
+                        self.dropped += 1
+                    return None
+                try:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+                    with self._lock:
+                        self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def burst(self, frame_source, count, interval):
+        """Capture `count` photos `interval` seconds apart in the background.
+
+        `frame_source` is called for each shot and returns a frame (or None).
+        Returns the burst thread.
+        """
+        def run():
+            for shot in range(count):
+                frame = frame_source()
+                if frame is not None:
+                    self.submit(frame)
+                if shot < count - 1:
+                    time.sleep(interval)
+
+        burst_thread = threading.Thread(target=run)
+        burst_thread.daemon = True
+        burst_thread.start()
+        return burst_thread
+
+    def _work(self):
+        """Worker loop: encode queued frames and write them to disk."""
+        while True:
+            filename, frame = self._queue.get()
+            try:
+                ok, encoded = cv2.imencode(f".{self.image_format}", frame, self.encode_params)
+                if not ok:
+                    raise ValueError("encoder returned no data")
+                with open(filename, 'wb') as f:
+                    f.write(encoded.tobytes())
+                with self._lock:
+                    self.saved += 1
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                print(f"Photo save failed ({filename}): {e}")
+            finally:
+                self._queue.task_done()
+
+    def pending(self):
+        """Number of photos waiting to be encoded."""
+        return self._queue.qsize()
+
+    def flush(self):
+        """Block until every queued photo has been written."""
+        self._queue.join()
@@ -0,0 +1,250 @@
+"""
+Closed-loop RC streaming at a fixed control rate.
+"""
+
+import math
+import threading
+import time
+
+import numpy as np
+
+from trajectory import Polyline
+
+# State packet vgx/vgy/vgz are in dm/s in the world frame: x along the
+# heading at yaw 0, y to its right, z down. Yaw is in degrees, clockwise
+# positive. Setpoints use the body frame: x forward, y left, z up.
+VELOCITY_SCALE = 10
+MIN_RATE_HZ = 20
+MAX_RATE_HZ = 50
+
+DIRECTIONS = {
+    'forward': (1, 0, 0), 'back': (-1, 0, 0),
+    'left': (0, 1, 0), 'right': (0, -1, 0),
+    'up': (0, 0, 1), 'down': (0, 0, -1),
+}
+
+
+class PID:
+    """PID controller with output clamping and anti-windup."""
+
+    def __init__(self, kp, ki=0.0, kd=0.0, limit=100.0):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.limit = limit
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.last_error = None
+
+    def update(self, error, dt):
+        """Return the correction for `error` after `dt` seconds."""
+        derivative = 0.0
+        if self.last_error is not None and dt > 0:
+            derivative = (error - self.last_error) / dt
+        self.last_error = error
+        integral = self.integral + error * dt
+        output = self.kp * error + self.ki * integral + self.kd * derivative
+        if abs(output) < self.limit:
+            # Only integrate while not saturated
+            self.integral = integral
+        return max(-self.limit, min(self.limit, output))
+
+
+class PathSetpoints:
+    """Velocity setpoints that fly a trajectory.Path at `speed` cm/s.
+
+    Speed ramps up and down with `accel` cm/s² (trapezoidal profile) and
+    the velocity points along the path's tangent. at(t) returns
+    (vx, vy, vz) in cm/s in the path frame, or None once the path is done.
+    """
+
+    def __init__(self, path, speed=50, accel=100, step=2.0):
+        points = path.sample(step)
+        segments = np.diff(points, axis=0)
+        lengths = np.linalg.norm(segments, axis=1)
+        keep = lengths > 0
+        self.tangents = segments[keep] / lengths[keep, None]
+        self.distance = np.concatenate([[0.0], np.cumsum(lengths[keep])])
+        self.length = self.distance[-1]
+        self.speed = speed
+        self.accel = accel
+        # Shorten the cruise (or peak lower) so the ramps fit the length
+        self.ramp = min(speed / accel, np.sqrt(self.length / accel))
+        self.peak = self.ramp * accel
+        self.duration = 2 * self.ramp + (self.length - self.peak * self.ramp) / self.peak if self.peak else 0.0
+
+    def _progress(self, t):
+        """Distance travelled and current speed at time t."""
+        if t < self.ramp:
+            return 0.5 * self.accel * t * t, self.accel * t
+        cruise_end = self.duration - self.ramp
+        if t < cruise_end:
+            return 0.5 * self.peak * self.ramp + self.peak * (t - self.ramp), self.peak
+        remaining = self.duration - t
+        return self.length - 0.5 * self.accel * remaining * remaining, self.accel * remaining
+
+    def at(self, t):
+        if t >= self.duration or not len(self.tangents):
+            return None
+        travelled, speed = self._progress(t)
+        index = min(np.searchsorted(self.distance, travelled, side='right') - 1, len(self.tangents) - 1)
+        return tuple(self.tangents[index] * speed)
+
+
+def body_velocity(snapshot):
+    """Velocity from a state packet in the body frame (x forward, y left, z up), cm/s."""
+    north, east, down = (snapshot.speed_x * VELOCITY_SCALE, snapshot.speed_y * VELOCITY_SCALE,
+                         snapshot.speed_z * VELOCITY_SCALE)
+    yaw = math.radians(snapshot.yaw)
+    forward = north * math.cos(yaw) + east * math.sin(yaw)
+    right = -north * math.sin(yaw) + east * math.cos(yaw)
+    return forward, -right, -down
+
+
+def line_setpoints(direction, distance, speed=50, accel=100):
+    """Setpoints for a straight `distance` cm move in a named direction."""
+    vector = np.array(DIRECTIONS[direction], dtype=np.float64) * distance
+    return PathSetpoints(Polyline([vector]), speed, accel)
+
+
+class RCFollower:
+    """Streams RC commands at a fixed rate to follow velocity setpoints.
+
+    A background loop ticks at `rate_hz` (20-50 Hz) on an absolute
+    schedule. Each tick asks the setpoint generator for the target velocity
+    and sends feed-forward plus a PID correction on the velocity from the
+    latest state packet, rotated into the body frame (see body_velocity()).
+    Yaw is held at its starting value, so the path frame stays the body
+    frame, and horizontal commands are scaled back while pitch or roll
+    exceed `max_tilt`. State packets arrive at about 10 Hz, so the PID only
+    integrates on new packets; ticks in between run on feed-forward and the
+    last correction and tilt.
+
+    Tick timing is recorded for jitter statistics (see stats()).
+    """
+
+    def __init__(self, controller, rate_hz=30, feed_forward=1.0, kp=0.6, ki=0.2, kd=0.0,
+                 yaw_kp=1.5, max_tilt=25, clock=time.monotonic):
+        self.controller = controller
+        self.rate_hz = max(MIN_RATE_HZ, min(MAX_RATE_HZ, rate_hz))
+        self.period = 1.0 / self.rate_hz
+        self.feed_forward = feed_forward
+        self.pids = [PID(kp, ki, kd) for _ in range(3)]
+        self.yaw_pid = PID(yaw_kp)
+        self.max_tilt = max_tilt
+        self.clock = clock
+        self.running = False
+        self.completed = False
+        self._thread = None
+        self._lateness = []
+        self._intervals = []
+        self._errors = []
+        self.overruns = 0
+
+    def follow(self, setpoints, wait=True):
+        """Start following setpoints. With wait=True, block until done.
+
+        Returns True if the setpoints ran to completion.
+        """
+        self.stop()
+        for pid in self.pids + [self.yaw_pid]:
+            pid.reset()
+        self._lateness, self._intervals, self._errors = [], [], []
+        self.overruns = 0
+        self.completed = False
+        self.running = True
+        self._thread = threading.Thread(target=self._run, args=(setpoints,))
+        self._thread.daemon = True
+        self._thread.start()
+        if wait:
+            self._thread.join()
+            return self.completed
+        return True
+
+    def stop(self):
+        """Stop the loop; the drone is left hovering."""
+        self.running = False
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self._thread = None
+
+    def _run(self, setpoints):
+        """Control loop thread."""
+        tello = self.controller.tello
+        snapshot = self.controller.telemetry.snapshot()
+        target_yaw = snapshot.yaw if snapshot is not None else None
+        last_sequence = snapshot.sequence if snapshot is not None else 0
+        corrections = [0.0, 0.0, 0.0]
+        yaw_command = 0.0
+        tilt = 0
+        start = self.clock()
+        next_tick = start
+        last_tick = None
+        last_packet = start
+
+        try:
+            while self.running:
+                now = self.clock()
+                if now < next_tick:
+                    time.sleep(next_tick - now)
+                    now = self.clock()
+                lateness = now - next_tick
+                self._lateness.append(lateness)
+                if last_tick is not None:
+                    self._intervals.append(now - last_tick)
+                last_tick = now
+                if lateness > self.period:
+                    # Missed whole ticks: re-anchor instead of bursting
+                    self.overruns += 1
+                    next_tick = now
+                next_tick += self.period
+
+                setpoint = setpoints.at(now - start)
+                if setpoint is None:
+                    self.completed = True
+                    break
+
+                snapshot = self.controller.telemetry.snapshot()
+                if snapshot is not None and snapshot.sequence != last_sequence:
+                    dt = now - last_packet
+                    last_sequence, last_packet = snapshot.sequence, now
+                    errors = [s - m for s, m in zip(setpoint, body_velocity(snapshot))]
+                    self._errors.append(max(abs(e) for e in errors))
+                    corrections = [pid.update(e, dt) for pid, e in zip(self.pids, errors)]
+                    if target_yaw is None:
+                        target_yaw = snapshot.yaw
+                    yaw_error = (target_yaw - snapshot.yaw + 180) % 360 - 180
+                    yaw_command = self.yaw_pid.update(yaw_error, dt)
+                    tilt = max(abs(snapshot.pitch), abs(snapshot.roll))
+
+                vx, vy, vz = (self.feed_forward * s + c for s, c in zip(setpoint, corrections))
+                if tilt > self.max_tilt:
+                    # Attitude guard: back off horizontally while tilted hard
+                    vx, vy = vx * self.max_tilt / tilt, vy * self.max_tilt / tilt
+                # RC: left_right is positive to the right, the path frame's y is left
+                tello.send_rc_control(int(-vy), int(vx), int(vz), int(yaw_command))
+        except Exception as e:
+            print(f"RC follower error: {e}")
+        finally:
+            self.running = False
+            try:
+                tello.send_rc_control(0, 0, 0, 0)
+            except Exception as e:
+                print(f"RC stop failed: {e}")
+
+    def stats(self):
+        """Return loop timing and tracking statistics (times in milliseconds)."""
+        lateness = np.array(self._lateness) * 1000
+        intervals = np.array(self._intervals) * 1000
+        errors = np.array(self._errors)
+        return {
+            'ticks': int(lateness.size),
+            'rate_hz': self.rate_hz,
+            'period_mean_ms': float(intervals.mean()) if intervals.size else 0.0,
+            'jitter_ms': float(intervals.std()) if intervals.size else 0.0,
+            'late_p99_ms': float(np.percentile(lateness, 99)) if lateness.size else 0.0,
+            'overruns': self.overruns,
+            'velocity_error_max_cm_s': float(errors.max()) if errors.size else 0.0,
+        }
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Replay recorded flights through InteractiveTelloController without a drone.
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import argparse
+import glob
+import heapq
+import time
+
+import cv2
+import numpy as np
+
+from flight_log import FlightLog
+
+# djitellopy state keys for each telemetry log field
+STATE_KEYS = (
+    ('battery', 'bat'), ('height', 'h'), ('distance_tof', 'tof'), ('barometer', 'baro'),
+    ('flight_time', 'time'), ('pitch', 'pitch'), ('roll', 'roll'), ('yaw', 'yaw'),
+    ('speed_x', 'vgx'), ('speed_y', 'vgy'), ('speed_z', 'vgz'),
+    ('acceleration_x', 'agx'), ('acceleration_y', 'agy'), ('acceleration_z', 'agz'),
+)
+
+STATE, COMMAND, FRAME = 0, 1, 2
+
+
+class ReplayClock:
+    """Clock that reads the current replay time instead of the wall clock."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class ReplayFrameRead:
+    """Stands in for djitellopy's BackgroundFrameRead."""
+
+    def __init__(self):
+        self.frame = None
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+class ReplayTello:
+    """The subset of djitellopy's Tello used by TelloController, fed from a log.
+
+    get_current_state() returns a new dict for every replayed packet, just
+    like djitellopy's receiver thread, so TelemetryCache works unchanged.
+    Commands are accepted and answered with "ok" but do nothing.
+    """
+
+    def __init__(self):
+        self.state = {}
+        self.frame_read = ReplayFrameRead()
+        self.stream_on = False
+        self.commands = []
+
+    def set_state(self, record):
+        """Publish one telemetry log record as the current state packet."""
+        state = {key: record[field].item() for field, key in STATE_KEYS}
+        state['templ'] = state['temph'] = record['temperature'].item()
+        self.state = state
+
+    def get_current_state(self):
+        return self.state
+
+    def get_battery(self):
+        return self.state.get('bat', 0)
+
+    def get_height(self):
+        return self.state.get('h', 0)
+
+    def get_frame_read(self):
+        return self.frame_read
+
+    # Commands are no-ops
+
+    def send_command_with_return(self, command, timeout=None):
+        self.commands.append(command)
+        return 'ok'
+
+    def send_control_command(self, command, timeout=None):
+        return self.send_command_with_return(command, timeout) == 'ok'
+
+    def send_command_without_return(self, command):
+        self.commands.append(command)
+
+    def connect(self, wait_for_state=True):
+        self.send_control_command('command')
+
+    def end(self):
+        self.stream_on = False
+
+    def streamon(self):
+        self.send_control_command('streamon')
+        self.stream_on = True
+
+    def streamoff(self):
+        self.send_control_command('streamoff')
+        self.stream_on = False
+
+    def takeoff(self):
+        self.send_control_command('takeoff')
+
+    def land(self):
+        self.send_control_command('land')
+
+    def emergency(self):
+        self.send_command_without_return('emergency')
+
+    def move(self, direction, x):
+        self.send_control_command(f"{direction} {x}")
+
+    def move_forward(self, x):
+        self.move('forward', x)
+
+    def move_back(self, x):
+        self.move('back', x)
+
+    def move_left(self, x):
+        self.move('left', x)
+
+    def move_right(self, x):
+        self.move('right', x)
+
+    def move_up(self, x):
+        self.move('up', x)
+
+    def move_down(self, x):
+        self.move('down', x)
+
+    def rotate_clockwise(self, x):
+        self.send_control_command(f"cw {x}")
+
+    def rotate_counter_clockwise(self, x):
+        self.send_control_command(f"ccw {x}")
+
+    def flip(self, direction):
+        self.send_control_command(f"flip {direction}")
+
+    def go_xyz_speed(self, x, y, z, speed):
+        self.send_control_command(f"go {x} {y} {z} {speed}")
+
+    def curve_xyz_speed(self, x1, y1, z1, x2, y2, z2, speed):
+        self.send_control_command(f"curve {x1} {y1} {z1} {x2} {y2} {z2} {speed}")
+
+    def send_rc_control(self, left_right, forward_backward, up_down, yaw):
+        self.send_command_without_return(f"rc {left_right} {forward_backward} {up_down} {yaw}")
+
+
+def video_frames(video_dir, start=None, end=None):
+    """(timestamp, frame) for recorded video segments, using their .frames sidecars."""
+    for sidecar in sorted(glob.glob(os.path.join(video_dir, 'tello_video_*.frames'))):
+        stem = sidecar[:-len('.frames')]
+        segments = [path for path in glob.glob(stem + '.*') if path != sidecar]
+        if not segments:
+            continue
+        timestamps = np.loadtxt(sidecar, usecols=1, ndmin=1)
+        if not timestamps.size or (start is not None and timestamps[-1] < start) or \
+                (end is not None and timestamps[0] > end):
+            continue
+        capture = cv2.VideoCapture(segments[0])
+        try:
+            for timestamp in timestamps:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                if (start is None or timestamp >= start) and (end is None or timestamp <= end):
+                    yield timestamp, frame
+        finally:
+            capture.release()
+
+
+class FlightReplay:
+    """Feeds a recorded flight through an InteractiveTelloController.
+
+    State packets go through the controller's TelemetryHub (poll_once with
+    the recorded time), so the HUD, the flight-state estimator, the flight
+    log and any other subscribers run exactly as in flight. Recorded
+    commands are fed to the LinkMonitor. Frames come from VideoRecorder
+    segments in `video_dir`; without video, `blank_frames=(h, w)` replays
+    the frame timestamps with black frames to exercise the frame pipeline.
+
+    speed=None replays as fast as possible; otherwise at `speed` times the
+    recorded pace. All clocks read the recorded time, so a replay is
+    deterministic whatever the pace.
+    """
+
+    def __init__(self, path, video_dir=None, speed=None, blank_frames=None):
+        self.log = FlightLog(path)
+        self.video_dir = video_dir
+        self.speed = speed
+        self.blank_frames = blank_frames
+        self.tello = ReplayTello()
+        self.clock = ReplayClock()
+        self.packets = 0
+        self.frames = 0
+        self.commands = 0
+
+    def events(self):
+        """Every recorded event as (time, kind, payload), in time order."""
+        telemetry = self.log.telemetry
+        commands = self.log.commands
+        streams = [
+            ((record['timestamp'].item(), STATE, record) for record in telemetry),
+            ((record['timestamp'].item(), COMMAND, record) for record in commands),
+        ]
+        if self.video_dir:
+            start = telemetry['timestamp'][0] if telemetry.size else None
+            end = telemetry['timestamp'][-1] if telemetry.size else None
+            streams.append(((t, FRAME, frame) for t, frame in video_frames(self.video_dir, start, end)))
+        elif self.blank_frames:
+            blank = np.zeros((*self.blank_frames, 3), dtype=np.uint8)
+            streams.append(((t.item(), FRAME, blank) for t in self.log.frames['timestamp']))
+        return heapq.merge(*streams, key=lambda event: (event[0], event[1]))
+
+    def attach(self, interactive):
+        """Point the controller's clocks at the replay and attach its handlers."""
+        controller = interactive.controller
+        controller.telemetry.clock = self.clock
+        interactive.frames.clock = self.clock
+        controller.connected = True
+        interactive.streaming = True
+        interactive.start_monitoring(background=False)
+        interactive.connection.link_up()
+
+    def run(self, interactive, show=False):
+        """Replay the whole flight into `interactive`. Returns the replay's wall time."""
+        self.attach(interactive)
+        hub = interactive.controller.hub
+        link = interactive.controller.link
+        wall_start = time.perf_counter()
+        first = None
+
+        for timestamp, kind, payload in self.events():
+            if first is None:
+                first = timestamp
+            if self.speed:
+                delay = (timestamp - first) / self.speed - (time.perf_counter() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+            self.clock.now = timestamp
+
+            if kind == STATE:
+                # Let the hub notice any silence before the packet arrives
+                hub.poll_once(now=timestamp)
+                self.tello.set_state(payload)
+                hub.poll_once(now=timestamp)
+                self.packets += 1
+            elif kind == COMMAND:
+                link.record_response(payload['rtt'].item(),
+                                     payload['response'].decode('utf-8', errors='replace'), now=timestamp)
+                self.commands += 1
+            else:
+                self.tello.frame_read.frame = payload
+                view = interactive._publish_frame(payload, now=timestamp)
+                self.frames += 1
+                if show:
+                    cv2.imshow('Tello Replay', view.frame)
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+
+        if show:
+            cv2.destroyAllWindows()
+        return time.perf_counter() - wall_start
+
+
+def replay_flight(path, video_dir=None, speed=None, show=False, blank_frames=None):
+    """Replay a flight log through a fresh InteractiveTelloController."""
+    from flight_control import InteractiveTelloController
+
+    replay = FlightReplay(path, video_dir, speed, blank_frames)
+    interactive = InteractiveTelloController(tello=replay.tello)
+    print(f"⏪ Replaying {path} ({'x' + str(speed) if speed else 'full speed'})")
+    elapsed = replay.run(interactive, show=show)
+    print(f"✅ Replayed {replay.packets} packets, {replay.commands} commands and "
+          f"{replay.frames} frames in {elapsed:.2f}s")
+    print(f"   Final flight state: {interactive.flight_state.state}, link: {interactive.controller.link.stats(replay.clock.now)}")
+    return interactive
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded Tello flight")
+    parser.add_argument('flight', help="flight log directory (flights/flight_...)")
+    parser.add_argument('--video-dir', help="directory with recorded video segments")
+    parser.add_argument('--speed', type=float, default=None, help="pace relative to recording (default: full speed)")
+    parser.add_argument('--show', action='store_true', help="display the replayed frames")
+    parser.add_argument('--blank-frames', action='store_true', help="replay frame timestamps with black 960x720 frames")
+    args = parser.parse_args()
+    replay_flight(args.flight, args.video_dir, args.speed, args.show,
+                  (720, 960) if args.blank_frames else None)
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Local Tello simulator speaking the SDK text protocol over UDP.
+
+Runs any number of simulated drones on one event loop. Each drone answers
+commands on its command port, streams state packets at a configurable rate
+and can stream synthetic video. Command latency, packet loss and battery
+drain are modelled, and takeoff, land and moves fly there over their
+duration (answered "ok" when done), so control, telemetry and video
+paths can be load tested without a drone.
+
+djitellopy binds local port 8889 on every interface, so a simulated drone
+for TelloController needs another command port on a loopback address:
+TelloController('127.0.0.2', command_port=9889) against a drone started
+with --command-port 9889 (state packets still go to 8890).
+AsyncTelloController and SwarmController take explicit ports.
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+
+import numpy as np
+
+VIDEO_CHUNK = 1460  # Tello sends H.264 in datagrams of this size
+MOVES = {
+    'forward': (1, 0, 0), 'back': (-1, 0, 0),
+    'left': (0, 1, 0), 'right': (0, -1, 0),
+    'up': (0, 0, 1), 'down': (0, 0, -1),
+}
+
+
+class SimulatedTello(asyncio.DatagramProtocol):
+    """One simulated drone."""
+
+    def __init__(self, host='127.0.0.1', command_port=8889, state_port=8890, video_port=11111,
+                 state_rate=10, latency=0.01, latency_jitter=0.005, packet_loss=0.0,
+                 speed=100, time_scale=1.0, battery=100.0, idle_drain=0.02, flight_drain=0.12,
+                 video=None, frame_size=(360, 480), video_fps=30, seed=None):
+        self.host = host
+        self.command_port = command_port
+        self.state_port = state_port
+        self.video_port = video_port
+        self.state_rate = state_rate
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.packet_loss = packet_loss
+        self.speed = speed
+        self.time_scale = time_scale
+        self.battery = battery
+        self.idle_drain = idle_drain
+        self.flight_drain = flight_drain
+        self.video = video
+        self.frame_size = frame_size
+        self.video_fps = video_fps
+        self.random = random.Random(seed)
+
+        self.position = [0.0, 0.0, 0.0]
+        self.velocity = [0.0, 0.0, 0.0]
+        self.yaw = 0
+        self.flying = False
+        self.stream_on = False
+        self.busy = False
+        self.landing = False
+        self.takeoff_time = None
+        self._move = None
+        self.client = None
+        self.commands = 0
+        self.transport = None
+        self._tasks = []
+
+    # Lifecycle
+
+    async def start(self):
+        """Bind the command port and start the state and video loops."""
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(lambda: self, local_addr=(self.host, self.command_port))
+        self._tasks.append(asyncio.ensure_future(self._state_loop()))
+        if self.video:
+            self._tasks.append(asyncio.ensure_future(self._video_loop()))
+
+    def stop(self):
+        """Stop all loops and close the socket."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self.transport is not None:
+            self.transport.close()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    # Network model
+
+    def _dropped(self):
+        """Decide whether to drop an outgoing datagram."""
+        return self.packet_loss > 0 and self.random.random() < self.packet_loss
+
+    def _send(self, data, address):
+        if not self._dropped():
+            self.transport.sendto(data, address)
+
+    def _reply(self, response, address, delay=0.0):
+        """Send a response after the modelled latency plus `delay`."""
+        latency = self.latency + self.random.uniform(0, self.latency_jitter)
+        loop = asyncio.get_running_loop()
+        loop.call_later(delay + latency, self._send, response.encode('utf-8'), address)
+
+    # Command handling
+
+    def datagram_received(self, data, address):
+        if self._dropped():
+            return
+        self.client = address
+        self.commands += 1
+        parts = data.decode('utf-8', errors='replace').strip().split()
+        if not parts:
+            return
+        cmd, args = parts[0], parts[1:]
+
+        if cmd == 'rc':
+            self._rc(args)
+            return
+        if cmd == 'emergency':
+            self._land()
+            return
+        if cmd.endswith('?'):
+            self._reply(self._query(cmd), address)
+            return
+        if self.busy:
+            self._reply('error Not joystick', address)
+            return
+
+        try:
+            duration = self._execute(cmd, args)
+        except (ValueError, IndexError):
+            self._reply('error', address)
+            return
+        if duration is None:
+            self._reply('error', address)
+            return
+
+        # Movements are acknowledged when they finish, like the real drone
+        duration *= self.time_scale
+        if duration > 0:
+            self.busy = True
+            asyncio.get_running_loop().call_later(duration, self._finish_move)
+        elif self.landing:
+            self._land()
+        self._reply('ok', address, duration)
+
+    def _finish_move(self):
+        self._advance(finish=True)
+        self.busy = False
+        self.velocity = [0.0, 0.0, 0.0]
+        if self.landing:
+            self._land()
+
+    def _execute(self, cmd, args):
+        """Apply a control command. Returns its duration in seconds, or None on error."""
+        if cmd in ('command', 'speed'):
+            return 0.0
+        if cmd == 'streamon':
+            self.stream_on = True
+            return 0.0
+        if cmd == 'streamoff':
+            self.stream_on = False
+            return 0.0
+        if cmd == 'takeoff':
+            if self.flying or self.battery < 10:
+                return None
+            self.flying = True
+            self.takeoff_time = time.monotonic()
+            return self._travel((0, 0, 80 - self.position[2]), 60)
+        if cmd == 'land':
+            if not self.flying:
+                return None
+            self.landing = True
+            return self._travel((0, 0, -self.position[2]), 60)
+        if not self.flying:
+            return None
+
+        if cmd in MOVES:
+            distance = int(args[0])
+            if not 20 <= distance <= 500:
+                return None
+            dx, dy, dz = MOVES[cmd]
+            return self._travel([c * distance for c in self._to_world(dx, dy, dz)], self.speed)
+        if cmd in ('cw', 'ccw'):
+            degrees = int(args[0])
+            if not 1 <= degrees <= 360:
+                return None
+            self.yaw = (self.yaw + (degrees if cmd == 'cw' else -degrees) + 180) % 360 - 180
+            return degrees / 90.0
+        if cmd == 'flip':
+            return 1.5 if args[0] in ('l', 'r', 'f', 'b') else None
+        if cmd == 'go':
+            x, y, z, speed = (int(a) for a in args[:4])
+            return self._travel((x, y, z), speed)
+        if cmd == 'curve':
+            x1, y1, z1, x2, y2, z2, speed = (int(a) for a in args[:7])
+            arc = math.dist((0, 0, 0), (x1, y1, z1)) + math.dist((x1, y1, z1), (x2, y2, z2))
+            return self._travel((x2, y2, z2), speed, arc)
+        return None
+
+    def _travel(self, delta, speed, distance=None):
+        """Start moving by `delta` cm at `speed` cm/s. Returns the duration.
+
+        The position follows a straight line over the duration (scaled by
+        time_scale); `distance` overrides the path length, e.g. for curves.
+        With time_scale 0 the drone jumps there and reports no velocity.
+        """
+        if distance is None:
+            distance = math.sqrt(sum(c * c for c in delta))
+        duration = distance / max(speed, 1)
+        scaled = duration * self.time_scale
+        if scaled > 0:
+            self.velocity = [c / scaled for c in delta]
+            self._move = (list(self.position), delta, time.monotonic(), scaled)
+        else:
+            self.position = [p + c for p, c in zip(self.position, delta)]
+            self.position[2] = max(0.0, self.position[2])
+        return duration
+
+    def _advance(self, finish=False):
+        """Bring the position up to date with the move in progress."""
+        if self._move is None:
+            return
+        start, delta, started, duration = self._move
+        progress = 1.0 if finish else min(1.0, (time.monotonic() - started) / duration)
+        self.position = [p + c * progress for p, c in zip(start, delta)]
+        self.position[2] = max(0.0, self.position[2])
+        if progress >= 1.0:
+            self._move = None
+
+    def _land(self):
+        self.flying = False
+        self.busy = False
+        self.landing = False
+        self._move = None
+        self.position[2] = 0.0
+        self.velocity = [0.0, 0.0, 0.0]
+
+    def _rc(self, args):
+        """RC sticks set the velocity directly (stick 100 = speed cm/s)."""
+        if not self.flying or len(args) < 4:
+            return
+        lr, fb, ud, _ = (int(a) for a in args[:4])
+        self.velocity = [c * self.speed / 100 for c in self._to_world(fb, -lr, ud)]
+
+    def _to_world(self, x, y, z):
+        """Rotate a body-frame vector (x forward, y left, z up) into the world frame.
+
+        The world frame has x along yaw 0 and y to its left; yaw turns clockwise.
+        """
+        heading = math.radians(self.yaw)
+        return (x * math.cos(heading) + y * math.sin(heading),
+                -x * math.sin(heading) + y * math.cos(heading), z)
+
+    def _query(self, cmd):
+        self._advance()
+        values = {
+            'battery?': int(self.battery),
+            'height?': f"{int(self.position[2] / 10)}dm",
+            'time?': f"{self._flight_time()}s",
+            'temp?': '60~63C',
+            'speed?': self.speed,
+            'sdk?': 30,
+        }
+        return str(values.get(cmd, 'unknown command'))
+
+    # Telemetry and video
+
+    def _flight_time(self):
+        return int(time.monotonic() - self.takeoff_time) if self.flying else 0
+
+    def state_packet(self):
+        """Format the current state like the real drone."""
+        self._advance()
+        x, y, z = self.position
+        # Like the drone: dm/s with y to the right of yaw 0 and z down
+        vx, vy, vz = self.velocity
+        vgx, vgy, vgz = int(vx / 10), int(-vy / 10), int(-vz / 10)
+        return (f"mid:-1;x:0;y:0;z:0;mpry:0,0,0;pitch:0;roll:0;yaw:{self.yaw};"
+                f"vgx:{vgx};vgy:{vgy};vgz:{vgz};templ:60;temph:63;"
+                f"tof:{int(z) + 10};h:{int(z)};bat:{int(self.battery)};baro:{z / 100:.2f};"
+                f"time:{self._flight_time()};agx:0.00;agy:0.00;agz:-1000.00;\r\n")
+
+    async def _state_loop(self):
+        interval = 1.0 / self.state_rate
+        while True:
+            await asyncio.sleep(interval)
+            drain = self.flight_drain if self.flying else self.idle_drain
+            self.battery = max(0.0, self.battery - drain * interval)
+            if self.flying:
+                if self.battery <= 0:
+                    self._land()
+                elif not self.busy and any(self.velocity):
+                    # RC motion integrates continuously
+                    self.position = [p + v * interval for p, v in zip(self.position, self.velocity)]
+                    self.position[2] = max(0.0, self.position[2])
+            if self.client is not None:
+                self._send(self.state_packet().encode('ASCII'), (self.client[0], self.state_port))
+
+    def synthetic_frame(self, index):
+        """A moving gradient with a frame counter bar, cheap to generate."""
+        height, width = self.frame_size
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[:, :, 0] = (np.arange(width, dtype=np.uint16) + index * 4).astype(np.uint8)
+        frame[:, :, 1] = (np.arange(height, dtype=np.uint16)[:, None] + index).astype(np.uint8)
+        frame[:, :, 2] = int(self.battery * 2.55)
+        frame[:8, :min(width, index % width)] = 255
+        return frame
+
+    async def _video_loop(self):
+        """Stream H.264 (via PyAV) or raw BGR frames to the client's video port."""
+        encoder = None
+        if self.video == 'h264':
+            import av
+            height, width = self.frame_size
+            encoder = av.CodecContext.create('libx264', 'w')
+            encoder.width, encoder.height = width, height
+            encoder.pix_fmt = 'yuv420p'
+            encoder.options = {'tune': 'zerolatency', 'preset': 'ultrafast'}
+
+        index = 0
+        interval = 1.0 / self.video_fps
+        while True:
+            await asyncio.sleep(interval)
+            if not self.stream_on or self.client is None:
+                continue
+            frame = self.synthetic_frame(index)
+            index += 1
+            if encoder is not None:
+                import av
+                packets = encoder.encode(av.VideoFrame.from_ndarray(frame, format='bgr24'))
+                data = b''.join(bytes(packet) for packet in packets)
+            else:
+                data = frame.tobytes()
+            address = (self.client[0], self.video_port)
+            for start in range(0, len(data), VIDEO_CHUNK):
+                self._send(data[start:start + VIDEO_CHUNK], address)
+
+
+async def run_simulators(count=1, base_host='127.0.0.', first=2, **options):
+    """Start `count` drones on consecutive loopback addresses. Returns them."""
+    drones = []
+    for i in range(count):
+        drone = SimulatedTello(host=f"{base_host}{first + i}", **options)
+        await drone.start()
+        drones.append(drone)
+    return drones
+
+
+async def main(args):
+    drones = await run_simulators(
+        args.drones, base_host=args.base_host, first=args.first,
+        command_port=args.command_port, state_port=args.state_port, video_port=args.video_port,
+        state_rate=args.state_rate, latency=args.latency, packet_loss=args.loss,
+        time_scale=args.time_scale, video=args.video)
+    print(f"🛰️  {len(drones)} simulated Tello(s): "
+          f"{drones[0].host} .. {drones[-1].host} port {args.command_port}")
+    try:
+        while True:
+            await asyncio.sleep(5)
+            print("   " + " | ".join(f"{d.host} bat {d.battery:.0f}% cmds {d.commands}" for d in drones[:4]))
+    finally:
+        for drone in drones:
+            drone.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Tello SDK simulator")
+    parser.add_argument('--drones', type=int, default=1)
+    parser.add_argument('--base-host', default='127.0.0.')
+    parser.add_argument('--first', type=int, default=2, help="last octet of the first drone")
+    parser.add_argument('--command-port', type=int, default=8889)
+    parser.add_argument('--state-port', type=int, default=8890)
+    parser.add_argument('--video-port', type=int, default=11111)
+    parser.add_argument('--state-rate', type=float, default=10, help="state packets per second")
+    parser.add_argument('--latency', type=float, default=0.01, help="response latency (s)")
+    parser.add_argument('--loss', type=float, default=0.0, help="packet loss probability")
+    parser.add_argument('--time-scale', type=float, default=1.0, help="0 = instant moves")
+    parser.add_argument('--video', choices=['h264', 'raw'], default=None)
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        print("\nSimulator stopped.")
@@ -0,0 +1,107 @@
+"""
+Multi-drone swarm control on a single event loop.
+"""
+
+import asyncio
+
+from async_controller import AsyncTelloController, TelloMux, COMMAND_PORT, STATE_PORT
+from flight_plan import PlanCache
+
+
+class SwarmController:
+    """Drives N Tello EDU drones from one process through one TelloMux.
+
+    All drones share the command socket and the state port; each drone
+    still has its own AsyncTelloController with its own telemetry. Commands
+    can be broadcast, run in lock-step (every drone finishes a step before
+    any starts the next), or started together at a common barrier.
+    Patterns come from the same compiled FlightPlans (via `plans`, a
+    PlanCache) as single-drone flights.
+    """
+
+    def __init__(self, hosts, command_port=COMMAND_PORT, state_port=STATE_PORT, local_command_port=0,
+                 plans=None):
+        self.hosts = list(hosts)
+        self.command_port = command_port
+        self.state_port = state_port
+        self.local_command_port = local_command_port
+        self.plans = plans or PlanCache()
+        self.mux = None
+        self.drones = {}
+
+    async def connect(self):
+        """Connect every drone. Returns the hosts that failed to connect."""
+        self.mux = await TelloMux.open(self.local_command_port, self.state_port)
+        for host in self.hosts:
+            self.drones[host] = AsyncTelloController(host, command_port=self.command_port,
+                                                     state_port=self.state_port, mux=self.mux)
+        results = await asyncio.gather(*(drone.connect() for drone in self.drones.values()),
+                                       return_exceptions=True)
+        failed = [host for host, result in zip(self.drones, results) if isinstance(result, Exception)]
+        for host in failed:
+            print(f"❌ {host} failed to connect")
+            del self.drones[host]
+        print(f"✅ Swarm connected: {len(self.drones)}/{len(self.hosts)} drones")
+        return failed
+
+    async def close(self):
+        """Detach every drone and close the shared sockets."""
+        for drone in self.drones.values():
+            await drone.close()
+        if self.mux is not None:
+            self.mux.close()
+            self.mux = None
+
+    async def broadcast(self, method, *args):
+        """Call `method(*args)` on every drone at once. Returns {host: result or exception}."""
+        hosts = list(self.drones)
+        results = await asyncio.gather(*(getattr(self.drones[host], method)(*args) for host in hosts),
+                                       return_exceptions=True)
+        for host, result in zip(hosts, results):
+            if isinstance(result, Exception):
+                print(f"⚠️  {host}: {method} failed: {result}")
+        return dict(zip(hosts, results))
+
+    async def synchronized(self, steps):
+        """Run (method, args) steps in lock-step across the whole swarm."""
+        for method, args in steps:
+            await self.broadcast(method, *args)
+
+    async def run_together(self, routine, *args):
+        """Start `routine(drone, *args)` on every drone at the same barrier.
+
+        Each drone then runs its routine at its own pace.
+        """
+        start = asyncio.Event()
+
+        async def run(drone):
+            await start.wait()
+            return await routine(drone, *args)
+
+        tasks = [asyncio.ensure_future(run(drone)) for drone in self.drones.values()]
+        # Every task is now parked on the barrier; release them together
+        await asyncio.sleep(0)
+        start.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        return dict(zip(self.drones, results))
+
+    async def fly_plan(self, plan, lock_step=True):
+        """Fly a FlightPlan on every drone from a common start."""
+        steps = [(command.method, command.args) for command in plan.commands]
+        if lock_step:
+            await self.synchronized(steps)
+            return
+
+        async def fly(drone):
+            for method, args in steps:
+                await getattr(drone, method)(*args)
+
+        await self.run_together(fly)
+
+    async def square_pattern(self, size=50, lock_step=True):
+        """Fly the square pattern on every drone from a common start."""
+        await self.fly_plan(self.plans.get('square', size=size), lock_step)
+
+    def telemetry(self):
+        """Latest snapshot per drone: {host: TelemetrySnapshot or None}."""
+        return {host: drone.snapshot() for host, drone in self.drones.items()}
@@ -0,0 +1,220 @@
+"""
+Telemetry snapshot layer for DJI Tello state packets.
+"""
+
+import queue
+import threading
+import time
+
+from link_monitor import LinkMonitor
+
+
+class TelemetrySnapshot:
+    """Immutable, timestamped record of a single Tello state packet."""
+
+    __slots__ = (
+        'timestamp', 'sequence',
+        'battery', 'height', 'distance_tof', 'barometer', 'flight_time',
+        'temperature', 'pitch', 'roll', 'yaw',
+        'speed_x', 'speed_y', 'speed_z',
+        'acceleration_x', 'acceleration_y', 'acceleration_z',
+    )
+
+    def __init__(self, timestamp, sequence, state):
+        """Build a snapshot from a parsed state dict (as produced by djitellopy)."""
+        values = {
+            'timestamp': timestamp,
+            'sequence': sequence,
+            'battery': state.get('bat', 0),
+            'height': state.get('h', 0),
+            'distance_tof': state.get('tof', 0),
+            'barometer': state.get('baro', 0.0),
+            'flight_time': state.get('time', 0),
+            'temperature': (state.get('templ', 0) + state.get('temph', 0)) / 2,
+            'pitch': state.get('pitch', 0),
+            'roll': state.get('roll', 0),
+            'yaw': state.get('yaw', 0),
+            'speed_x': state.get('vgx', 0),
+            'speed_y': state.get('vgy', 0),
+            'speed_z': state.get('vgz', 0),
+            'acceleration_x': state.get('agx', 0.0),
+            'acceleration_y': state.get('agy', 0.0),
+            'acceleration_z': state.get('agz', 0.0),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TelemetrySnapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("TelemetrySnapshot is immutable")
+
+    def age(self, now=None):
+        """Seconds elapsed since this packet was received."""
+        return (now if now is not None else time.time()) - self.timestamp
+
+    def as_dict(self):
+        """Return all fields as a plain dict."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return (f"TelemetrySnapshot(seq={self.sequence}, battery={self.battery}%, "
+                f"height={self.height}cm, tof={self.distance_tof}cm)")
+
+
+class TelemetryCache:
+    """Parses each Tello state packet once and shares the resulting snapshot.
+
+    djitellopy's receiver thread replaces the state dict on every packet, so a
+    new dict object means a new packet. All readers get the same snapshot
+    object until the next packet arrives, which keeps fields consistent.
+    """
+
+    def __init__(self, tello, clock=time.time):
+        self.tello = tello
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._raw = None
+        self._snapshot = None
+        self._sequence = 0
+
+    def snapshot(self):
+        """Return the snapshot for the latest state packet, or None if none arrived yet."""
+        raw = self.tello.get_current_state()
+        if raw is self._raw:
+            return self._snapshot
+
+        with self._lock:
+            # Another reader may have parsed this packet while we waited
+            if raw is not self._raw:
+                if raw:
+                    self._sequence += 1
+                    self._snapshot = TelemetrySnapshot(self.clock(), self._sequence, raw)
+                self._raw = raw
+            return self._snapshot
+
+
+class TelemetryHub:
+    """Single thread that watches for state packets and fans them out.
+
+    Every new snapshot is passed to the subscribed callbacks (in order, on
+    the hub thread) and pushed to any subscriber queues. Packet arrivals are
+    fed to the LinkMonitor; once it passes its silence deadline the silence
+    handlers are called once, and the resume handlers when traffic returns.
+    """
+
+    def __init__(self, cache, poll_interval=0.005, link=None):
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.link = link if link is not None else LinkMonitor()
+        self.silent = False
+        self.running = False
+        self._subscribers = []
+        self._queues = []
+        self._silence_handlers = []
+        self._resume_handlers = []
+        self._last_sequence = None
+        self._thread = None
+
+    def subscribe(self, callback):
+        """Call `callback(snapshot)` for every new state packet."""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stop calling `callback` for new packets."""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def subscribe_queue(self, maxsize=100):
+        """Return a queue that receives every new snapshot (oldest dropped when full)."""
+        snapshots = queue.Queue(maxsize=maxsize)
+        self._queues.append(snapshots)
+        return snapshots
+
+    def unsubscribe_queue(self, snapshots):
+        """Stop feeding a queue returned by subscribe_queue()."""
+        if snapshots in self._queues:
+            self._queues.remove(snapshots)
+
+    def on_silence(self, callback):
+        """Call `callback(seconds_silent)` when state packets stop arriving."""
+        self._silence_handlers.append(callback)
+
+    def on_resume(self, callback):
+        """Call `callback(snapshot)` when packets arrive again after a silence."""
+        self._resume_handlers.append(callback)
+
+    def start(self):
+        """Start the hub thread."""
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop the hub thread."""
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def poll_once(self, now=None):
+        """Process a newly arrived packet, if any. Returns the new snapshot or None."""
+        now = now if now is not None else time.monotonic()
+        try:
+            snapshot = self.cache.snapshot()
+        except Exception:
+            # The state entry disappears while the Tello object is ended
+            snapshot = None
+
+        if snapshot is None or snapshot.sequence == self._last_sequence:
+            self._check_silence(now)
+            return None
+
+        self._last_sequence = snapshot.sequence
+        self.link.record_packet(now)
+        if self.silent:
+            self.silent = False
+            self._notify(self._resume_handlers, snapshot)
+
+        self._notify(self._subscribers, snapshot)
+        for snapshots in list(self._queues):
+            while True:
+                try:
+                    snapshots.put_nowait(snapshot)
+                    break
+                except queue.Full:
+                    try:
+                        snapshots.get_nowait()
+                    except queue.Empty:
+                        pass
+        return snapshot
+
+    @property
+    def last_packet_time(self):
+        """Monotonic arrival time of the latest state packet, or None."""
+        return self.link.last_packet_time
+
+    def _check_silence(self, now):
+        """Fire the silence handlers once when the link's silence deadline passes."""
+        if not self.silent and self.link.is_lost(now):
+            self.silent = True
+            self._notify(self._silence_handlers, self.link.silent_for(now))
+
+    def _notify(self, handlers, value):
+        """Call each handler, keeping the hub alive if one fails."""
+        for handler in list(handlers):
+            try:
+                handler(value)
+            except Exception as e:
+                print(f"Telemetry subscriber error: {e}")
+
+    def _run(self):
+        """Hub thread: poll for new packets until stopped."""
+        while self.running:
+            self.poll_once()
+            time.sleep(self.poll_interval)
@@ -1,4 +1,3 @@
-<<<<<<< HEAD
 """
 DJI Tello SDK main module for drone control and communication.
 """
@@ -6,13 +5,25 @@ DJI Tello SDK main module for drone control and communication.
 from djitellopy import Tello
 import cv2
 import time
+from telemetry import TelemetryCache, TelemetryHub
+from link_monitor import LinkMonitor
 
 class TelloController:
     """Main class for controlling DJI Tello drone."""
     
-    def __init__(self):
-        """Initialize Tello connection."""
-        self.tello = Tello()
+    def __init__(self, host=Tello.TELLO_IP, tello=None, command_port=Tello.CONTROL_UDP_PORT):
+        """Initialize Tello connection (pass `host` and `command_port` to target
+        a simulator, or `tello` to use another backend such as a ReplayTello)."""
+        if tello is None:
+            tello = Tello(host)
+            # djitellopy binds local port 8889 on every interface; a simulator
+            # on a loopback address listens on another port to avoid it
+            tello.address = (host, command_port)
+        self.tello = tello
+        self.telemetry = TelemetryCache(self.tello)
+        self.link = LinkMonitor(silence_deadline=1.0)
+        self.link.instrument(self.tello)
+        self.hub = TelemetryHub(self.telemetry, link=self.link)
         self.connected = False
     
     def connect(self):
@@ -20,72 +31,50 @@ class TelloController:
         try:
             self.tello.connect()
             self.connected = True
-            print(f"Battery: {self.tello.get_battery()}%")
+            self.hub.start()
+            self._report_battery()
             return True
         except Exception as e:
             print(f"Connection failed: {e}")
             self.connected = False
             return False
     
-    def disconnect(self):
-        """Disconnect from the Tello drone."""
-        if self.connected:
-            self.tello.end()
-            self.connected = False
-    
-    def takeoff(self):
-        """Take off the drone."""
-        if self.connected:
-            self.tello.takeoff()
-            print("Drone took off")
-    
-    def land(self):
-        """Land the drone."""
-        if self.connected:
-            self.tello.land()
-            print("Drone landed")
-    
-    def get_status(self):
-        """Get drone status information."""
-        if self.connected:
-            return {
-                'battery': self.tello.get_battery(),
-                'height': self.tello.get_height(),
-                'temperature': self.tello.get_temperature(),
-                'speed': self.tello.get_speed_x()
-            }
-=======
-"""
-DJI Tello SDK main module for drone control and communication.
-"""
-
-from djitellopy import Tello
-import cv2
-import time
-
-class TelloController:
-    """Main class for controlling DJI Tello drone."""
+    def battery_level(self):
+        """Battery percentage, or None if no state packet has arrived yet."""
+        snapshot = self.telemetry.snapshot()
+        if snapshot is not None:
+            return snapshot.battery
+        try:
+            return self.tello.get_battery()
+        except Exception:
+            return None
     
-    def __init__(self):
-        """Initialize Tello connection."""
-        self.tello = Tello()
-        self.connected = False
+    def _report_battery(self):
+        """Print the battery level; a missing state packet is not a connection failure."""
+        battery = self.battery_level()
+        if battery is None:
+            print("Battery: unknown (no state packet yet)")
+        else:
+            print(f"Battery: {battery}%")
     
-    def connect(self):
-        """Connect to the Tello drone."""
+    def reconnect(self):
+        """Re-enter SDK mode on the existing link without ending the session."""
         try:
+            # end() would land the drone and drop its state entry, so just
+            # repeat the SDK handshake and wait for state packets
             self.tello.connect()
             self.connected = True
-            print(f"Battery: {self.tello.get_battery()}%")
+            self.hub.start()
             return True
         except Exception as e:
-            print(f"Connection failed: {e}")
+            print(f"Reconnection failed: {e}")
             self.connected = False
             return False
     
     def disconnect(self):
         """Disconnect from the Tello drone."""
         if self.connected:
+            self.hub.stop()
             self.tello.end()
             self.connected = False
     
@@ -101,14 +90,20 @@ class TelloController:
             self.tello.land()
             print("Drone landed")
     
+    def get_snapshot(self):
+        """Get the telemetry snapshot for the latest state packet."""
+        if self.connected:
+            return self.telemetry.snapshot()
+        return None
+    
     def get_status(self):
         """Get drone status information."""
-        if self.connected:
+        snapshot = self.get_snapshot()
+        if snapshot is not None:
             return {
-                'battery': self.tello.get_battery(),
-                'height': self.tello.get_height(),
-                'temperature': self.tello.get_temperature(),
-                'speed': self.tello.get_speed_x()
+                'battery': snapshot.battery,
+                'height': snapshot.height,
+                'temperature': snapshot.temperature,
+                'speed': snapshot.speed_x
             }
->>>>>>> dea707e300b8a0d0602dd0c7554e56810d0958fe
-        return None
\ No newline at end of file
+        return None
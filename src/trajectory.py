@@ -0,0 +1,291 @@
+"""
+Trajectory compiler: turns high-level paths into go/curve commands.
+"""
+
+import abc
+
+import numpy as np
+
+from mission_executor import MissionCommand
+
+# Tello SDK limits for go/curve (cm, cm/s)
+MAX_OFFSET = 500
+MIN_OFFSET = 20
+MIN_RADIUS = 50
+MAX_RADIUS = 1000
+GO_SPEED = (10, 100)
+CURVE_SPEED = (10, 60)
+
+TURNS = {'left': 1, 'right': -1}
+
+
+class Path(abc.ABC):
+    """A path relative to the drone's current position.
+
+    Coordinates use the SDK's body frame at the start of the path: x forward,
+    y left, z up, in cm. go/curve commands do not change the heading, so the
+    whole path is flown in that frame.
+    """
+
+    @abc.abstractmethod
+    def sample(self, step=5.0):
+        """Return an (N, 3) array of points spaced about `step` cm apart, starting at the origin."""
+
+    def then(self, other):
+        """Fly `other` after this path."""
+        return Chain(self, other)
+
+
+class Polyline(Path):
+    """Straight segments through waypoints (the origin is the first point)."""
+
+    def __init__(self, points):
+        self.points = np.vstack([np.zeros(3), np.asarray(points, dtype=np.float64).reshape(-1, 3)])
+
+    def sample(self, step=5.0):
+        samples = [self.points[:1]]
+        for start, end in zip(self.points[:-1], self.points[1:]):
+            count = max(1, int(np.ceil(np.linalg.norm(end - start) / step)))
+            t = np.linspace(0, 1, count + 1)[1:, None]
+            samples.append(start + t * (end - start))
+        return np.vstack(samples)
+
+
+class Arc(Path):
+    """Horizontal circular arc starting forward, optionally climbing.
+
+    Turns `degrees` to the 'left' or 'right' around a centre `radius` cm to
+    that side, rising `climb` cm over the arc.
+    """
+
+    def __init__(self, radius, degrees, turn='left', climb=0.0):
+        if turn not in TURNS:
+            raise ValueError(f"Unknown turn direction: {turn}")
+        self.radius = radius
+        self.degrees = degrees
+        self.turn = turn
+        self.climb = climb
+
+    def sample(self, step=5.0):
+        sweep = np.radians(self.degrees)
+        length = np.hypot(abs(sweep) * self.radius, self.climb)
+        t = np.linspace(0, 1, max(2, int(np.ceil(length / step)) + 1))
+        angle = t * sweep
+        side = TURNS[self.turn]
+        return np.column_stack([
+            self.radius * np.sin(angle),
+            side * self.radius * (1 - np.cos(angle)),
+            t * self.climb,
+        ])
+
+
+class Helix(Arc):
+    """`turns` full circles of `radius` cm while climbing `height` cm (negative descends)."""
+
+    def __init__(self, radius, turns, height, turn='left'):
+        super().__init__(radius, 360 * turns, turn, climb=height)
+
+
+class Bezier(Path):
+    """Bezier curve through control points (the origin is the first control point)."""
+
+    def __init__(self, control_points):
+        self.control = np.vstack([np.zeros(3), np.asarray(control_points, dtype=np.float64).reshape(-1, 3)])
+
+    def sample(self, step=5.0):
+        # The control polygon is never shorter than the curve
+        polygon = np.linalg.norm(np.diff(self.control, axis=0), axis=1).sum()
+        t = np.linspace(0, 1, max(2, int(np.ceil(polygon / step)) + 1))[:, None]
+        points = self.control
+        # de Casteljau, vectorised over all t
+        while len(points) > 1:
+            points = [(1 - t) * a + t * b for a, b in zip(points[:-1], points[1:])]
+        return np.broadcast_to(points[0], (len(t), 3)).copy()
+
+
+class Chain(Path):
+    """Paths flown one after another."""
+
+    def __init__(self, *paths):
+        self.paths = paths
+
+    def sample(self, step=5.0):
+        samples = [np.zeros((1, 3))]
+        for path in self.paths:
+            points = path.sample(step)
+            samples.append(points[1:] + samples[-1][-1])
+        return np.vstack(samples)
+
+
+def _fits_range(offset):
+    """True if an offset is within the SDK's coordinate limits."""
+    return np.all(np.abs(offset) <= MAX_OFFSET) and np.max(np.abs(offset)) >= MIN_OFFSET
+
+
+def _line_error(points):
+    """Largest distance of points from the chord between the first and last."""
+    chord = points[-1] - points[0]
+    length = np.linalg.norm(chord)
+    if length == 0:
+        return np.inf
+    relative = points - points[0]
+    return np.linalg.norm(np.cross(relative, chord / length), axis=1).max()
+
+
+def _circle(a, b, c):
+    """Centre, radius and unit normal of the circle through three points, or None if collinear."""
+    ab, ac = b - a, c - a
+    normal = np.cross(ab, ac)
+    norm2 = normal.dot(normal)
+    if norm2 < 1e-9:
+        return None
+    centre = a + (np.cross(normal, ab) * ac.dot(ac) + np.cross(ac, normal) * ab.dot(ab)) / (2 * norm2)
+    return centre, np.linalg.norm(a - centre), normal / np.sqrt(norm2)
+
+
+def _arc_error(points, circle):
+    """Largest distance of points from a circle."""
+    centre, radius, normal = circle
+    relative = points - centre
+    height = relative.dot(normal)
+    in_plane = np.linalg.norm(relative - np.outer(height, normal), axis=1)
+    return np.sqrt(height ** 2 + (in_plane - radius) ** 2).max()
+
+
+class TrajectoryCompiler:
+    """Fits a path with the fewest go/curve segments the SDK accepts.
+
+    The path is sampled densely, then segments are grown greedily from the
+    start: each one is the longest stretch that a single straight `go` or a
+    single `curve` (circle through the start, middle and end samples) covers
+    within `tolerance` cm and the SDK's offset and radius limits. Greedy
+    covering is minimal here because any sub-stretch of a stretch that fits
+    also fits (once it reaches the SDK's minimum offset). The same property
+    lets each segment's end be found by galloping and bisection, so a
+    segment costs O(log n) fits instead of one per sample. Endpoints are
+    rounded in absolute coordinates so rounding never accumulates. When
+    nothing fits after a segment (a tail shorter than the minimum offset),
+    that segment is ended earlier; a path that still cannot be covered is
+    an error. With curves=False only go segments are used.
+    """
+
+    def __init__(self, speed=30, tolerance=5.0, step=5.0, curves=True):
+        self.speed = speed
+        self.tolerance = tolerance
+        self.step = step
+        self.curves = curves
+        self.residual = 0.0
+
+    def compile(self, path):
+        """Return the MissionCommands that fly `path`.
+
+        Raises ValueError if part of the path further than `tolerance` from
+        where the commands end cannot be covered; `residual` is set to that
+        distance either way.
+        """
+        points = path.sample(self.step)
+        targets = np.rint(points).astype(int)
+        commands = []
+        starts = [0]
+        start = 0
+        while start < len(points) - 1:
+            segment = self._longest_segment(points, targets, start)
+            if segment is None and commands:
+                # Typically a tail shorter than the SDK's minimum move: end
+                # the previous segment earlier so the rest can be reached
+                shortened = self._shortened(points, targets, starts[-2], start)
+                if shortened is not None:
+                    (previous_end, previous), segment = shortened
+                    commands[-1] = previous
+                    starts[-1] = previous_end
+            if segment is None:
+                break
+            end, command = segment
+            commands.append(command)
+            starts.append(end)
+            start = end
+        # Furthest point of whatever could not be covered
+        self.residual = float(np.linalg.norm(points[start:] - points[start], axis=1).max())
+        if self.residual > self.tolerance:
+            raise ValueError(f"No go/curve command fits the path {self.residual:.0f} cm beyond "
+                             f"the end of its {len(commands)} command(s)")
+        return commands
+
+    def _shortened(self, points, targets, previous, end):
+        """End the segment previous..end earlier so a segment beyond `end` fits.
+
+        Returns ((new_end, command), (next_end, next_command)), or None.
+        """
+        for split in range(end - 1, previous, -1):
+            command = self._fit(points[previous:split + 1], targets, previous, split)
+            if command is None:
+                continue
+            following = self._longest_segment(points, targets, split)
+            if following is not None and following[0] > end:
+                return (split, command), following
+        return None
+
+    def _longest_segment(self, points, targets, start):
+        """Longest (end, command) starting at `start`, or None if nothing fits."""
+        offsets = np.abs(targets[start + 1:] - targets[start])
+        # Candidate ends: from the first that reaches the minimum offset to
+        # the last before any axis leaves the SDK's range
+        reaching = np.flatnonzero(offsets.max(axis=1) >= MIN_OFFSET)
+        too_far = np.flatnonzero(offsets.max(axis=1) > MAX_OFFSET)
+        if not reaching.size:
+            return None
+        first = start + 1 + reaching[0]
+        last = start + too_far[0] if too_far.size else len(points) - 1
+        if first > last:
+            return None
+
+        def fit(end):
+            return self._fit(points[start:end + 1], targets, start, end)
+
+        command = fit(first)
+        if command is None:
+            return None
+        best = (first, command)
+        # Gallop until a stretch no longer fits, then bisect the gap
+        step = 1
+        failed = last + 1
+        while best[0] + step <= last:
+            end = best[0] + step
+            command = fit(end)
+            if command is None:
+                failed = end
+                break
+            best = (end, command)
+            step *= 2
+        while failed - best[0] > 1:
+            end = (best[0] + failed) // 2
+            command = fit(end)
+            if command is None:
+                failed = end
+            else:
+                best = (end, command)
+        return best
+
+    def _fit(self, points, targets, start, end):
+        """A go or curve command covering points[start..end], or None."""
+        offset = targets[end] - targets[start]
+        if not _fits_range(offset):
+            return None
+        if _line_error(points) <= self.tolerance:
+            speed = int(np.clip(self.speed, *GO_SPEED))
+            return MissionCommand('go_xyz_speed', (*offset.tolist(), speed))
+
+        if not self.curves:
+            return None
+        middle = (start + end) // 2
+        mid_offset = targets[middle] - targets[start]
+        if not _fits_range(mid_offset):
+            return None
+        # The drone fits its circle to the rounded offsets, so check that one
+        circle = _circle(*(targets[i].astype(np.float64) for i in (start, middle, end)))
+        if circle is None or not MIN_RADIUS <= circle[1] <= MAX_RADIUS:
+            return None
+        if _arc_error(points, circle) > self.tolerance:
+            return None
+        speed = int(np.clip(self.speed, *CURVE_SPEED))
+        return MissionCommand('curve_xyz_speed', (*mid_offset.tolist(), *offset.tolist(), speed))
@@ -0,0 +1,136 @@
+"""
+Continuous video recording of the Tello camera feed.
+"""
+
+import os
+import queue
+import threading
+import time
+import cv2
+
+
+class VideoRecorder:
+    """Writes the frame stream to rotating, time-segmented video files.
+
+    Frames are handed over with submit(), which never blocks: when the
+    encoder falls behind, the oldest queued frame is dropped. A dedicated
+    encoder thread writes them through cv2.VideoWriter, starting a new file
+    every `segment_seconds`. The codec is picked with `fourcc`, so any
+    backend OpenCV was built with can be used. Each segment gets a
+    `.frames` sidecar listing the sequence number and capture timestamp of
+    every frame it contains.
+    """
+
+    def __init__(self, directory, fps=30, segment_seconds=60, fourcc='mp4v',
+                 extension='mp4', max_queue=64, copy_frames=False):
+        self.directory = directory
+        self.fps = fps
+        self.segment_seconds = segment_seconds
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.extension = extension
+        # Frames from the ring buffer are reused and must be copied;
+        # raw decoder frames are never modified and can be queued as-is
+        self.copy_frames = copy_frames
+        self.recorded = 0
+        self.dropped = 0
+        self.segments = []
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self.recording = False
+
+    def start(self):
+        """Start the encoder thread."""
+        if self.recording:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self.recording = True
+        self._thread = threading.Thread(target=self._encode)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop recording, write out queued frames and close the current segment.
+
+        Also cleans up after an encoder thread that died on an error.
+        """
+        if self._thread is None:
+            return
+        self.recording = False
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.1)  # Sentinel; waits for room if the queue is full
+                break
+            except queue.Full:
+                pass
+        self._thread.join()
+        self._thread = None
+        # Frames left behind by a dead encoder
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def submit(self, view):
+        """Queue a FrameView for recording without ever blocking the caller."""
+        if not self.recording:
+            return
+        frame = view.frame.copy() if self.copy_frames else view.frame
+        item = (frame, view.sequence, view.timestamp)
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _open_segment(self, frame):
+        """Open a new segment file sized for `frame`."""
+        name = f"tello_video_{int(time.time() * 1000)}_{len(self.segments) + 1:03d}"
+        path = os.path.join(self.directory, f"{name}.{self.extension}")
+        height, width = frame.shape[:2]
+        writer = cv2.VideoWriter(path, self.fourcc, self.fps, (width, height))
+        if not writer.isOpened():
+            raise RuntimeError(f"Could not open video writer for {path}")
+        index = open(os.path.join(self.directory, f"{name}.frames"), 'w')
+        self.segments.append(path)
+        print(f"🎥 Recording segment: {path}")
+        return writer, index
+
+    def _encode(self):
+        """Encoder thread: write queued frames, rotating segments by time."""
+        writer = None
+        index = None
+        segment_start = None
+        shape = None
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                frame, sequence, timestamp = item
+
+                rotate = (writer is None or frame.shape != shape or
+                          timestamp - segment_start >= self.segment_seconds)
+                if rotate:
+                    if writer is not None:
+                        writer.release()
+                        index.close()
+                    writer, index = self._open_segment(frame)
+                    segment_start = timestamp
+                    shape = frame.shape
+
+                writer.write(frame)
+                index.write(f"{sequence} {timestamp:.6f}\n")
+                self.recorded += 1
+        except Exception as e:
+            print(f"Video recording error: {e}")
+            self.recording = False
+        finally:
+            if writer is not None:
+                writer.release()
+                index.close()
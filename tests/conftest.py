@@ -0,0 +1,59 @@
+"""
+Shared fixtures: the src/ modules and simulated drones on loopback.
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from simulator import SimulatedTello
+
+
+def free_port(host='127.0.0.1'):
+    """A UDP port that is free on `host` right now."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+class SimulatorThread:
+    """Runs simulated drones on an event loop in a background thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.drones = []
+
+    def add(self, **options):
+        """Start a SimulatedTello with `options` and return it."""
+        drone = SimulatedTello(**options)
+        asyncio.run_coroutine_threadsafe(drone.start(), self.loop).result(timeout=5)
+        self.drones.append(drone)
+        return drone
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._stop_drones(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.loop.close()
+
+    async def _stop_drones(self):
+        tasks = [task for drone in self.drones for task in drone._tasks]
+        for drone in self.drones:
+            drone.stop()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.fixture
+def simulator():
+    sim = SimulatorThread()
+    yield sim
+    sim.close()
@@ -0,0 +1,151 @@
+"""
+CommandRegistry: parsing, clamping, guards and script checks.
+"""
+
+import pytest
+
+from commands import ArgSpec, CommandError, CommandRegistry, CommandSpec
+from connection_manager import ConnectionManager
+
+
+class Target:
+    """Stands in for InteractiveTelloController."""
+
+    def __init__(self, connected=True, policy='fail_fast'):
+        self.connection = ConnectionManager(lambda: False, policy=policy)
+        if connected:
+            self.connection.link_up()
+        self.flying = False
+        self.calls = []
+
+
+def record(name, flying=None, result=None):
+    def handler(target, *args):
+        target.calls.append((name,) + args)
+        if flying is not None:
+            target.flying = flying
+        return result
+    return handler
+
+
+@pytest.fixture
+def registry():
+    return CommandRegistry([
+        CommandSpec('takeoff', record('takeoff', True), guards=('connected', 'landed'), flying=True),
+        CommandSpec('land', record('land', False), guards=('flying',), flying=False),
+        CommandSpec('forward', record('forward'), [ArgSpec('distance', int, low=20, high=500)],
+                    guards=('connected', 'flying'), aliases=('fwd',)),
+        CommandSpec('flip', record('flip', result=False), [ArgSpec('direction', str, choices=('l', 'r'))],
+                    guards=('connected', 'flying')),
+        CommandSpec('speed', record('speed'), [ArgSpec('speed', int, default=50, low=10, high=100)]),
+        CommandSpec('script', record('script'), [ArgSpec('path', str)], guards=(), script=True),
+    ])
+
+
+def test_parse_converts_arguments_and_aliases(registry):
+    parsed = registry.parse('  FWD 120 ')
+    assert parsed.spec.name == 'forward'
+    assert parsed.args == (120,)
+    assert parsed.line == 'FWD 120'
+    assert registry.parse('   ') is None
+    assert registry.parse('speed').args == (50,)
+    assert registry.parse('flip L').args == ('l',)
+
+
+@pytest.mark.parametrize('line, message', [
+    ('hover', "unknown command 'hover'"),
+    ('forward', "missing distance"),
+    ('forward abc', "invalid distance 'abc'"),
+    ('forward 30 40', "too many arguments"),
+    ('flip x', "invalid direction 'x'"),
+])
+def test_parse_errors(registry, line, message):
+    with pytest.raises(CommandError, match=message):
+        registry.parse(line)
+
+
+def test_out_of_range_is_clamped_or_rejected_when_strict(registry):
+    notes = []
+    assert registry.parse('forward 900', notes=notes).args == (500,)
+    assert notes == ["distance 900 clamped to 500 [20..500]"]
+    assert registry.parse('speed 1').args == (10,)
+    with pytest.raises(CommandError, match=r"out of range \[20..500\]"):
+        registry.parse('forward 900', strict=True)
+
+
+def test_duplicate_names_and_unknown_guards_are_refused(registry):
+    with pytest.raises(ValueError, match="already registered"):
+        registry.add(CommandSpec('fwd', record('fwd')))
+    with pytest.raises(ValueError, match="Unknown guard"):
+        registry.add(CommandSpec('hover', record('hover'), guards=('hovering',)))
+
+
+def test_guards(registry):
+    target = Target()
+    assert not registry.dispatch(target, registry.parse('forward 50'))
+    assert registry.dispatch(target, registry.parse('takeoff'))
+    assert not registry.dispatch(target, registry.parse('takeoff'))
+    assert registry.dispatch(target, registry.parse('forward 50'))
+    assert target.calls == [('takeoff',), ('forward', 50)]
+
+
+def test_connected_guard_applies_the_command_policy(registry):
+    offline = Target(connected=False)
+    assert not registry.dispatch(offline, registry.parse('speed 20'))
+    assert not offline.calls and not offline.connection.pending
+
+    queueing = Target(connected=False, policy='queue')
+    assert not registry.dispatch(queueing, registry.parse('speed 20'))
+    assert [command for _, command in queueing.connection.pending] == ['speed 20']
+
+    # land only needs the drone in the air, not a healthy link
+    offline.flying = True
+    assert registry.dispatch(offline, registry.parse('land'))
+
+
+def test_handler_failure_is_reported(registry):
+    target = Target()
+    target.flying = True
+    assert not registry.dispatch(target, registry.parse('flip l'))
+    assert target.calls == [('flip', 'l')]
+
+
+def test_script_follows_the_flight_state(registry):
+    commands, errors = registry.parse_script([
+        'forward 50  # too early',
+        'takeoff',
+        '',
+        'forward 600',
+        'takeoff',
+        'land',
+        'fwd 30',
+    ])
+    assert len(commands) == 5
+    assert [(e.lineno, e.message) for e in errors] == [
+        (1, "'forward' before takeoff"),
+        (4, "distance 600 out of range [20..500]"),
+        (5, "'takeoff' while already flying"),
+        (7, "'forward' before takeoff"),
+    ]
+
+
+def test_nested_scripts_are_checked(registry, tmp_path):
+    inner = tmp_path / 'inner.txt'
+    inner.write_text("forward 50\nland\n")
+    outer = tmp_path / 'outer.txt'
+    outer.write_text(f"takeoff\nscript {inner}\nforward 50\nscript {outer}\nscript {tmp_path / 'missing.txt'}\n")
+
+    commands, errors = registry.load_script(str(outer))
+    assert len(commands) == 5
+    messages = [(e.lineno, e.message) for e in errors]
+    assert messages[0] == (3, "'forward' before takeoff")
+    assert messages[1] == (4, f"script {outer} runs itself")
+    assert messages[2][0] == 5 and messages[2][1].startswith(f"cannot read {tmp_path / 'missing.txt'}")
+
+
+def test_help_lines_are_grouped(registry):
+    registry.add(CommandSpec('photo', record('photo'), group='Camera', help="Take a photo"))
+    lines = registry.help_lines()
+    assert lines[0] == 'General:'
+    assert any(line.strip().startswith('forward/fwd <distance>') for line in lines)
+    assert lines[-2:] == ['Camera:', '  photo                   - Take a photo']
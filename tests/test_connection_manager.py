@@ -0,0 +1,103 @@
+"""
+ConnectionManager state transitions, backoff and the command queue.
+"""
+
+import threading
+import time
+
+from connection_manager import CONNECTED, DEGRADED, LOST, RECONNECTING, ConnectionManager
+
+
+class Reconnect:
+    """Reconnect callback that fails `failures` times, then succeeds."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls > self.failures
+
+
+def wait_for_state(manager, state, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while manager.state != state and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return manager.state
+
+
+def test_link_up_and_down():
+    manager = ConnectionManager(Reconnect())
+    changes = []
+    manager.on_state_change(lambda old, new: changes.append((old, new)))
+    assert manager.state == LOST and not manager.wait_connected(0)
+    manager.link_up()
+    assert manager.is_connected() and manager.wait_connected(0)
+    manager.link_down()
+    assert manager.state == DEGRADED
+    manager.link_up()
+    assert changes == [(LOST, CONNECTED), (CONNECTED, DEGRADED), (DEGRADED, CONNECTED)]
+
+
+def test_degraded_link_escalates_and_reconnects():
+    reconnect = Reconnect(failures=2)
+    manager = ConnectionManager(reconnect, degraded_grace=0.02, base_delay=0.01, max_delay=0.02)
+    states = []
+    manager.on_state_change(lambda old, new: states.append(new))
+    manager.link_up()
+    manager.start()
+    try:
+        manager.link_down()
+        assert wait_for_state(manager, CONNECTED) == CONNECTED
+    finally:
+        manager.stop()
+    assert reconnect.calls == 3
+    assert states == [CONNECTED, DEGRADED, RECONNECTING, CONNECTED]
+    assert manager.attempts == 0
+
+
+def test_gives_up_after_max_attempts():
+    reconnect = Reconnect(failures=100)
+    manager = ConnectionManager(reconnect, base_delay=0.001, max_delay=0.002, max_attempts=3)
+    manager.start()
+    try:
+        manager.request_reconnect()
+        assert wait_for_state(manager, LOST) == LOST
+    finally:
+        manager.stop()
+    assert reconnect.calls == 3
+
+
+def test_backoff_is_capped_and_jittered():
+    manager = ConnectionManager(Reconnect(), base_delay=0.5, max_delay=4.0)
+    for attempts, full in [(1, 0.5), (2, 1.0), (3, 2.0), (10, 4.0)]:
+        delays = [manager.backoff(attempts) for _ in range(50)]
+        assert all(full * 0.5 <= d <= full for d in delays)
+
+
+def test_wait_connected_wakes_on_link_up():
+    manager = ConnectionManager(Reconnect())
+    threading.Timer(0.02, manager.link_up).start()
+    assert manager.wait_connected(timeout=2)
+
+
+def test_queue_policy_replays_fresh_commands_only():
+    manager = ConnectionManager(Reconnect(), policy='queue', queue_ttl=0.05)
+    replayed = []
+    manager.on_reconnected(replayed.append)
+    assert not manager.admit('forward 50')
+    time.sleep(0.1)
+    assert not manager.admit('cw 90')
+    manager.link_up()
+    assert replayed == [['cw 90']]
+    assert manager.admit('land') and not manager.pending
+
+
+def test_fail_fast_policy_queues_nothing():
+    manager = ConnectionManager(Reconnect())
+    replayed = []
+    manager.on_reconnected(replayed.append)
+    assert not manager.admit('forward 50')
+    manager.link_up()
+    assert replayed == [[]]
@@ -0,0 +1,99 @@
+"""
+FlightRecorder logs read back with FlightLog.
+"""
+
+import numpy as np
+import pytest
+
+from flight_log import FlightLog, fleet_report, summarize_directory
+from flight_recorder import FlightRecorder
+from frame_buffer import FrameView
+from telemetry import TelemetrySnapshot
+
+
+def record_flight(directory, packets=300, chunk_size=64, commands=True):
+    """Record a 30 s flight: climb to 80 cm, a link gap, battery 90% -> 87%."""
+    recorder = FlightRecorder(str(directory), chunk_size=chunk_size)
+    path = recorder.start()
+    for i in range(packets):
+        t = 1000.0 + i * 0.1 + (2.0 if i >= 150 else 0.0)
+        state = {'bat': 90 - i // 100, 'h': min(80, i * 2), 'tof': min(80, i * 2) + 10,
+                 'pitch': 5 if i == 120 else 0, 'roll': -12 if i == 200 else 0, 'agz': -1000.0}
+        recorder.record_snapshot(TelemetrySnapshot(t, i + 1, state))
+    sent = [('takeoff', 'ok'), ('forward 50', 'ok'), ('flip x', 'error'), ('land', 'ok')] if commands else []
+    for i, (command, response) in enumerate(sent):
+        recorder.record_command(command, response, 1000.0 + i, 0.02 * (i + 1))
+    for i in range(90):
+        recorder.record_frame(FrameView(None, i + 1, 1000.0 + i / 30.0))
+    return recorder, path
+
+
+def test_round_trip(tmp_path):
+    recorder, path = record_flight(tmp_path)
+    recorder.stop()
+    log = FlightLog(path)
+
+    assert log.meta['streams']['telemetry']['count'] == 300
+    telemetry = log.telemetry
+    assert isinstance(telemetry, np.memmap)
+    assert telemetry.size == 300
+    assert telemetry['sequence'][0] == 1 and telemetry['sequence'][-1] == 300
+    assert telemetry['height'].max() == 80
+    assert log.commands['command'].tolist() == [b'takeoff', b'forward 50', b'flip x', b'land']
+    assert log.frames.size == 90
+
+    summary = log.summary()
+    assert summary['packets'] == 300
+    assert summary['battery_start'] == 90 and summary['battery_end'] == 88
+    assert summary['pitch_max'] == 5 and summary['roll_min'] == -12 and summary['tilt_max'] == 12
+    assert summary['link_losses'] == 1
+    assert summary['link_loss_longest_s'] == pytest.approx(2.1)
+    assert summary['commands'] == 4 and summary['command_errors'] == 1
+    assert summary['rtt_max_ms'] == pytest.approx(80, abs=0.01)
+    assert summary['fps_mean'] == pytest.approx(30)
+
+
+def test_logs_are_readable_before_stop(tmp_path):
+    recorder, path = record_flight(tmp_path, packets=100, chunk_size=64)
+    # Only full chunks have reached the file so far
+    assert FlightLog(path).telemetry.size == 64
+    for log in recorder.logs.values():
+        log.flush()
+    assert FlightLog(path).telemetry.size == 100
+    recorder.stop()
+
+
+def test_recording_stops_cleanly(tmp_path):
+    recorder, path = record_flight(tmp_path, packets=10)
+    recorder.stop()
+    recorder.record_snapshot(TelemetrySnapshot(2000.0, 99, {}))
+    recorder.record_command('cw 90', 'ok', 2000.0, 0.01)
+    assert FlightLog(path).telemetry.size == 10
+    assert FlightLog(path).commands.size == 4
+
+
+def test_directory_summaries_and_fleet_report(tmp_path):
+    for i in range(3):
+        recorder, _ = record_flight(tmp_path / f"drone{i}")
+        recorder.stop()
+    summaries = summarize_directory(str(tmp_path), workers=2)
+    assert len(summaries) == 3
+    assert all(summary['packets'] == 300 for summary in summaries)
+    report = fleet_report(summaries)
+    assert report['flights'] == 3 and report['skipped'] == 0
+
+
+def test_rtt_median_skips_flights_without_commands(tmp_path):
+    for name, commands in [('a', True), ('b', False), ('c', False)]:
+        recorder, _ = record_flight(tmp_path / name, commands=commands)
+        recorder.stop()
+    report = fleet_report(summarize_directory(str(tmp_path), workers=1))
+    assert report['flights'] == 3
+    assert report['rtt_p95_ms_median'] == pytest.approx(77, abs=1)
+
+
+def test_unknown_stream(tmp_path):
+    recorder, path = record_flight(tmp_path, packets=10)
+    recorder.stop()
+    with pytest.raises(KeyError, match="no 'video' stream"):
+        FlightLog(path).stream('video')
@@ -0,0 +1,25 @@
+"""
+Pattern plans: parameter checks and validation.
+"""
+
+import pytest
+
+from flight_plan import FlightPlan
+from mission_executor import MissionCommand
+
+
+def test_spiral_radius_is_checked():
+    with pytest.raises(ValueError):
+        FlightPlan.compile('spiral', height=20, turns=1, radius=40)
+
+
+@pytest.mark.parametrize('pattern, params', [
+    ('square', {}), ('triangle', {}), ('figure_eight', {}), ('figure_eight', {'curves': False}), ('spiral', {}),
+])
+def test_patterns_return_to_their_start(pattern, params):
+    assert FlightPlan.compile(pattern, **params).validate() == []
+
+
+def test_validate_reports_a_plan_that_does_not_close():
+    plan = FlightPlan('square', {}, [MissionCommand('move_forward', (50,)), MissionCommand('move_right', (50,))])
+    assert plan.validate() == ["ends 71 cm from its start (at most 5 cm)"]
@@ -0,0 +1,81 @@
+"""
+FlightStateEstimator: takeoff, landing and crash detection.
+"""
+
+from flight_state import AIRBORNE, CRASH, LANDED, FlightStateEstimator
+from telemetry import TelemetrySnapshot
+
+
+def packet(t, height, vgz=0, agz=-1000.0, pitch=0):
+    return TelemetrySnapshot(t, 0, {'h': height, 'tof': max(height, 10), 'vgz': vgz,
+                                    'agz': agz, 'pitch': pitch})
+
+
+def hover(start=0.0, count=10, height=100):
+    return [packet(start + i * 0.1, height) for i in range(count)]
+
+
+def on_ground(start, count=5):
+    return [packet(start + i * 0.1, 0) for i in range(count)]
+
+
+def descent(start, rate, count, height=100, **fields):
+    """Packets 0.1 s apart descending `rate` cm/s, heights quantized to 10 cm."""
+    return [packet(start + i * 0.1, max(0, height - rate * i // 10) // 10 * 10, vgz=rate // 10, **fields)
+            for i in range(count)]
+
+
+def events(packets, **options):
+    estimator = FlightStateEstimator(**options)
+    found = []
+    for snapshot in packets:
+        found.extend(estimator.update(snapshot))
+    return [(event.kind, event.detail) for event in found]
+
+
+def test_gentle_landing():
+    packets = hover() + descent(1.0, 40, 26) + on_ground(4.0)
+    assert events(packets) == [(AIRBORNE, ''), (LANDED, '')]
+
+
+def test_landed_needs_confirmation():
+    packets = hover() + on_ground(1.0, count=2)
+    assert events(packets) == [(AIRBORNE, '')]
+
+
+def test_fast_descent_is_a_crash():
+    packets = hover() + descent(1.0, 300, 5) + on_ground(1.5)
+    assert events(packets) == [(AIRBORNE, ''), (CRASH, 'descent 300cm/s')]
+
+
+def test_impact_is_a_crash():
+    packets = hover() + descent(1.0, 40, 26) + [packet(3.7, 0, agz=-3500.0)] + on_ground(4.0)
+    assert events(packets) == [(AIRBORNE, ''), (CRASH, 'impact 2.5g')]
+
+
+def test_bursty_packets_do_not_fake_a_fast_descent():
+    # Packets sent every 0.1 s arrive five at a time, 5 ms apart
+    packets = []
+    for k in range(60):
+        height = (100 if k < 20 else max(0, 100 - (k - 20) * 4)) // 10 * 10
+        arrival = (k // 5) * 0.5 + (k % 5) * 0.005
+        packets.append(packet(arrival, height, vgz=0 if height in (0, 100) else 4))
+    packets += on_ground(30.0)
+    assert events(packets) == [(AIRBORNE, ''), (LANDED, '')]
+
+
+def test_flip_before_landing_is_not_an_impact():
+    flip = [packet(1.0, 100, pitch=120, agz=-3500.0)]
+    packets = hover() + flip + descent(1.1, 40, 26) + on_ground(4.0)
+    assert events(packets) == [(AIRBORNE, ''), (LANDED, '')]
+
+
+def test_reported_flip_is_not_an_impact():
+    estimator = FlightStateEstimator()
+    for snapshot in hover():
+        estimator.update(snapshot)
+    estimator.note_flip()
+    found = []
+    for snapshot in [packet(1.0, 100, agz=-3500.0)] + descent(1.1, 40, 26) + on_ground(4.0):
+        found.extend(estimator.update(snapshot))
+    assert [event.kind for event in found] == [LANDED]
@@ -0,0 +1,64 @@
+"""
+FrameRing publishing and wait_for_newer().
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from frame_buffer import FrameRing
+
+
+def frame(value, shape=(4, 6, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_wait_for_newer_returns_at_once_when_a_newer_frame_exists():
+    ring = FrameRing(size=3)
+    ring.publish(frame(1))
+    view = ring.publish(frame(2))
+    assert ring.wait_for_newer(0, timeout=0) is view
+    assert ring.wait_for_newer(1, timeout=0) is view
+    assert view.sequence == 2 and view.frame[0, 0, 0] == 2
+
+
+def test_wait_for_newer_times_out_without_a_new_frame():
+    ring = FrameRing()
+    assert ring.wait_for_newer(0, timeout=0.01) is None
+    ring.publish(frame(1))
+    start = time.monotonic()
+    assert ring.wait_for_newer(1, timeout=0.05) is None
+    assert time.monotonic() - start >= 0.04
+
+
+def test_wait_for_newer_wakes_on_publish():
+    ring = FrameRing()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(ring.wait_for_newer(0, timeout=5)))
+    waiter.start()
+    time.sleep(0.02)
+    view = ring.publish(frame(7))
+    waiter.join(timeout=5)
+    assert results == [view]
+
+
+def test_views_are_read_only_and_slots_are_reused():
+    ring = FrameRing(size=3)
+    first = ring.publish(frame(1))
+    assert not first.frame.flags.writeable
+    ring.publish(frame(2))
+    assert ring.is_current(first)
+    ring.publish(frame(3))
+    assert not ring.is_current(first)
+    ring.publish(frame(4))
+    # The slot behind the first view now holds the fourth frame
+    assert first.frame[0, 0, 0] == 4
+
+
+def test_geometry_change_reallocates():
+    ring = FrameRing()
+    ring.publish(frame(1))
+    view = ring.publish(frame(2, shape=(8, 8, 3)))
+    assert view.frame.shape == (8, 8, 3)
+    assert ring.latest() is view
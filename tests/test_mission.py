@@ -0,0 +1,17 @@
+"""
+Mission checks and costing.
+"""
+
+import pytest
+
+from flight_plan import PlanCache
+from mission import Mission
+
+
+def test_rc_steps_are_costed_and_fenced(tmp_path):
+    steps = ['takeoff', 'rc forward 100 10', 'rc left 100 10', 'land']
+    mission = Mission('rc', steps, plans=PlanCache(str(tmp_path)), geofence={'radius': 100})
+    # 1000 cm at 100 cm/s plus a 1 s ramp at each end
+    assert [step.seconds for step in mission.steps[1:3]] == pytest.approx([11 + mission.cost_model.overhead] * 2)
+    assert mission.waypoints[-1] == pytest.approx([1000, 1000, 0])
+    assert "reaches 1414 cm from start (fence 100 cm)" in mission.validate()
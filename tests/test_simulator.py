@@ -0,0 +1,194 @@
+"""
+Controllers against the simulator on loopback.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+
+import djitellopy
+import pytest
+from djitellopy import Tello
+
+from async_controller import AsyncTelloController, AsyncTelloError
+from conftest import free_port
+import flight_control
+from flight_control import InteractiveTelloController
+from flight_state import AIRBORNE, LANDED, FlightStateEstimator
+from simulator import SimulatedTello
+from swarm import SwarmController
+from telemetry import TelemetrySnapshot
+from tello_controller import TelloController
+
+HOST = '127.0.0.2'
+
+
+def send(sock, address, command):
+    sock.sendto(command.encode('utf-8'), address)
+    return sock.recvfrom(1024)[0].decode('utf-8')
+
+
+def test_sdk_protocol(simulator):
+    port = free_port(HOST)
+    drone = simulator.add(host=HOST, command_port=port, state_port=free_port(), time_scale=0)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(2)
+        address = (HOST, port)
+        assert send(sock, address, 'command') == 'ok'
+        assert send(sock, address, 'forward 50') == 'error'
+        assert send(sock, address, 'takeoff') == 'ok'
+        assert send(sock, address, 'forward 600') == 'error'
+        assert send(sock, address, 'forward 50') == 'ok'
+        assert send(sock, address, 'cw 90') == 'ok'
+        assert send(sock, address, 'forward 50') == 'ok'
+        assert 95 <= int(send(sock, address, 'battery?')) <= 100
+        assert send(sock, address, 'land') == 'ok'
+    # Clockwise turns are to the right, the world frame's y is to the left
+    assert drone.position == pytest.approx([50, -50, 0])
+    assert not drone.flying
+
+
+def test_moves_take_their_time(simulator):
+    port, state_port = free_port(HOST), free_port()
+    simulator.add(host=HOST, command_port=port, state_port=state_port, state_rate=20, time_scale=0.5)
+    packets = []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock, \
+            socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as state:
+        sock.settimeout(3)
+        state.bind(('127.0.0.1', state_port))
+        state.settimeout(0.5)
+        listening = True
+
+        def listen():
+            while listening:
+                try:
+                    packets.append((time.time(), state.recv(1024).decode('ASCII')))
+                except socket.timeout:
+                    pass
+
+        listener = threading.Thread(target=listen)
+        listener.start()
+        address = (HOST, port)
+        try:
+            assert send(sock, address, 'command') == 'ok'
+            start = time.monotonic()
+            assert send(sock, address, 'takeoff') == 'ok'
+            # 80 cm at 60 cm/s, at half the real duration
+            assert time.monotonic() - start > 0.5
+            assert send(sock, address, 'land') == 'ok'
+            time.sleep(0.5)
+        finally:
+            listening = False
+            listener.join()
+
+    heights = [Tello.parse_state(packet)['h'] for _, packet in packets]
+    assert max(heights) >= 70
+    assert any(0 < height < 80 for height in heights)
+    # A normal landing is not a crash
+    estimator = FlightStateEstimator()
+    found = []
+    for sequence, (timestamp, packet) in enumerate(packets):
+        found.extend(estimator.update(TelemetrySnapshot(timestamp, sequence, Tello.parse_state(packet))))
+    assert [event.kind for event in found] == [AIRBORNE, LANDED]
+
+
+def skip_if_tello_ports_busy():
+    # djitellopy binds local ports 8889 and 8890 on every interface, once per process
+    if djitellopy.tello.threads_initialized:
+        return
+    for port in (8889, 8890):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+            try:
+                probe.bind(('127.0.0.1', port))
+            except OSError:
+                pytest.skip(f"local port {port} is in use")
+
+
+def test_tello_controller_on_a_loopback_port(simulator):
+    skip_if_tello_ports_busy()
+    port = free_port(HOST)
+    drone = simulator.add(host=HOST, command_port=port, state_port=8890, time_scale=0)
+    controller = TelloController(HOST, command_port=port)
+    try:
+        assert controller.connect()
+        controller.takeoff()
+        controller.tello.move_up(40)
+        snapshot = controller.telemetry.snapshot()
+        assert snapshot is not None and snapshot.battery > 0
+        controller.land()
+        assert drone.commands >= 4 and not drone.flying
+        assert drone.position[2] == 0
+    finally:
+        controller.disconnect()
+
+
+def test_takeoff_and_land_raise_no_flight_state_warnings(simulator, tmp_path, monkeypatch, capsys):
+    skip_if_tello_ports_busy()
+    monkeypatch.setattr(flight_control, 'TAKEOFF_SETTLE', 1)
+    monkeypatch.setattr(flight_control, 'LAND_SETTLE', 1)
+    # djitellopy keeps one entry per host, and a collected Tello from another test deletes it
+    host = '127.0.0.3'
+    port = free_port(host)
+    simulator.add(host=host, command_port=port, state_port=8890, time_scale=0.5)
+    tello = Tello(host)
+    tello.address = (host, port)
+    interactive = InteractiveTelloController(headless=True, tello=tello, photos_dir=str(tmp_path / 'photos'),
+                                             flights_dir=str(tmp_path / 'flights'))
+    try:
+        assert interactive.controller.connect()
+        interactive.connection.link_up()
+        interactive.start_monitoring(background=False)
+        assert interactive.execute_command('takeoff')
+        assert interactive.execute_command('land')
+    finally:
+        interactive.controller.disconnect()
+    out = capsys.readouterr().out
+    assert "Takeoff successful" in out and "Landed successfully" in out
+    assert "⚠️" not in out
+
+
+def test_late_response_does_not_answer_the_next_command():
+    async def run():
+        port, state_port = free_port(HOST), free_port()
+        drone = SimulatedTello(HOST, command_port=port, state_port=state_port, latency=0.2, latency_jitter=0)
+        await drone.start()
+        controller = AsyncTelloController(HOST, command_port=port, state_port=state_port)
+        try:
+            await controller.connect()
+            with pytest.raises(AsyncTelloError):
+                await controller.send_command('speed?', timeout=0.05)
+            return await controller.send_command('sdk?')
+        finally:
+            await controller.close()
+            drone.stop()
+
+    assert asyncio.run(run()) == '30'
+
+
+def test_swarm_flies_the_cached_square_plan():
+    async def run():
+        port, state_port = free_port(HOST), free_port()
+        hosts = ['127.0.0.4', '127.0.0.5']
+        drones = [SimulatedTello(host, command_port=port, state_port=state_port, time_scale=0) for host in hosts]
+        for drone in drones:
+            await drone.start()
+        swarm = SwarmController(hosts, command_port=port, state_port=state_port)
+        try:
+            assert await swarm.connect() == []
+            await swarm.broadcast('takeoff')
+            await swarm.square_pattern(60)
+            await swarm.square_pattern(60, lock_step=False)
+        finally:
+            await swarm.close()
+            for drone in drones:
+                drone.stop()
+        return swarm, drones
+
+    swarm, drones = asyncio.run(run())
+    plan = swarm.plans.get('square', size=60)
+    assert [command.method for command in plan.commands] == ['move_forward', 'move_right', 'move_back', 'move_left']
+    for drone in drones:
+        # command, takeoff and two squares
+        assert drone.commands == 10
+        assert drone.position == pytest.approx([0, 0, 80])
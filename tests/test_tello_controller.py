@@ -0,0 +1,57 @@
+"""
+TelloController with a stand-in Tello backend.
+"""
+
+from djitellopy import TelloException
+
+from tello_controller import TelloController
+
+
+class SilentTello:
+    """Answers the handshake but has not sent a state packet yet."""
+
+    def __init__(self, state=None):
+        self.state = state or {}
+
+    def connect(self):
+        pass
+
+    def send_command_with_return(self, command, timeout=7):
+        return 'ok'
+
+    def end(self):
+        pass
+
+    def get_current_state(self):
+        return self.state
+
+    def get_battery(self):
+        if 'bat' not in self.state:
+            raise TelloException('Could not get state property: bat')
+        return self.state['bat']
+
+
+def test_connect_without_a_state_packet(capsys):
+    controller = TelloController(tello=SilentTello())
+    try:
+        assert controller.connect()
+        assert controller.connected
+    finally:
+        controller.disconnect()
+    assert "Battery: unknown" in capsys.readouterr().out
+
+
+def test_connect_reports_the_battery(capsys):
+    controller = TelloController(tello=SilentTello({'bat': 76}))
+    try:
+        assert controller.connect()
+    finally:
+        controller.disconnect()
+    assert "Battery: 76%" in capsys.readouterr().out
+
+
+def test_battery_level_without_a_state_packet():
+    controller = TelloController(tello=SilentTello())
+    assert controller.battery_level() is None
+    controller.tello.state['bat'] = 42
+    assert controller.battery_level() == 42
@@ -0,0 +1,88 @@
+"""
+TrajectoryCompiler output stays within the SDK's go/curve limits.
+"""
+
+import numpy as np
+import pytest
+
+from trajectory import (CURVE_SPEED, GO_SPEED, MAX_OFFSET, MAX_RADIUS, MIN_OFFSET, MIN_RADIUS,
+                        Arc, Bezier, Helix, Path, Polyline, TrajectoryCompiler, _circle)
+
+PATHS = {
+    'long line': Polyline([[1800, 300, 60]]),
+    'zigzag': Polyline([[100, 0, 0], [100, 100, 0], [300, 100, 50], [300, -400, 50]]),
+    'small arc': Arc(60, 180, 'right'),
+    'wide arc': Arc(900, 90, 'left'),
+    'helix': Helix(100, 2, 150),
+    'bezier': Bezier([[200, 0, 0], [200, 300, 100], [0, 300, 0]]),
+    'chain': Polyline([[100, 0, 0]]).then(Arc(80, 270)).then(Polyline([[0, 0, -60]])),
+}
+
+
+def check_limits(offset):
+    assert np.all(np.abs(offset) <= MAX_OFFSET)
+    assert np.max(np.abs(offset)) >= MIN_OFFSET
+
+
+@pytest.mark.parametrize('name', sorted(PATHS))
+@pytest.mark.parametrize('speed', [5, 40, 200])
+def test_commands_respect_sdk_limits(name, speed):
+    compiler = TrajectoryCompiler(speed=speed)
+    path = PATHS[name]
+    position = np.zeros(3)
+    for command in compiler.compile(path):
+        if command.method == 'go_xyz_speed':
+            *offset, go_speed = command.args
+            check_limits(offset)
+            assert GO_SPEED[0] <= go_speed <= GO_SPEED[1]
+        else:
+            assert command.method == 'curve_xyz_speed'
+            x1, y1, z1, x2, y2, z2, curve_speed = command.args
+            middle, offset = np.array([x1, y1, z1]), np.array([x2, y2, z2])
+            check_limits(middle)
+            check_limits(offset)
+            assert CURVE_SPEED[0] <= curve_speed <= CURVE_SPEED[1]
+            _, radius, _ = _circle(np.zeros(3), middle.astype(float), offset.astype(float))
+            assert MIN_RADIUS <= radius <= MAX_RADIUS
+        position += offset
+    end = path.sample(compiler.step)[-1]
+    assert np.linalg.norm(position - end) <= compiler.residual + 1.0
+
+
+def test_long_line_is_split_into_the_fewest_moves():
+    commands = TrajectoryCompiler().compile(PATHS['long line'])
+    assert len(commands) == 4
+    assert all(command.method == 'go_xyz_speed' for command in commands)
+
+
+def test_helix_uses_curves():
+    commands = TrajectoryCompiler().compile(PATHS['helix'])
+    assert all(command.method == 'curve_xyz_speed' for command in commands)
+    assert len(commands) == 4  # two per turn
+
+
+def test_without_curves_only_go_is_used():
+    commands = TrajectoryCompiler(curves=False).compile(PATHS['small arc'])
+    assert commands and all(command.method == 'go_xyz_speed' for command in commands)
+
+
+@pytest.mark.parametrize('path', [Polyline([[10, 5, 0]]), Arc(15, 360)], ids=['short line', 'tight loop'])
+def test_path_too_small_to_compile(path):
+    compiler = TrajectoryCompiler()
+    with pytest.raises(ValueError):
+        compiler.compile(path)
+    assert compiler.residual > compiler.tolerance
+
+
+def test_short_tail_is_reached_by_ending_the_previous_segment_earlier():
+    # Greedy go segments would stop about 15 cm before the end
+    path = Arc(80, 360, 'left').then(Arc(80, 360, 'right'))
+    compiler = TrajectoryCompiler(curves=False)
+    commands = compiler.compile(path)
+    end = np.sum([command.args[:3] for command in commands], axis=0)
+    assert np.linalg.norm(end - path.sample(compiler.step)[-1]) <= compiler.tolerance
+
+
+def test_path_is_abstract():
+    with pytest.raises(TypeError):
+        Path()